@@ -0,0 +1,45 @@
+# Pacote com os algoritmos de grafos. Todos os modulos usam o mesmo tipo Grafo
+# (grafo_utils), entao um grafo carregado uma vez serve para Euler, caixeiro viajante,
+# conexidade etc. sem reler nem revalidar as arestas, reaproveitando indices e caches.
+# Os modulos se importam de forma relativa e as demonstracoes rodam a partir da raiz
+# do repositorio com "python -m algoritmos_trabalhos.<modulo>".
+#
+# Os tipos abaixo sao exportados sob demanda (PEP 562): importar o pacote nao carrega
+# os submodulos, assim "python -m" executa cada modulo uma vez so, sem uma segunda
+# copia ja importada pelo pacote. Os algoritmos ficam nos modulos
+# (algoritmos_trabalhos.alg_fleury.alg_fleury(G), ...), ja que alg_fleury e
+# bellmore_nemhauser sao nomes de modulo e de funcao.
+
+import importlib
+
+_TIPOS = {
+    "Grafo": "grafo_utils",
+    "MulticonjuntoArestas": "grafo_utils",
+    "ArestasPonderadas": "grafo_utils",
+    "ListaAdjacencias": "grafo_utils",
+    "GrafoCSR": "grafo_csr",
+    "MatrizEsparsa": "grafo_csr",
+    "como_csr": "grafo_csr",
+}
+
+_MODULOS = ("instrumentacao", "grafo_csr", "conexidade", "alcancabilidade", "caminhos_minimos", "grafo_utils",
+            "formato_binario", "leitura_escrita", "fecho_transitivo", "todos_os_pares",
+            "pontes", "fluxo_maximo", "k_conexidade", "operacoes", "isomorfismo",
+            "alg_fleury", "bellmore_nemhauser", "busca_local", "benchmark")
+
+__all__ = [*_TIPOS, *_MODULOS]
+
+
+def __getattr__(nome: str):
+    if nome in _TIPOS:
+        valor = getattr(importlib.import_module(f".{_TIPOS[nome]}", __name__), nome)
+    elif nome in _MODULOS:
+        valor = importlib.import_module(f".{nome}", __name__)
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {nome!r}")
+    globals()[nome] = valor
+    return valor
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
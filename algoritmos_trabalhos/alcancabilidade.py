@@ -0,0 +1,248 @@
+# Consultas de alcancabilidade (existe caminho de u para v?)
+# Busca bidirecional: expande sempre a menor fronteira, pelos sucessores a partir da
+# origem e pelos antecessores a partir do destino, e para assim que as duas se tocam.
+# O motor guarda listas por indice e marcas por rodada, reaproveitadas entre consultas,
+# e opcionalmente os rotulos das componentes fortes para responder em O(1) quando possivel.
+
+import numpy as np
+from collections import defaultdict
+from typing import List, Dict, Tuple, Any, Iterable, Mapping, Optional
+
+from . import conexidade
+from . import instrumentacao
+from .grafo_csr import como_csr
+
+
+def _expandir(vizinhos: Mapping, fronteira: List, vistos: set, outro_lado: set) -> Optional[List]:
+    proxima = []
+    for v in fronteira:
+        for w in vizinhos[v]:
+            if w in outro_lado:
+                return None
+            if w not in vistos:
+                vistos.add(w)
+                proxima.append(w)
+    return proxima
+
+
+def busca_bidirecional(sucessores: Mapping, antecessores: Mapping, origem: Any, destino: Any) -> bool:
+    # sucessores[v] e antecessores[v] so precisam ser iteraveis (listas, dicts, ...)
+    if origem == destino:
+        return True
+
+    ida, volta = {origem}, {destino}
+    fronteira_ida, fronteira_volta = [origem], [destino]
+
+    while fronteira_ida and fronteira_volta:
+        if instrumentacao.ativo:
+            # conta a fronteira inteira mesmo quando a busca para no meio dela
+            menor = min(fronteira_ida, fronteira_volta, key=len)
+            vizinhos = sucessores if menor is fronteira_ida else antecessores
+            instrumentacao.arestas_percorridas("alcancabilidade.busca_bidirecional",
+                                               sum(len(vizinhos[v]) for v in menor))
+        if len(fronteira_ida) <= len(fronteira_volta):
+            fronteira_ida = _expandir(sucessores, fronteira_ida, ida, volta)
+            if fronteira_ida is None:
+                return True
+        else:
+            fronteira_volta = _expandir(antecessores, fronteira_volta, volta, ida)
+            if fronteira_volta is None:
+                return True
+
+    return False
+
+
+def _listas_por_linha(valores: np.ndarray, tamanhos: np.ndarray) -> List[List[int]]:
+    if len(tamanhos) == 0:
+        return []
+    return [s.tolist() for s in np.split(valores, np.cumsum(tamanhos)[:-1])]
+
+
+class MotorAlcancabilidade:
+    @instrumentacao.medido()
+    def __init__(self, G: Any, componentes: bool = False):
+        csr = como_csr(G)
+
+        n = len(csr.vertices)
+        self.vertices = csr.vertices
+        self.direcionado = csr.direcionado
+        self._vertice_idx = {v: i for i, v in enumerate(csr.vertices)}
+
+        indices = np.asarray(csr.indices)
+        self._sucessores = _listas_por_linha(indices, np.diff(csr.indptr))
+
+        if self.direcionado:
+            ordem = np.argsort(indices, kind="stable")
+            self._antecessores = _listas_por_linha(csr.origens_idx()[ordem],
+                                                   np.bincount(indices, minlength=n))
+        else:
+            self._antecessores = self._sucessores
+
+        # marca[v] == rodada indica "visto nesta consulta"; evita zerar os arrays a cada busca
+        self._marca_ida = [0] * n
+        self._marca_volta = [0] * n
+        self._rodada = 0
+
+        self._componentes = None
+        if componentes:
+            self._componentes = conexidade.componentes_por_indice(self._sucessores, fortes=True)[0]
+
+    def _nova_rodada(self) -> int:
+        self._rodada += 1
+        return self._rodada
+
+    def _por_componentes(self, s: int, t: int) -> Optional[bool]:
+        comp = self._componentes
+        if comp is None:
+            return None
+        if comp[s] == comp[t]:
+            return True
+        # Tarjan numera as componentes em ordem topologica reversa:
+        # so ha caminho de comp[s] para comp[t] se comp[t] < comp[s]
+        if not self.direcionado or comp[t] > comp[s]:
+            return False
+        return None
+
+    def _bidirecional(self, s: int, t: int) -> bool:
+        rodada = self._nova_rodada()
+        marca_ida, marca_volta = self._marca_ida, self._marca_volta
+        sucessores, antecessores = self._sucessores, self._antecessores
+        comp = self._componentes
+        limite_ida = comp[t] if comp is not None else -1
+        limite_volta = comp[s] if comp is not None else len(self.vertices)
+
+        marca_ida[s] = rodada
+        marca_volta[t] = rodada
+        fronteira_ida, fronteira_volta = [s], [t]
+
+        while fronteira_ida and fronteira_volta:
+            proxima = []
+            if instrumentacao.ativo:
+                ida = len(fronteira_ida) <= len(fronteira_volta)
+                instrumentacao.arestas_percorridas(
+                    "alcancabilidade.MotorAlcancabilidade._bidirecional",
+                    sum(len(sucessores[v]) for v in fronteira_ida) if ida
+                    else sum(len(antecessores[v]) for v in fronteira_volta))
+            if len(fronteira_ida) <= len(fronteira_volta):
+                for v in fronteira_ida:
+                    for w in sucessores[v]:
+                        if marca_volta[w] == rodada:
+                            return True
+                        # de uma componente abaixo da de t nao se chega a t
+                        if marca_ida[w] != rodada and (comp is None or comp[w] >= limite_ida):
+                            marca_ida[w] = rodada
+                            proxima.append(w)
+                fronteira_ida = proxima
+            else:
+                for v in fronteira_volta:
+                    for w in antecessores[v]:
+                        if marca_ida[w] == rodada:
+                            return True
+                        if marca_volta[w] != rodada and (comp is None or comp[w] <= limite_volta):
+                            marca_volta[w] = rodada
+                            proxima.append(w)
+                fronteira_volta = proxima
+
+        return False
+
+    def _alcanca_todos(self, s: int, alvos: set) -> set:
+        # BFS unica a partir de s que para quando todos os alvos foram encontrados
+        rodada = self._nova_rodada()
+        marca, sucessores = self._marca_ida, self._sucessores
+        marca[s] = rodada
+        encontrados = {s} & alvos
+        fronteira = [s]
+
+        while fronteira and len(encontrados) < len(alvos):
+            if instrumentacao.ativo:
+                instrumentacao.arestas_percorridas("alcancabilidade.MotorAlcancabilidade._alcanca_todos",
+                                                   sum(len(sucessores[v]) for v in fronteira))
+            proxima = []
+            for v in fronteira:
+                for w in sucessores[v]:
+                    if marca[w] != rodada:
+                        marca[w] = rodada
+                        proxima.append(w)
+                        if w in alvos:
+                            encontrados.add(w)
+            fronteira = proxima
+
+        return encontrados
+
+    @instrumentacao.medido()
+    def caminho_existe(self, origem: Any, destino: Any) -> bool:
+        if origem not in self._vertice_idx or destino not in self._vertice_idx:
+            return False
+
+        s, t = self._vertice_idx[origem], self._vertice_idx[destino]
+        if s == t:
+            return True
+
+        resposta = self._por_componentes(s, t)
+        if resposta is not None:
+            return resposta
+
+        return self._bidirecional(s, t)
+
+    @instrumentacao.medido()
+    def caminhos_existem(self, pares: Iterable[Tuple[Any, Any]]) -> List[bool]:
+        pares = list(pares)
+        respostas = [False] * len(pares)
+        pendentes = defaultdict(list)
+
+        for pos, (origem, destino) in enumerate(pares):
+            if origem not in self._vertice_idx or destino not in self._vertice_idx:
+                continue
+
+            s, t = self._vertice_idx[origem], self._vertice_idx[destino]
+            resposta = True if s == t else self._por_componentes(s, t)
+            if resposta is None:
+                pendentes[s].append((pos, t))
+            else:
+                respostas[pos] = resposta
+
+        for s, consultas in pendentes.items():
+            if len(consultas) == 1:
+                pos, t = consultas[0]
+                respostas[pos] = self._bidirecional(s, t)
+                continue
+
+            encontrados = self._alcanca_todos(s, {t for _, t in consultas})
+            for pos, t in consultas:
+                respostas[pos] = t in encontrados
+
+        return respostas
+
+    def componentes(self) -> Optional[Dict[Any, int]]:
+        if self._componentes is None:
+            return None
+        return dict(zip(self.vertices, self._componentes))
+
+
+if __name__ == "__main__":
+    from .grafo_utils import Grafo
+
+    print("Teste 1: Busca bidirecional sobre o grafo")
+    g1 = Grafo(vertices=[1, 2, 3, 4, 5], arestas=[(1, 2), (2, 3), (3, 1), (3, 4)])
+    print("Existe caminho de 1 para 4?", g1.caminho_existe(1, 4))
+    print("Existe caminho de 4 para 1?", g1.caminho_existe(4, 1))
+    print("Existe caminho de 1 para 5?", g1.caminho_existe(1, 5))
+    print()
+
+    print("Teste 2: Consultas em lote")
+    motor = MotorAlcancabilidade(g1)
+    pares = [(1, 4), (2, 4), (4, 2), (1, 3), (5, 5), (1, 'X')]
+    print("Pares:", pares)
+    print("Respostas:", motor.caminhos_existem(pares))
+    print()
+
+    print("Teste 3: Rotulos de componentes fortes")
+    motor = MotorAlcancabilidade(g1, componentes=True)
+    print("Componentes:", motor.componentes())
+    print("Existe caminho de 2 para 1?", motor.caminho_existe(2, 1))
+    print("Existe caminho de 4 para 3?", motor.caminho_existe(4, 3))
+    print()
+
+    print("Teste 4: Grafo nao direcionado")
+    g2 = Grafo(vertices=['A', 'B', 'C', 'D'], direcionado=False, arestas=[('A', 'B'), ('C', 'D')])
+    print("Respostas:", g2.caminhos_existem([('A', 'B'), ('B', 'A'), ('A', 'D'), ('D', 'C')]))
@@ -1,132 +1,19 @@
-from copy import deepcopy
 import numpy as np
-from typing import List, Dict, Tuple, Union, Any, Optional
+from typing import List, Tuple, Union, Any, Optional
 
-
-class Grafo:
-    def __init__(self, vertices: List[Union[str, int]], 
-                 arestas: Union[List[Tuple], Dict[Tuple, Union[int, float]]], 
-                 direcionado: bool = True):
-        
-        self.direcionado = direcionado
-        
-        for v in vertices:
-            if not isinstance(v, (str, int)):
-                raise ValueError("Os labels dos vertices devem ser inteiros ou strings")
-        
-        self.vertices = vertices
-        self._vertices_set = set(vertices)
-        
-        if isinstance(arestas, list):
-            self.arestas = []
-            self.ponderado = False
-            
-            for a in arestas:
-                if not isinstance(a, tuple) or len(a) != 2:
-                    raise ValueError("Arestas devem ser tuplas de tamanho 2")
-                
-                u, v = a
-                if u not in self._vertices_set or v not in self._vertices_set:
-                    raise ValueError(f"Aresta {a} contem vertices nao existentes")
-                
-                if not direcionado:
-                    self.arestas.extend([(u, v), (v, u)])
-                else:
-                    self.arestas.append((u, v))
-        
-        elif isinstance(arestas, dict):
-            self.arestas = {}
-            self.ponderado = True
-            
-            for aresta, valor in arestas.items():
-                if not isinstance(aresta, tuple) or len(aresta) != 2:
-                    raise ValueError("Arestas devem ser tuplas de tamanho 2")
-                
-                u, v = aresta
-                if u not in self._vertices_set or v not in self._vertices_set:
-                    raise ValueError(f"Aresta {aresta} contem vertices nao existentes")
-                
-                if not isinstance(valor, (int, float)):
-                    raise ValueError("Pesos das arestas devem ser numericos")
-                
-                if not direcionado:
-                    self.arestas[aresta] = valor
-                    self.arestas[(v, u)] = valor
-                else:
-                    self.arestas[aresta] = valor
-        
-        else:
-            raise ValueError("Arestas devem ser list ou dict")
-    
-    def graus_de_um_vertice(self, v: Union[str, int]) -> Tuple[int, int]:
-        if v not in self._vertices_set:
-            raise ValueError(f"Vertice {v} nao existe no grafo")
-        
-        entrada = saida = 0
-        
-        if isinstance(self.arestas, list):
-            for u, w in self.arestas:
-                if u == v:
-                    saida += 1
-                if w == v:
-                    entrada += 1
-        else:
-            for (u, w) in self.arestas:
-                if u == v:
-                    saida += 1
-                if w == v:
-                    entrada += 1
-        
-        return entrada, saida
-    
-    def matriz_de_adjacencias(self) -> List[List[int]]:
-        tam = len(self.vertices)
-        matriz = [[0 for _ in range(tam)] for _ in range(tam)]
-        
-        vertice_idx = {v: i for i, v in enumerate(self.vertices)}
-        
-        if isinstance(self.arestas, list):
-            for v1, v2 in self.arestas:
-                i1, i2 = vertice_idx[v1], vertice_idx[v2]
-                matriz[i1][i2] = 1
-        else:
-            for (v1, v2), peso in self.arestas.items():
-                i1, i2 = vertice_idx[v1], vertice_idx[v2]
-                matriz[i1][i2] = peso
-        
-        return matriz
-    
-    def conexo_por_mm(self, m: Optional[List[List[int]]] = None, 
-                      ignorar_indices: Optional[List[int]] = None) -> bool:
-        tam = len(self.vertices)
-        R = np.zeros((tam, tam), dtype=int)
-        
-        if m is None:
-            m = np.array(self.matriz_de_adjacencias())
-        else:
-            m = np.array(m)
-        
-        if ignorar_indices is None:
-            ignorar_indices = []
-
-        for i in range(1, tam + 1):
-            R += np.linalg.matrix_power(m, i)
-
-        np.fill_diagonal(R, 1)
-
-        for i in ignorar_indices:
-            for j in range(tam):
-                R[i][j] = 1
-                R[j][i] = 1
-
-        return np.all(R > 0)
+from . import conexidade
+from . import instrumentacao
+from .grafo_csr import como_csr
+from .grafo_utils import Grafo
+from .pontes import PontesIncrementais, arestas_nao_direcionadas
 
 
+@instrumentacao.medido()
 def verificar_euleriano(G: Grafo) -> Tuple[bool, bool, List]:
     if G.direcionado:
         raise ValueError("Algoritmo de Fleury funciona apenas para grafos nao direcionados")
     
-    if not G.conexo_por_mm():
+    if not conexidade.eh_conexo(G):
         return False, False, []
     
     vertices_impares = []
@@ -141,6 +28,7 @@ def verificar_euleriano(G: Grafo) -> Tuple[bool, bool, List]:
     return tem_circuito, tem_caminho, vertices_impares
 
 
+@instrumentacao.medido()
 def alg_fleury(G: Grafo, vertice_inicial: Optional[Union[str, int]] = None) -> Union[List[Tuple], bool]:
     if G.direcionado:
         raise ValueError("Algoritmo funciona apenas para grafos nao direcionados")
@@ -157,175 +45,153 @@ def alg_fleury(G: Grafo, vertice_inicial: Optional[Union[str, int]] = None) -> U
             vertice_inicial = G.vertices[0]
     elif vertice_inicial not in G._vertices_set:
         raise ValueError(f"Vertice inicial {vertice_inicial} nao existe")
+    elif tem_caminho and vertice_inicial not in vertices_impares:
+        return False
     
+    # "esta aresta e ponte?" vem do conjunto de pontes mantido a cada remocao,
+    # em vez de uma busca de conexidade para cada vizinho candidato
+    pontes = PontesIncrementais(G)
     resposta = []
-    tam = len(G.vertices)
-    matriz_adj = np.array(G.matriz_de_adjacencias())
-    
-    vertice_idx = {v: i for i, v in enumerate(G.vertices)}
-    idx_vertice = {i: v for v, i in vertice_idx.items()}
-    
-    current_idx = vertice_idx[vertice_inicial]
-    vertices_isolados = []
-    
-    total_arestas = np.sum(matriz_adj) // 2
+    current_idx = G.vertices.index(vertice_inicial)
+    if tem_caminho:
+        final_idx = G.vertices.index(next(v for v in vertices_impares if v != vertice_inicial))
+    else:
+        final_idx = current_idx
     
-    while len(resposta) < total_arestas:
-        vizinhos = []
-        for i in range(tam):
-            if matriz_adj[current_idx][i] > 0:
-                vizinhos.append(i)
-        
-        if not vizinhos:
+    while pontes.arestas_restantes() > 0:
+        incidentes = pontes.incidentes(current_idx)
+        if not incidentes:
             return False
         
-        proximo_idx = None
-        
-        if len(vizinhos) == 1:
-            proximo_idx = vizinhos[0]
-        else:
-            for idx in vizinhos:
-                matriz_temp = matriz_adj.copy()
-                matriz_temp[current_idx][idx] = 0
-                matriz_temp[idx][current_idx] = 0
-                
-                if eh_conexo_ignorando_isolados(matriz_temp, vertices_isolados + [current_idx]):
-                    proximo_idx = idx
-                    break
-            
-            if proximo_idx is None:
-                proximo_idx = vizinhos[0]
-        
-        matriz_adj[current_idx][proximo_idx] -= 1
-        matriz_adj[proximo_idx][current_idx] -= 1
-        
-        resposta.append((idx_vertice[current_idx], idx_vertice[proximo_idx]))
-        
-        if np.sum(matriz_adj[current_idx]) == 0:
-            vertices_isolados.append(current_idx)
+        # vizinho de menor posicao primeiro; uma ponte so e atravessada se nao houver outra
+        # saida. No que resta do grafo so o vertice atual e o final tem grau impar, e cada
+        # lado de uma ponte fica com um deles: com os dois no mesmo vertice nao ha pontes,
+        # e fora isso no maximo uma aresta do vertice atual e ponte (uma consulta basta)
+        candidatas = sorted(incidentes, key=lambda e: (incidentes[e], e))
+        escolhida = candidatas[0]
+        if len(candidatas) > 1 and current_idx != final_idx and pontes.ponte(escolhida):
+            escolhida = candidatas[1]
+        proximo_idx = incidentes[escolhida]
         
+        pontes.remover(escolhida)
+        resposta.append((G.vertices[current_idx], G.vertices[proximo_idx]))
         current_idx = proximo_idx
     
     return resposta
 
 
-def eh_conexo_ignorando_isolados(matriz: np.ndarray, isolados: List[int]) -> bool:
-    tam = matriz.shape[0]
-    vertices_ativos = [i for i in range(tam) if i not in isolados and np.sum(matriz[i]) > 0]
-    
-    if len(vertices_ativos) <= 1:
-        return True
-    
-    visitados = set()
-    fila = [vertices_ativos[0]]
-    
-    while fila:
-        atual = fila.pop(0)
-        if atual in visitados:
-            continue
-        
-        visitados.add(atual)
-        
-        for i in range(tam):
-            if matriz[atual][i] > 0 and i not in visitados and i in vertices_ativos:
-                fila.append(i)
-    
-    return len(visitados) == len(vertices_ativos)
-
-
 def alg_fleury_otimizado(G: Grafo) -> Union[List[Tuple], bool]:
     tem_circuito, tem_caminho, vertices_impares = verificar_euleriano(G)
     
     if not tem_circuito and not tem_caminho:
         return False
     
-    arestas_dict = {}
-    for aresta in G.arestas:
-        if isinstance(G.arestas, list):
-            chave = tuple(sorted(aresta))
-            arestas_dict[chave] = arestas_dict.get(chave, 0) + 1
-        else:
-            chave = tuple(sorted(aresta))
-            arestas_dict[chave] = arestas_dict.get(chave, 0) + 1
+    vertice_inicial = vertices_impares[0] if tem_caminho else G.vertices[0]
+    return alg_hierholzer(G, vertice_inicial)
+
+
+def _arestas_por_indice(G: Any) -> Tuple[np.ndarray, np.ndarray]:
+    # o CSR do Grafo fica em cache, entao nao ha nova leitura das arestas a cada chamada
+    csr = como_csr(G)
+    origens = np.repeat(np.arange(len(csr.vertices), dtype=np.int64), np.diff(csr.indptr))
+    return origens, np.asarray(csr.indices, dtype=np.int64)
+
+
+@instrumentacao.medido()
+def alg_hierholzer(G: Grafo, vertice_inicial: Optional[Union[str, int]] = None) -> Union[List[Tuple], bool]:
+    n = len(G.vertices)
+    if G.direcionado:
+        origens, destinos = _arestas_por_indice(G)
+    else:
+        # uma entrada por aresta nao direcionada, paralelas e lacos inclusive
+        origens, destinos = arestas_nao_direcionadas(G)
     
-    vertice_atual = vertices_impares[0] if tem_caminho else G.vertices[0]
-    caminho = []
-    arestas_temp = arestas_dict.copy()
+    total_arestas = len(origens)
+    grau_saida = np.bincount(origens, minlength=n)
+    grau_entrada = np.bincount(destinos, minlength=n)
     
-    while any(count > 0 for count in arestas_temp.values()):
-        vizinhos = []
+    if G.direcionado:
+        saldo = grau_saida - grau_entrada
+        inicios = np.flatnonzero(saldo == 1)
+        if np.count_nonzero(saldo) > 2 or len(inicios) > 1 or np.any(np.abs(saldo) > 1):
+            return False
+        # circuito (nenhum saldo) ou caminho de inicios[0] ate o vertice com saldo -1
+        obrigatorio = inicios[0] if len(inicios) == 1 else None
         
-        for (u, v), count in arestas_temp.items():
-            if count > 0:
-                if u == vertice_atual:
-                    vizinhos.append((v, (u, v)))
-                elif v == vertice_atual:
-                    vizinhos.append((u, (u, v)))
+        ordem = np.argsort(origens, kind="stable")
+        incidencias = ordem
+        contagem = grau_saida
+    else:
+        grau = grau_saida + grau_entrada
+        impares = np.flatnonzero(grau % 2 == 1)
+        if len(impares) not in (0, 2):
+            return False
+        obrigatorio = impares if len(impares) == 2 else None
         
-        if not vizinhos:
+        pontas = np.concatenate((origens, destinos))
+        ordem = np.argsort(pontas, kind="stable")
+        incidencias = ordem % max(total_arestas, 1)
+        contagem = grau
+    
+    if total_arestas == 0:
+        return []
+    
+    vertice_idx = {v: i for i, v in enumerate(G.vertices)}
+    if vertice_inicial is not None:
+        if vertice_inicial not in vertice_idx:
+            raise ValueError(f"Vertice inicial {vertice_inicial} nao existe")
+        inicio = vertice_idx[vertice_inicial]
+        if obrigatorio is not None and inicio not in np.atleast_1d(obrigatorio):
             return False
+    elif obrigatorio is not None:
+        inicio = int(np.atleast_1d(obrigatorio)[0])
+    else:
+        inicio = int(np.flatnonzero(contagem > 0)[0])
+    
+    if contagem[inicio] == 0:
+        return False
+    
+    fim = np.cumsum(contagem)
+    # memoryview devolve int do Python na indexacao, bem mais rapido que np.int64
+    ponteiro = (fim - contagem).tolist()
+    fim = memoryview(fim.astype(np.int64))
+    incidencias = memoryview(incidencias.astype(np.int64))
+    ponta_u = memoryview(origens.astype(np.int64))
+    ponta_v = memoryview(destinos.astype(np.int64))
+    usada = bytearray(total_arestas)
+    direcionado = G.direcionado
+    
+    pilha = [inicio]
+    sequencia = []
+    
+    while pilha:
+        v = pilha[-1]
+        p = ponteiro[v]
+        limite = fim[v]
         
-        if len(vizinhos) == 1:
-            proximo, aresta_chave = vizinhos[0]
-        else:
-            proximo = None
-            aresta_escolhida = None
-            
-            for viz, aresta_chave in vizinhos:
-                arestas_temp[aresta_chave] -= 1
-                
-                if verifica_conectividade_rapida(vertice_atual, arestas_temp, G.vertices):
-                    proximo = viz
-                    aresta_escolhida = aresta_chave
-                    arestas_temp[aresta_chave] += 1
-                    break
-                
-                arestas_temp[aresta_chave] += 1
-            
-            if proximo is None:
-                proximo, aresta_escolhida = vizinhos[0]
-            else:
-                aresta_chave = aresta_escolhida
+        while p < limite and usada[incidencias[p]]:
+            p += 1
         
-        caminho.append((vertice_atual, proximo))
-        arestas_temp[aresta_chave] -= 1
-        vertice_atual = proximo
-    
-    return caminho
-
-
-def verifica_conectividade_rapida(excluir_vertice: Any, arestas: Dict, vertices: List) -> bool:
-    vertices_com_arestas = set()
-    
-    for (u, v), count in arestas.items():
-        if count > 0:
-            if u != excluir_vertice:
-                vertices_com_arestas.add(u)
-            if v != excluir_vertice:
-                vertices_com_arestas.add(v)
-    
-    if len(vertices_com_arestas) <= 1:
-        return True
-    
-    inicio = next(iter(vertices_com_arestas))
-    visitados = set()
-    fila = [inicio]
-    
-    while fila:
-        atual = fila.pop(0)
-        if atual in visitados:
+        if p == limite:
+            ponteiro[v] = p
+            sequencia.append(pilha.pop())
             continue
         
-        visitados.add(atual)
+        e = incidencias[p]
+        ponteiro[v] = p + 1
+        usada[e] = 1
         
-        for (u, v), count in arestas.items():
-            if count > 0:
-                if u == atual and v not in visitados and v != excluir_vertice:
-                    fila.append(v)
-                elif v == atual and u not in visitados and u != excluir_vertice:
-                    fila.append(u)
-    
-    return len(visitados) == len(vertices_com_arestas)
+        if direcionado:
+            pilha.append(ponta_v[e])
+        else:
+            pilha.append(ponta_u[e] ^ ponta_v[e] ^ v)
+    
+    if len(sequencia) != total_arestas + 1:
+        return False
+    
+    sequencia.reverse()
+    rotulos = G.vertices
+    return [(rotulos[a], rotulos[b]) for a, b in zip(sequencia, sequencia[1:])]
 
 
 def imprimir_caminho_euleriano(caminho: List[Tuple]) -> str:
@@ -406,4 +272,21 @@ if __name__ == "__main__":
     resultado4 = alg_fleury_otimizado(g4)
     if resultado4:
         print("Caminho com multiplas arestas:")
-        print(imprimir_caminho_euleriano(resultado4))
\ No newline at end of file
+        print(imprimir_caminho_euleriano(resultado4))
+    
+    print("\n" + "="*50 + "\n")
+    
+    print("Teste 5: Hierholzer em grafo direcionado")
+    g5 = Grafo(
+        vertices=['a', 'b', 'c', 'd'],
+        direcionado=True,
+        arestas=[('a', 'b'), ('b', 'c'), ('c', 'a'), ('a', 'd'), ('d', 'a')]
+    )
+    
+    resultado5 = alg_hierholzer(g5)
+    if resultado5:
+        print("Circuito euleriano direcionado:")
+        print(imprimir_caminho_euleriano(resultado5))
+    
+    print("Hierholzer no grafo com multiplas arestas:")
+    print(imprimir_caminho_euleriano(alg_hierholzer(g4)))
\ No newline at end of file
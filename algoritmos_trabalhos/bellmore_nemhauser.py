@@ -3,65 +3,17 @@
 # Saida: Um ciclo hamiltoniano (possivelmente) de custo minimo
 
 import numpy as np
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from math import comb
+from multiprocessing import shared_memory
 from typing import List, Dict, Tuple, Union, Any, Optional
 
-
-class Grafo:
-    def __init__(self, vertices: List[Union[str, int]], 
-                 arestas: Union[List[Tuple], Dict[Tuple, Union[int, float]]], 
-                 direcionado: bool = True):
-        
-        self.direcionado = direcionado
-        
-        for v in vertices:
-            if not isinstance(v, (str, int)):
-                raise ValueError("Os labels dos vertices devem ser inteiros ou strings")
-        
-        self.vertices = vertices
-        self._vertices_set = set(vertices)
-        
-        if isinstance(arestas, list):
-            self.arestas = []
-            self.ponderado = False
-            
-            for a in arestas:
-                if not isinstance(a, tuple) or len(a) != 2:
-                    raise ValueError("Arestas devem ser tuplas de tamanho 2")
-                
-                u, v = a
-                if u not in self._vertices_set or v not in self._vertices_set:
-                    raise ValueError(f"Aresta {a} contem vertices nao existentes")
-                
-                if not direcionado:
-                    self.arestas.extend([(u, v), (v, u)])
-                else:
-                    self.arestas.append((u, v))
-        
-        elif isinstance(arestas, dict):
-            self.arestas = {}
-            self.ponderado = True
-            
-            for aresta, valor in arestas.items():
-                if not isinstance(aresta, tuple) or len(aresta) != 2:
-                    raise ValueError("Arestas devem ser tuplas de tamanho 2")
-                
-                u, v = aresta
-                if u not in self._vertices_set or v not in self._vertices_set:
-                    raise ValueError(f"Aresta {aresta} contem vertices nao existentes")
-                
-                if not isinstance(valor, (int, float)):
-                    raise ValueError("Pesos das arestas devem ser numericos")
-                
-                if not direcionado:
-                    self.arestas[aresta] = valor
-                    self.arestas[(v, u)] = valor
-                else:
-                    self.arestas[aresta] = valor
-        
-        else:
-            raise ValueError("Arestas devem ser list ou dict")
+from . import instrumentacao
+from .grafo_csr import como_csr
+from .grafo_utils import Grafo
 
 
+@instrumentacao.medido()
 def bellmore_nemhauser(G: Grafo, vertice_inicial: Optional[Union[str, int]] = None) -> Union[List, bool]:
     if not G.ponderado:
         raise ValueError("Algoritmo requer grafo ponderado")
@@ -71,19 +23,22 @@ def bellmore_nemhauser(G: Grafo, vertice_inicial: Optional[Union[str, int]] = No
     
     vertices = G.vertices
     arestas = G.arestas
+    # a lista de adjacencias do grafo segue a ordem das arestas: mesmo desempate, O(grau) por passo
+    adjacencias = G.lista_adjacencias()
     
-    v = vertice_inicial if vertice_inicial and vertice_inicial in vertices else vertices[0]
+    v = vertice_inicial if vertice_inicial is not None and vertice_inicial in G._vertices_set else vertices[0]
     v_inicial = v
     H = [v]
+    visitados = {v}
     custo_total = 0
     
     while len(H) < len(vertices):
         menor_custo = float("inf")
         menor_vertice = None
         
-        for u, w in arestas:
-            if u == v and w not in H and arestas[(u, w)] < menor_custo:
-                menor_custo = arestas[(u, w)]
+        for w in adjacencias[v]:
+            if w not in visitados and arestas[(v, w)] < menor_custo:
+                menor_custo = arestas[(v, w)]
                 menor_vertice = w
         
         if menor_vertice is None:
@@ -91,6 +46,7 @@ def bellmore_nemhauser(G: Grafo, vertice_inicial: Optional[Union[str, int]] = No
         
         v = menor_vertice
         H.append(v)
+        visitados.add(v)
         custo_total += menor_custo
     
     if (H[-1], v_inicial) not in arestas:
@@ -102,7 +58,36 @@ def bellmore_nemhauser(G: Grafo, vertice_inicial: Optional[Union[str, int]] = No
     return H, custo_total
 
 
-def bellmore_nemhauser_melhorado(G: Grafo, vertice_inicial: Optional[Union[str, int]] = None) -> Union[Tuple[List, float], bool]:
+def _vizinho_mais_proximo_em_lote(custos: np.ndarray, inicios: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    n = custos.shape[0]
+    linhas = np.arange(len(inicios))
+    
+    visitados = np.zeros((len(inicios), n), dtype=bool)
+    visitados[linhas, inicios] = True
+    ordens = np.empty((len(inicios), n), dtype=np.int64)
+    ordens[:, 0] = inicios
+    totais = np.zeros(len(inicios), dtype=np.float64)
+    atuais = inicios
+    
+    for passo in range(1, n):
+        candidatos = custos[atuais]
+        candidatos[visitados] = np.inf
+        proximos = np.argmin(candidatos, axis=1)
+        
+        # se so restam infinitos, o total vira inf e a tentativa e descartada
+        totais += candidatos[linhas, proximos]
+        visitados[linhas, proximos] = True
+        ordens[:, passo] = proximos
+        atuais = proximos
+    
+    totais += custos[atuais, inicios]
+    return ordens, totais
+
+
+@instrumentacao.medido()
+def bellmore_nemhauser_melhorado(G: Grafo, vertice_inicial: Optional[Union[str, int]] = None,
+                                 custos: Optional[np.ndarray] = None,
+                                 lote: int = 256) -> Union[Tuple[List, float], bool]:
     if not G.ponderado:
         raise ValueError("Algoritmo requer grafo ponderado")
     
@@ -110,39 +95,209 @@ def bellmore_nemhauser_melhorado(G: Grafo, vertice_inicial: Optional[Union[str,
     if n < 3:
         return False
     
-    melhor_ciclo = None
+    if vertice_inicial is not None:
+        if vertice_inicial not in G._vertices_set:
+            return False
+        inicios = np.array([G.vertices.index(vertice_inicial)], dtype=np.int64)
+    else:
+        inicios = np.arange(n, dtype=np.int64)
+    
+    matriz_externa = custos is not None
+    if custos is None:
+        custos = matriz_de_custos(G)
+    
+    melhor_ordem = None
     melhor_custo = float("inf")
     
-    vertices_tentativa = [vertice_inicial] if vertice_inicial else G.vertices
+    for ini in range(0, len(inicios), lote):
+        ordens, totais = _vizinho_mais_proximo_em_lote(custos, inicios[ini:ini + lote])
+        k = int(np.argmin(totais))
+        if totais[k] < melhor_custo:
+            melhor_custo = float(totais[k])
+            melhor_ordem = ordens[k]
+    
+    if melhor_ordem is None:
+        return False
+    
+    melhor_ciclo = [G.vertices[i] for i in melhor_ordem.tolist()]
+    melhor_ciclo.append(melhor_ciclo[0])
+    
+    if matriz_externa:
+        return melhor_ciclo, melhor_custo
+    return melhor_ciclo, calcular_custo_ciclo(G, melhor_ciclo)
+
+
+_memoria_trabalhador = None
+_custos_trabalhador = None
+
+
+def _iniciar_trabalhador(nome: str, forma: Tuple[int, int], dtype: str) -> None:
+    global _memoria_trabalhador, _custos_trabalhador
+    _memoria_trabalhador = shared_memory.SharedMemory(name=nome)
+    _custos_trabalhador = np.ndarray(forma, dtype=dtype, buffer=_memoria_trabalhador.buf)
+
+
+def _avaliar_bloco(inicios: np.ndarray, limite_custo: Optional[float]) -> Tuple[Tuple, Optional[Tuple]]:
+    ordens, totais = _vizinho_mais_proximo_em_lote(_custos_trabalhador, inicios)
+    
+    k = int(np.argmin(totais))
+    melhor = (float(totais[k]), ordens[k])
+    
+    abaixo = None
+    if limite_custo is not None:
+        dentro = np.flatnonzero(totais <= limite_custo)
+        if len(dentro):
+            abaixo = (float(totais[dentro[0]]), ordens[dentro[0]])
+    
+    return melhor, abaixo
+
+
+@instrumentacao.medido()
+def bellmore_nemhauser_paralelo(G: Grafo, trabalhadores: Optional[int] = None,
+                                tamanho_bloco: int = 64,
+                                limite_custo: Optional[float] = None,
+                                custos: Optional[np.ndarray] = None) -> Union[Tuple[List, float], bool]:
+    if not G.ponderado:
+        raise ValueError("Algoritmo requer grafo ponderado")
+    
+    n = len(G.vertices)
+    if n < 3:
+        return False
+    
+    matriz_externa = custos is not None
+    if custos is None:
+        custos = matriz_de_custos(G)
     
-    for v_inicial in vertices_tentativa:
-        v = v_inicial
-        H = [v]
-        custo = 0
-        visitados = {v}
+    memoria = shared_memory.SharedMemory(create=True, size=max(custos.nbytes, 1))
+    try:
+        compartilhada = np.ndarray(custos.shape, dtype=custos.dtype, buffer=memoria.buf)
+        compartilhada[:] = custos
         
-        valido = True
-        while len(H) < n:
-            candidatos = [(w, G.arestas[(v, w)]) for v2, w in G.arestas 
-                         if v2 == v and w not in visitados]
-            
-            if not candidatos:
-                valido = False
-                break
-            
-            proximo, peso = min(candidatos, key=lambda x: x[1])
-            H.append(proximo)
-            visitados.add(proximo)
-            custo += peso
-            v = proximo
+        blocos = [np.arange(i, min(i + tamanho_bloco, n), dtype=np.int64)
+                  for i in range(0, n, tamanho_bloco)]
+        resultados = {}
+        # com limite_custo, vale o primeiro bloco (na ordem dos vertices) que o atinge;
+        # blocos posteriores a ele podem ser cancelados sem mudar a resposta
+        corte = len(blocos)
         
-        if valido and (H[-1], v_inicial) in G.arestas:
-            custo += G.arestas[(H[-1], v_inicial)]
-            if custo < melhor_custo:
-                melhor_custo = custo
-                melhor_ciclo = H + [v_inicial]
+        with ProcessPoolExecutor(max_workers=trabalhadores, initializer=_iniciar_trabalhador,
+                                 initargs=(memoria.name, custos.shape, custos.dtype.str)) as executor:
+            pendentes = {executor.submit(_avaliar_bloco, bloco, limite_custo): i
+                         for i, bloco in enumerate(blocos)}
+            
+            while pendentes:
+                prontos, _ = wait(pendentes, return_when=FIRST_COMPLETED)
+                for futuro in prontos:
+                    i = pendentes.pop(futuro)
+                    resultados[i] = futuro.result()
+                    if resultados[i][1] is not None and i < corte:
+                        corte = i
+                
+                for futuro, i in list(pendentes.items()):
+                    if i > corte and futuro.cancel():
+                        del pendentes[futuro]
+    finally:
+        memoria.close()
+        memoria.unlink()
+    
+    if corte < len(blocos):
+        custo, ordem = resultados[corte][1]
+    else:
+        custo, ordem = min((resultados[i][0] for i in range(len(blocos))), key=lambda r: r[0])
     
-    return (melhor_ciclo, melhor_custo) if melhor_ciclo else False
+    if not np.isfinite(custo):
+        return False
+    
+    ciclo = [G.vertices[i] for i in ordem.tolist()]
+    ciclo.append(ciclo[0])
+    
+    if matriz_externa:
+        return ciclo, custo
+    return ciclo, calcular_custo_ciclo(G, ciclo)
+
+
+@instrumentacao.medido()
+def matriz_de_custos(G: Grafo, dtype: Any = np.float64) -> np.ndarray:
+    # usa o CSR em cache do grafo em vez de percorrer as arestas de novo
+    csr = como_csr(G)
+    n = len(csr.vertices)
+    custos = np.full((n, n), np.inf, dtype=dtype)
+    
+    pesos = 1 if csr.weights is None else csr.weights
+    custos[csr.origens_idx(), csr.indices] = pesos
+    return custos
+
+
+@instrumentacao.medido()
+def held_karp(G: Grafo, vertice_inicial: Optional[Union[str, int]] = None,
+              memoria_maxima: Optional[int] = None,
+              dtype: Any = np.float32) -> Union[Tuple[List, float], bool]:
+    if not G.ponderado:
+        raise ValueError("Algoritmo requer grafo ponderado")
+    
+    n = len(G.vertices)
+    if n < 3:
+        return False
+    
+    k = n - 1
+    if k > 127:
+        raise ValueError("Held-Karp suporta no maximo 128 vertices")
+    
+    # dp[mascara, j]: menor custo saindo do inicio, visitando `mascara` e terminando em j;
+    # alem de dp e pai: popcount (int8), a maior camada de mascaras e seu filtro por j
+    # (int64) e os temporarios de um bloco
+    bloco = 1 << 16
+    tamanho_valor = np.dtype(dtype).itemsize
+    maior_camada = min(comb(k, k // 2), 1 << k)
+    estimativa = ((1 << k) * k * (tamanho_valor + np.dtype(np.int8).itemsize) + (1 << k)
+                  + 2 * 8 * maior_camada + min(bloco, maior_camada) * (k * tamanho_valor + 2 * 8))
+    if memoria_maxima is not None and estimativa > memoria_maxima:
+        raise ValueError(f"Held-Karp precisaria de {estimativa} bytes (limite: {memoria_maxima})")
+    
+    v_inicial = vertice_inicial if vertice_inicial is not None and vertice_inicial in G._vertices_set else G.vertices[0]
+    inicio = G.vertices.index(v_inicial)
+    outros = [i for i in range(n) if i != inicio]
+    
+    custos = matriz_de_custos(G, dtype)
+    entre = custos[np.ix_(outros, outros)]
+    
+    dp = np.full((1 << k, k), np.inf, dtype=dtype)
+    pai = np.full((1 << k, k), -1, dtype=np.int8)
+    dp[1 << np.arange(k), np.arange(k)] = custos[inicio, outros]
+    
+    # popcount por duplicacao: as mascaras com o bit b ligado repetem as de baixo + 1
+    popcount = np.zeros(1, dtype=np.int8)
+    for _ in range(k):
+        popcount = np.concatenate((popcount, popcount + 1))
+    
+    for tamanho in range(2, k + 1):
+        camada = np.flatnonzero(popcount == tamanho)
+        for j in range(k):
+            com_j = camada[(camada >> j) & 1 == 1]
+            for ini in range(0, len(com_j), bloco):
+                sel = com_j[ini:ini + bloco]
+                candidatos = dp[sel ^ (1 << j)] + entre[:, j]
+                melhor = np.argmin(candidatos, axis=1)
+                dp[sel, j] = candidatos[np.arange(len(sel)), melhor]
+                pai[sel, j] = melhor
+    
+    completa = (1 << k) - 1
+    fechamento = dp[completa] + custos[outros, inicio]
+    ultimo = int(np.argmin(fechamento))
+    
+    if not np.isfinite(fechamento[ultimo]):
+        return False
+    
+    caminho = []
+    mascara, j = completa, ultimo
+    while j != -1:
+        caminho.append(outros[j])
+        anterior = int(pai[mascara, j])
+        mascara ^= 1 << j
+        j = anterior
+    
+    ciclo = [G.vertices[inicio]] + [G.vertices[i] for i in reversed(caminho)] + [G.vertices[inicio]]
+    return ciclo, calcular_custo_ciclo(G, ciclo)
 
 
 def verificar_ciclo_hamiltoniano(G: Grafo, ciclo: List) -> bool:
@@ -228,4 +383,20 @@ if __name__ == "__main__":
         resultado = bellmore_nemhauser(g1, v)
         if resultado:
             ciclo, custo = resultado
-            print(f"Iniciando em '{v}': custo = {custo}")
\ No newline at end of file
+            print(f"Iniciando em '{v}': custo = {custo}")
+    
+    print("\nTeste 6: Held-Karp (ciclo otimo)")
+    resultado_hk = held_karp(g1)
+    if resultado_hk:
+        ciclo, custo = resultado_hk
+        print(f"Ciclo otimo: {ciclo}")
+        print(f"Custo otimo: {custo}")
+        print(f"Ciclo valido: {verificar_ciclo_hamiltoniano(g1, ciclo)}")
+    print(f"Held-Karp grafo sem ciclo: {held_karp(g3)}")
+    
+    print("\nTeste 7: Versao melhorada em paralelo")
+    resultado_paralelo = bellmore_nemhauser_paralelo(g1, trabalhadores=2, tamanho_bloco=2)
+    if resultado_paralelo:
+        ciclo, custo = resultado_paralelo
+        print(f"Melhor ciclo: {ciclo}")
+        print(f"Custo: {custo}")
\ No newline at end of file
@@ -0,0 +1,343 @@
+# Medicao de desempenho dos algoritmos com grafos sinteticos reprodutiveis
+# Geradores com semente (Erdos-Renyi, grade, multigrafo euleriano, caixeiro viajante
+# euclidiano e lei de potencia), varredura de tamanhos por operacao e relatorio em JSON
+# com tempo (mediana e minimo das repeticoes) e pico de memoria (tracemalloc).
+# Com --base o resultado e comparado com um JSON salvo antes e as regressoes acima da
+# tolerancia fazem o processo sair com codigo 1.
+#
+# python -m algoritmos_trabalhos.benchmark --saida atual.json
+# python -m algoritmos_trabalhos.benchmark --completo --operacoes alg_fleury dijkstra --base base.json
+
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+import numpy as np
+from typing import List, Dict, Tuple, Any, Callable, Optional
+
+from . import conexidade
+from . import caminhos_minimos
+from . import isomorfismo
+from . import k_conexidade
+from . import operacoes
+from . import todos_os_pares
+from .grafo_utils import Grafo
+from .alg_fleury import alg_fleury, alg_fleury_otimizado
+from .bellmore_nemhauser import bellmore_nemhauser, bellmore_nemhauser_melhorado, held_karp
+from .busca_local import melhorar_ciclo
+from .fecho_transitivo import IndiceAlcancabilidade
+
+SEMENTE = 0
+REPETICOES = 3
+TOLERANCIA = 0.25
+
+
+def gerar_erdos_renyi(n: int, grau_medio: float = 4.0, semente: int = SEMENTE,
+                      direcionado: bool = False, ponderado: bool = False) -> Grafo:
+    # G(n, p) com p = grau_medio / (n - 1), sorteando m ~ Binomial pares distintos
+    rng = np.random.default_rng(semente)
+    pares = n * (n - 1) if direcionado else n * (n - 1) // 2
+    m = rng.binomial(pares, min(1.0, grau_medio / max(n - 1, 1))) if pares else 0
+
+    origens = rng.integers(0, n, 2 * m + 16)
+    destinos = rng.integers(0, n, 2 * m + 16)
+    if not direcionado:
+        origens, destinos = np.minimum(origens, destinos), np.maximum(origens, destinos)
+    chaves = np.unique((origens * n + destinos)[origens != destinos])
+    chaves = rng.permutation(chaves)[:m]
+    origens, destinos = chaves // n, chaves % n
+
+    pesos = rng.integers(1, 100, len(origens)).astype(np.float64) if ponderado else None
+    return Grafo.de_arrays(list(range(n)), origens, destinos, pesos, direcionado)
+
+
+def gerar_grade(lado: int, semente: int = SEMENTE, ponderado: bool = True) -> Grafo:
+    # grade lado x lado nao direcionada; o vertice (i, j) e o inteiro i * lado + j
+    rng = np.random.default_rng(semente)
+    ids = np.arange(lado * lado).reshape(lado, lado)
+    origens = np.concatenate([ids[:, :-1].ravel(), ids[:-1, :].ravel()])
+    destinos = np.concatenate([ids[:, 1:].ravel(), ids[1:, :].ravel()])
+
+    pesos = rng.integers(1, 10, len(origens)).astype(np.float64) if ponderado else None
+    return Grafo.de_arrays(list(range(lado * lado)), origens, destinos, pesos, direcionado=False)
+
+
+def gerar_euleriano(n: int, arestas: Optional[int] = None, semente: int = SEMENTE,
+                    multiplas: bool = True) -> Grafo:
+    # (multi)grafo nao direcionado, conexo e com todos os graus pares: um ciclo por todos os
+    # vertices mais ciclos aleatorios (cada ciclo soma 2 ao grau de seus vertices).
+    # Com multiplas=False ciclos que repetiriam uma aresta sao descartados
+    if n < 3:
+        raise ValueError("Grafo euleriano precisa de pelo menos 3 vertices")
+
+    rng = np.random.default_rng(semente)
+    arestas = 2 * n if arestas is None else arestas
+    ciclos = [rng.permutation(n)]
+    usadas = {frozenset(p) for p in zip(ciclos[0].tolist(), np.roll(ciclos[0], -1).tolist())}
+    total = n
+    tentativas = 0
+
+    while total < arestas and tentativas < 100 * arestas:
+        tentativas += 1
+        k = int(rng.integers(3, max(3, min(n, arestas - total)) + 1))
+        ciclo = rng.choice(n, k, replace=False)
+        if not multiplas:
+            novas = {frozenset(p) for p in zip(ciclo.tolist(), np.roll(ciclo, -1).tolist())}
+            if not usadas.isdisjoint(novas):
+                continue
+            usadas |= novas
+        ciclos.append(ciclo)
+        total += k
+
+    origens = np.concatenate(ciclos)
+    destinos = np.concatenate([np.roll(c, -1) for c in ciclos])
+    return Grafo.de_arrays(list(range(n)), origens, destinos, direcionado=False)
+
+
+def pontos_euclidianos(n: int, semente: int = SEMENTE) -> np.ndarray:
+    return np.random.default_rng(semente).uniform(0, 1000, size=(n, 2))
+
+
+def gerar_tsp_euclidiano(n: int, semente: int = SEMENTE) -> Grafo:
+    # grafo completo com peso = distancia euclidiana entre pontos uniformes no quadrado
+    pontos = pontos_euclidianos(n, semente)
+    origens, destinos = np.triu_indices(n, k=1)
+    pesos = np.round(np.hypot(*(pontos[origens] - pontos[destinos]).T), 3)
+    return Grafo.de_arrays(list(range(n)), origens, destinos, pesos, direcionado=False)
+
+
+def gerar_lei_de_potencia(n: int, m: int = 2, semente: int = SEMENTE) -> Grafo:
+    # Barabasi-Albert: cada vertice novo liga-se a m vertices escolhidos com
+    # probabilidade proporcional ao grau (sorteio uniforme na lista de pontas)
+    if n <= m:
+        raise ValueError("n deve ser maior que m")
+
+    rng = np.random.default_rng(semente)
+    pontas = list(range(m))
+    origens, destinos = [], []
+
+    for v in range(m, n):
+        escolhidos = set()
+        while len(escolhidos) < m:
+            escolhidos.add(pontas[int(rng.integers(len(pontas)))])
+        for u in escolhidos:
+            origens.append(v)
+            destinos.append(u)
+            pontas.extend((u, v))
+
+    return Grafo.de_arrays(list(range(n)), np.array(origens), np.array(destinos), direcionado=False)
+
+
+def _pares_aleatorios(G: Grafo, quantidade: int, semente: int = SEMENTE) -> List[Tuple]:
+    rng = np.random.default_rng(semente)
+    ids = rng.integers(0, len(G.vertices), size=(quantidade, 2)).tolist()
+    return [(G.vertices[a], G.vertices[b]) for a, b in ids]
+
+
+# nome -> (gerador(tamanho), operacao(objeto), tamanhos rapidos, tamanhos da varredura completa)
+# o gerador devolve o que a operacao recebe; o tempo de geracao nao entra na medicao
+OPERACOES: Dict[str, Tuple[Callable, Callable, List[int], List[int]]] = {
+    "conexo_por_mm": (
+        lambda n: (lambda G: (G, G.matriz_de_adjacencias()))(gerar_erdos_renyi(n, 3.0)),
+        lambda a: a[0].conexo_por_mm(a[1]),
+        [200, 400], [200, 400, 800, 1600]),
+    "eh_conexo": (
+        lambda n: gerar_erdos_renyi(n, 3.0),
+        conexidade.eh_conexo,
+        [10_000, 100_000], [10_000, 100_000, 1_000_000]),
+    "componentes_fortemente_conexas": (
+        lambda n: gerar_erdos_renyi(n, 2.0, direcionado=True),
+        conexidade.componentes_fortemente_conexas,
+        [10_000, 100_000], [10_000, 100_000, 1_000_000]),
+    "caminhos_existem": (
+        lambda n: (lambda G: (G, _pares_aleatorios(G, 1000)))(gerar_lei_de_potencia(n)),
+        lambda a: a[0].caminhos_existem(a[1]),
+        [10_000, 100_000], [10_000, 100_000, 1_000_000]),
+    "indice_alcancabilidade": (
+        lambda n: gerar_erdos_renyi(n, 1.5, direcionado=True),
+        IndiceAlcancabilidade,
+        [1_000, 10_000], [1_000, 10_000, 100_000]),
+    "alg_fleury": (
+        lambda n: gerar_euleriano(n, multiplas=False),
+        alg_fleury,
+        [30, 60], [30, 60, 120, 240]),
+    "alg_fleury_otimizado": (
+        gerar_euleriano,
+        alg_fleury_otimizado,
+        [10_000, 100_000], [10_000, 100_000, 1_000_000]),
+    "dijkstra": (
+        lambda lado: gerar_grade(lado),
+        lambda G: caminhos_minimos.dijkstra(G, 0),
+        [100, 300], [100, 300, 1000]),
+    "todos_os_pares": (
+        lambda n: gerar_erdos_renyi(n, 8.0, ponderado=True),
+        todos_os_pares.todos_os_pares,
+        [100, 200], [100, 200, 400, 800]),
+    "bellmore_nemhauser": (
+        gerar_tsp_euclidiano,
+        bellmore_nemhauser,
+        [50, 100], [50, 100, 200, 400]),
+    "bellmore_nemhauser_melhorado": (
+        gerar_tsp_euclidiano,
+        bellmore_nemhauser_melhorado,
+        [100, 200], [100, 200, 400, 800]),
+    "held_karp": (
+        gerar_tsp_euclidiano,
+        held_karp,
+        [10, 12], [10, 12, 14, 16]),
+    "melhorar_ciclo": (
+        lambda n: (lambda G: (G, bellmore_nemhauser_melhorado(G, G.vertices[0])))(gerar_tsp_euclidiano(n)),
+        lambda a: melhorar_ciclo(a[0], a[1]),
+        [100, 200], [100, 200, 400, 800]),
+    "conectividade_de_vertices": (
+        lambda lado: gerar_grade(lado, ponderado=False),
+        k_conexidade.conectividade_de_vertices,
+        [10, 20], [10, 20, 40]),
+    "conectividade_de_arestas": (
+        lambda lado: gerar_grade(lado, ponderado=False),
+        k_conexidade.conectividade_de_arestas,
+        [10, 20], [10, 20, 40]),
+    "corte_minimo_global": (
+        lambda n: gerar_erdos_renyi(n, 8.0, ponderado=True),
+        k_conexidade.corte_minimo_global,
+        [100, 200], [100, 200, 400]),
+    "uniao": (
+        lambda n: (gerar_erdos_renyi(n, 4.0, semente=1), gerar_erdos_renyi(n, 4.0, semente=2)),
+        lambda a: operacoes.uniao(a[0], a[1]),
+        [10_000, 100_000], [10_000, 100_000, 1_000_000]),
+    "subgrafo_induzido": (
+        lambda n: (lambda G: (G, G.vertices[::2]))(gerar_erdos_renyi(n, 4.0)),
+        lambda a: operacoes.subgrafo_induzido(a[0], a[1]).para_csr(),
+        [10_000, 100_000], [10_000, 100_000, 1_000_000]),
+    "agrupar_isomorfos": (
+        lambda lote: [gerar_erdos_renyi(8, 2.0, semente=s) for s in range(lote)],
+        isomorfismo.agrupar_isomorfos,
+        [1_000, 5_000], [1_000, 5_000, 20_000]),
+    "hash_canonico": (
+        lambda n: gerar_erdos_renyi(n, 4.0),
+        isomorfismo.hash_canonico,
+        [1_000, 10_000], [1_000, 10_000, 100_000]),
+}
+
+
+def _grafo_de(objeto: Any) -> Optional[Grafo]:
+    if isinstance(objeto, Grafo):
+        return objeto
+    if isinstance(objeto, tuple) and objeto and isinstance(objeto[0], Grafo):
+        return objeto[0]
+    return None
+
+
+def medir(operacao: Callable, objeto: Any, repeticoes: int = REPETICOES) -> Dict[str, Any]:
+    # os caches do grafo (CSR, matriz esparsa, motor de alcancabilidade) sao descartados
+    # antes de cada execucao: toda repeticao mede o custo a frio
+    G = _grafo_de(objeto)
+    tempos = []
+    for _ in range(repeticoes):
+        if G is not None:
+            G._invalidar_caches()
+        inicio = time.perf_counter()
+        resposta = operacao(objeto)
+        tempos.append(time.perf_counter() - inicio)
+
+    # o tracemalloc deixa o codigo bem mais lento, entao o pico e medido numa execucao a parte
+    if G is not None:
+        G._invalidar_caches()
+    tracemalloc.start()
+    try:
+        operacao(objeto)
+        pico = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    # os algoritmos sinalizam falha devolvendo False; o tempo de uma falha nao e comparavel
+    return {"tempo_s": statistics.median(tempos), "tempo_min_s": min(tempos),
+            "pico_memoria_bytes": pico, "repeticoes": repeticoes, "falhou": resposta is False}
+
+
+def executar(operacoes: Optional[List[str]] = None, completo: bool = False,
+             repeticoes: int = REPETICOES, tamanho_maximo: Optional[int] = None,
+             progresso: bool = False) -> Dict[str, Any]:
+    operacoes = list(OPERACOES) if not operacoes else operacoes
+    for nome in operacoes:
+        if nome not in OPERACOES:
+            raise ValueError(f"Operacao {nome} nao existe")
+
+    resultados = []
+    for nome in operacoes:
+        gerador, operacao, rapidos, todos = OPERACOES[nome]
+        for tamanho in (todos if completo else rapidos):
+            if tamanho_maximo is not None and tamanho > tamanho_maximo:
+                continue
+
+            objeto = gerador(tamanho)
+            G = _grafo_de(objeto)
+            resultado = {"operacao": nome, "tamanho": tamanho,
+                         "vertices": len(G.vertices) if G is not None else None,
+                         "arestas": G.numero_de_arestas() if G is not None else None}
+            resultado.update(medir(operacao, objeto, repeticoes))
+            resultados.append(resultado)
+
+            if progresso:
+                print(f"{nome:32s} {tamanho:>9d} {resultado['tempo_s']:10.4f}s "
+                      f"{resultado['pico_memoria_bytes'] / 2 ** 20:9.1f} MiB"
+                      f"{'  (devolveu False)' if resultado['falhou'] else ''}", file=sys.stderr)
+            del objeto, G
+
+    return {"python": platform.python_version(), "numpy": np.__version__,
+            "plataforma": platform.platform(), "semente": SEMENTE, "resultados": resultados}
+
+
+def comparar(atual: Dict[str, Any], base: Dict[str, Any],
+             tolerancia: float = TOLERANCIA) -> List[Dict[str, Any]]:
+    # regressao = tempo minimo ou pico de memoria acima de (1 + tolerancia) vezes a base;
+    # o minimo das repeticoes e menos sensivel a ruido do que a mediana
+    anteriores = {(r["operacao"], r["tamanho"]): r for r in base["resultados"]}
+    regressoes = []
+
+    for r in atual["resultados"]:
+        anterior = anteriores.get((r["operacao"], r["tamanho"]))
+        if anterior is None:
+            continue
+
+        for metrica in ("tempo_min_s", "pico_memoria_bytes"):
+            if anterior[metrica] > 0 and r[metrica] > (1 + tolerancia) * anterior[metrica]:
+                regressoes.append({"operacao": r["operacao"], "tamanho": r["tamanho"],
+                                   "metrica": metrica, "base": anterior[metrica],
+                                   "atual": r[metrica], "razao": r[metrica] / anterior[metrica]})
+
+    return regressoes
+
+
+def _argumentos(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Mede tempo e memoria dos algoritmos de grafos")
+    parser.add_argument("--operacoes", nargs="*", choices=list(OPERACOES), default=None)
+    parser.add_argument("--completo", action="store_true", help="varredura com os tamanhos maiores")
+    parser.add_argument("--repeticoes", type=int, default=REPETICOES)
+    parser.add_argument("--tamanho-maximo", type=int, default=None)
+    parser.add_argument("--saida", default=None, help="arquivo JSON do resultado (padrao: stdout)")
+    parser.add_argument("--base", default=None, help="JSON de uma execucao anterior para comparar")
+    parser.add_argument("--tolerancia", type=float, default=TOLERANCIA)
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = _argumentos()
+    atual = executar(args.operacoes, args.completo, args.repeticoes, args.tamanho_maximo, progresso=True)
+
+    if args.saida:
+        with open(args.saida, "w") as arquivo:
+            json.dump(atual, arquivo, indent=2)
+    else:
+        print(json.dumps(atual, indent=2))
+
+    if args.base:
+        with open(args.base) as arquivo:
+            regressoes = comparar(atual, json.load(arquivo), args.tolerancia)
+        for r in regressoes:
+            print(f"Regressao: {r['operacao']} (tamanho {r['tamanho']}) {r['metrica']} "
+                  f"{r['base']:.6g} -> {r['atual']:.6g} ({r['razao']:.2f}x)", file=sys.stderr)
+        sys.exit(1 if regressoes else 0)
@@ -0,0 +1,220 @@
+# Busca local para ciclos hamiltonianos (2-opt e Or-opt)
+# Recebe a saida (ciclo, custo) das heuristicas construtivas e so testa movimentos
+# entre cada vertice e seus k vizinhos mais proximos. Os "don't-look bits" (fila de
+# vertices ativos) fazem cada passada custar perto de O(n*k) em vez de O(n^2).
+
+import time
+import numpy as np
+from collections import deque
+from typing import List, Tuple, Union, Optional
+
+from . import instrumentacao
+from .grafo_utils import Grafo
+from .bellmore_nemhauser import matriz_de_custos, verificar_ciclo_hamiltoniano, calcular_custo_ciclo
+
+EPS = 1e-10
+
+
+def vizinhos_mais_proximos(custos: np.ndarray, k: int) -> np.ndarray:
+    n = custos.shape[0]
+    k = min(k, n - 1)
+
+    distancias = np.array(custos, dtype=np.float64)
+    np.fill_diagonal(distancias, np.inf)
+
+    candidatos = np.argpartition(distancias, k - 1, axis=1)[:, :k]
+    ordem = np.argsort(np.take_along_axis(distancias, candidatos, axis=1), axis=1)
+    return np.take_along_axis(candidatos, ordem, axis=1)
+
+
+def _inverter_trecho(rota: List[int], pos: List[int], i: int, j: int) -> None:
+    n = len(rota)
+    tamanho = (j - i) % n + 1
+
+    # inverter o complemento gera o mesmo ciclo (no sentido oposto) e pode ser mais curto
+    if 2 * tamanho > n:
+        i, j = (j + 1) % n, (i - 1) % n
+        tamanho = n - tamanho
+
+    for _ in range(tamanho // 2):
+        a, b = rota[i], rota[j]
+        rota[i], rota[j] = b, a
+        pos[b], pos[a] = i, j
+        i = (i + 1) % n
+        j = (j - 1) % n
+
+
+def _dois_opt(a: int, rota: List[int], pos: List[int], d: memoryview,
+              vizinhos: List[List[int]]) -> Optional[List[int]]:
+    n = len(rota)
+
+    for sentido in (1, -1):
+        b = rota[(pos[a] + sentido) % n]
+        dab = d[a, b]
+
+        for c in vizinhos[a]:
+            dac = d[a, c]
+            if dac >= dab:
+                break
+
+            e = rota[(pos[c] + sentido) % n]
+            if c == b or e == a:
+                continue
+
+            if dac + d[b, e] - dab - d[c, e] < -EPS:
+                if sentido == 1:
+                    _inverter_trecho(rota, pos, pos[b], pos[c])
+                else:
+                    _inverter_trecho(rota, pos, pos[c], pos[b])
+                return [a, b, c, e]
+
+    return None
+
+
+def _or_opt(a: int, rota: List[int], pos: List[int], d: memoryview,
+            vizinhos: List[List[int]], simetrico: bool) -> Optional[List[int]]:
+    n = len(rota)
+
+    for tamanho in (1, 2, 3):
+        if tamanho > n - 3:
+            break
+
+        i = pos[a]
+        s1, se = a, rota[(i + tamanho - 1) % n]
+        p, nx = rota[(i - 1) % n], rota[(i + tamanho) % n]
+        ganho_remocao = d[p, s1] + d[se, nx] - d[p, nx]
+
+        if ganho_remocao <= EPS:
+            continue
+
+        for c in vizinhos[s1]:
+            if (pos[c] - i) % n < tamanho:
+                continue
+
+            # segmento entra entre c e seu sucessor, na mesma orientacao
+            dc = rota[(pos[c] + 1) % n]
+            if c != p and d[c, s1] + d[se, dc] - d[c, dc] < ganho_remocao - EPS:
+                _mover_segmento(rota, pos, i, tamanho, c, invertido=False)
+                return [p, nx, s1, se, c, dc]
+
+            # ou invertido entre o antecessor de c e c
+            pc = rota[(pos[c] - 1) % n]
+            if simetrico and c != nx and d[pc, se] + d[s1, c] - d[pc, c] < ganho_remocao - EPS:
+                _mover_segmento(rota, pos, i, tamanho, pc, invertido=True)
+                return [p, nx, s1, se, c, pc]
+
+    return None
+
+
+def _mover_segmento(rota: List[int], pos: List[int], i: int, tamanho: int,
+                    antes: int, invertido: bool) -> None:
+    # o segmento que comeca em i passa a vir logo depois de `antes`; so o trecho mais curto
+    # entre o segmento e o ponto de insercao anda `tamanho` casas, como em _inverter_trecho
+    n = len(rota)
+    segmento = [rota[(i + t) % n] for t in range(tamanho)]
+    if invertido:
+        segmento.reverse()
+
+    entre = (pos[antes] - i - tamanho) % n + 1
+    if 2 * entre <= n - tamanho:
+        # do sucessor do segmento ate `antes`: volta para o lugar do segmento
+        for t in range(entre):
+            v = rota[(i + tamanho + t) % n]
+            rota[(i + t) % n] = v
+            pos[v] = (i + t) % n
+        inicio = i + entre
+    else:
+        # do sucessor de `antes` ate o antecessor do segmento: avanca, de tras para frente
+        for t in range(n - tamanho - entre):
+            destino = (i - 1 - t + tamanho) % n
+            v = rota[(i - 1 - t) % n]
+            rota[destino] = v
+            pos[v] = destino
+        inicio = i + tamanho + entre
+
+    for t, v in enumerate(segmento):
+        rota[(inicio + t) % n] = v
+        pos[v] = (inicio + t) % n
+
+
+@instrumentacao.medido()
+def melhorar_ciclo(G: Grafo, resultado: Union[Tuple[List, float], bool], k: int = 8,
+                   tempo_limite: Optional[float] = None,
+                   custos: Optional[np.ndarray] = None) -> Union[Tuple[List, float], bool]:
+    if not resultado:
+        return False
+
+    ciclo, custo = resultado
+    n = len(G.vertices)
+    if n < 5:
+        return resultado
+
+    matriz_externa = custos is not None
+    if custos is None:
+        custos = matriz_de_custos(G)
+
+    # memoryview 2D devolve float do Python em d[a, b], sem criar escalares NumPy
+    d = memoryview(np.ascontiguousarray(custos, dtype=np.float64))
+    vizinhos = vizinhos_mais_proximos(custos, k).tolist()
+    simetrico = not G.direcionado
+
+    vertice_idx = {v: i for i, v in enumerate(G.vertices)}
+    rota = [vertice_idx[v] for v in ciclo[:-1]]
+    pos = [0] * n
+    for idx, v in enumerate(rota):
+        pos[v] = idx
+
+    ativos = deque(rota)
+    na_fila = [True] * n
+    inicio = time.perf_counter()
+
+    while ativos:
+        if tempo_limite is not None and time.perf_counter() - inicio > tempo_limite:
+            break
+
+        a = ativos.popleft()
+        na_fila[a] = False
+
+        alterados = _dois_opt(a, rota, pos, d, vizinhos) if simetrico else None
+        if alterados is None:
+            alterados = _or_opt(a, rota, pos, d, vizinhos, simetrico)
+
+        if alterados is not None:
+            for v in alterados:
+                if not na_fila[v]:
+                    na_fila[v] = True
+                    ativos.append(v)
+
+    primeiro = pos[vertice_idx[ciclo[0]]]
+    novo = [G.vertices[v] for v in rota[primeiro:] + rota[:primeiro]]
+    novo.append(novo[0])
+
+    if not verificar_ciclo_hamiltoniano(G, novo):
+        return resultado
+
+    if matriz_externa:
+        novo_custo = float(sum(d[vertice_idx[u], vertice_idx[w]] for u, w in zip(novo, novo[1:])))
+    else:
+        novo_custo = calcular_custo_ciclo(G, novo)
+
+    return (novo, novo_custo) if novo_custo < custo else resultado
+
+
+if __name__ == "__main__":
+    from .bellmore_nemhauser import bellmore_nemhauser, held_karp
+
+    print("Teste 1: Instancia euclidiana aleatoria")
+    rng = np.random.default_rng(7)
+    pontos = rng.random((12, 2))
+    vertices = list(range(12))
+    arestas = {(i, j): float(np.hypot(*(pontos[i] - pontos[j])))
+               for i in range(12) for j in range(i + 1, 12)}
+    g1 = Grafo(vertices=vertices, direcionado=False, arestas=arestas)
+
+    guloso = bellmore_nemhauser(g1)
+    melhorado = melhorar_ciclo(g1, guloso, k=5)
+    otimo = held_karp(g1)
+    print(f"Guloso: {guloso[1]:.4f}")
+    print(f"Apos 2-opt/Or-opt: {melhorado[1]:.4f}")
+    print(f"Otimo (Held-Karp): {otimo[1]:.4f}")
+    print(f"Ciclo valido: {verificar_ciclo_hamiltoniano(g1, melhorado[0])}")
@@ -0,0 +1,274 @@
+# Caminhos minimos sobre o CSR do grafo
+# Dijkstra e A* usam heap binario (heapq) e percorrem indptr/indices/weights por
+# memoryview, sem montar dicts a cada consulta. Bellman-Ford relaxa todas as arestas
+# de uma vez com NumPy e aceita pesos negativos. Grafos sem peso usam peso 1.
+# Os resultados ficam em arrays: distancias float64 (inf = inalcancavel) e pais int64 (-1).
+
+import heapq
+import numpy as np
+from typing import List, Dict, Tuple, Union, Any, Callable, Iterable, Optional
+
+from . import instrumentacao
+from .grafo_csr import GrafoCSR, como_csr
+
+INF = float("inf")
+
+
+class CaminhosMinimos:
+    def __init__(self, vertices: List[Union[str, int]], distancias: np.ndarray, pais: np.ndarray,
+                 vertice_idx: Dict[Any, int]):
+        self.vertices = vertices
+        self.distancias = distancias
+        self.pais = pais
+        self._vertice_idx = vertice_idx
+
+    def _idx(self, v: Union[str, int]) -> int:
+        if v not in self._vertice_idx:
+            raise ValueError(f"Vertice {v} nao existe no grafo")
+        return self._vertice_idx[v]
+
+    def distancia(self, v: Union[str, int]) -> float:
+        return float(self.distancias[self._idx(v)])
+
+    def caminho(self, v: Union[str, int]) -> Union[List[Any], bool]:
+        i = self._idx(v)
+        if self.distancias[i] == INF:
+            return False
+
+        caminho = []
+        while i != -1:
+            caminho.append(self.vertices[i])
+            i = int(self.pais[i])
+        return caminho[::-1]
+
+    def como_dict(self) -> Dict[Any, float]:
+        return dict(zip(self.vertices, self.distancias.tolist()))
+
+
+def _ids_origens(csr: GrafoCSR, origens: Any) -> List[int]:
+    if isinstance(origens, (str, int)):
+        origens = [origens]
+    return [csr._idx(v) for v in origens]
+
+
+def _pesos(csr: GrafoCSR) -> np.ndarray:
+    if csr.weights is None:
+        return np.ones(len(csr.indices), dtype=np.float64)
+    return np.ascontiguousarray(csr.weights, dtype=np.float64)
+
+
+def _sem_pesos_negativos(pesos: np.ndarray) -> None:
+    if len(pesos) and pesos.min() < 0:
+        raise ValueError("Grafo tem pesos negativos; use bellman_ford")
+
+
+@instrumentacao.medido()
+def dijkstra(G: Any, origens: Any, destino: Optional[Union[str, int]] = None) -> CaminhosMinimos:
+    # com varias origens calcula a distancia ate a origem mais proxima;
+    # com destino para assim que ele sai do heap (so a distancia dele fica garantida)
+    csr = como_csr(G)
+    pesos = _pesos(csr)
+    _sem_pesos_negativos(pesos)
+
+    n = len(csr.vertices)
+    alvo = csr._idx(destino) if destino is not None else -1
+    ip = memoryview(np.ascontiguousarray(csr.indptr, dtype=np.int64))
+    ind = memoryview(np.ascontiguousarray(csr.indices, dtype=np.int32))
+    wt = memoryview(pesos)
+
+    dist = [INF] * n
+    pais = [-1] * n
+    fechado = bytearray(n)
+    heap = []
+    for s in _ids_origens(csr, origens):
+        dist[s] = 0.0
+        heap.append((0.0, s))
+    heapq.heapify(heap)
+
+    while heap:
+        d, v = heapq.heappop(heap)
+        if fechado[v]:
+            continue
+        fechado[v] = 1
+        if v == alvo:
+            break
+
+        for p in range(ip[v], ip[v + 1]):
+            w = ind[p]
+            nd = d + wt[p]
+            if nd < dist[w]:
+                dist[w] = nd
+                pais[w] = v
+                heapq.heappush(heap, (nd, w))
+
+    if instrumentacao.ativo:
+        graus = np.diff(np.asarray(csr.indptr))
+        instrumentacao.arestas_percorridas("caminhos_minimos.dijkstra",
+                                           int(graus[np.frombuffer(fechado, dtype=bool)].sum()))
+    return CaminhosMinimos(csr.vertices, np.array(dist, dtype=np.float64),
+                           np.array(pais, dtype=np.int64), csr._vertice_idx)
+
+
+@instrumentacao.medido()
+def bellman_ford(G: Any, origens: Any) -> CaminhosMinimos:
+    csr = como_csr(G)
+    n = len(csr.vertices)
+    pesos = _pesos(csr)
+    de = csr.origens_idx().astype(np.int64)
+    para = np.asarray(csr.indices, dtype=np.int64)
+
+    dist = np.full(n, np.inf)
+    pais = np.full(n, -1, dtype=np.int64)
+    dist[_ids_origens(csr, origens)] = 0.0
+
+    # cada rodada relaxa todas as arestas; sem ciclo negativo converge em ate n - 1 rodadas
+    for _ in range(n):
+        candidatos = dist[de] + pesos
+        melhora = np.flatnonzero(candidatos < dist[para])
+        if len(melhora) == 0:
+            return CaminhosMinimos(csr.vertices, dist, pais, csr._vertice_idx)
+
+        nova = dist.copy()
+        np.minimum.at(nova, para[melhora], candidatos[melhora])
+        vencedoras = melhora[candidatos[melhora] == nova[para[melhora]]]
+        pais[para[vencedoras]] = de[vencedoras]
+        dist = nova
+
+    raise ValueError("Grafo contem ciclo negativo alcancavel a partir da origem")
+
+
+@instrumentacao.medido()
+def a_estrela(G: Any, origem: Union[str, int], destino: Union[str, int],
+              heuristica: Callable[[Any, Any], float]) -> Union[Tuple[List, float], bool]:
+    # heuristica(v, destino) deve ser admissivel (nunca superestimar) para o custo ser minimo;
+    # se ela nao for consistente, um vertice fechado cuja distancia melhora volta a ser aberto
+    csr = como_csr(G)
+    pesos = _pesos(csr)
+    _sem_pesos_negativos(pesos)
+
+    n = len(csr.vertices)
+    s, t = csr._idx(origem), csr._idx(destino)
+    ip = memoryview(np.ascontiguousarray(csr.indptr, dtype=np.int64))
+    ind = memoryview(np.ascontiguousarray(csr.indices, dtype=np.int32))
+    wt = memoryview(pesos)
+    vertices = csr.vertices
+
+    dist = [INF] * n
+    pais = [-1] * n
+    estimativa = [None] * n
+    fechado = bytearray(n)
+    dist[s] = 0.0
+    heap = [(heuristica(origem, destino), 0.0, s)]
+
+    while heap:
+        _, d, v = heapq.heappop(heap)
+        if fechado[v] or d > dist[v]:
+            continue
+        fechado[v] = 1
+
+        if v == t:
+            caminho = []
+            while v != -1:
+                caminho.append(vertices[v])
+                v = pais[v]
+            return caminho[::-1], dist[t]
+
+        for p in range(ip[v], ip[v + 1]):
+            w = ind[p]
+            nd = d + wt[p]
+            if nd < dist[w]:
+                dist[w] = nd
+                pais[w] = v
+                fechado[w] = 0
+                if estimativa[w] is None:
+                    estimativa[w] = heuristica(vertices[w], destino)
+                heapq.heappush(heap, (nd + estimativa[w], nd, w))
+
+    return False
+
+
+def caminho_minimo(G: Any, origem: Union[str, int],
+                   destino: Union[str, int]) -> Union[Tuple[List, float], bool]:
+    csr = como_csr(G)
+    if len(csr.indices) and _pesos(csr).min() < 0:
+        resultado = bellman_ford(csr, origem)
+    else:
+        resultado = dijkstra(csr, origem, destino)
+
+    caminho = resultado.caminho(destino)
+    if not caminho:
+        return False
+    return caminho, resultado.distancia(destino)
+
+
+@instrumentacao.medido()
+def matriz_de_distancias(G: Any, origens: Optional[Iterable[Union[str, int]]] = None,
+                         dtype: Any = np.float64) -> np.ndarray:
+    # linha i = distancias a partir de origens[i] (todos os vertices por padrao);
+    # serve como matriz de custos do bellmore_nemhauser em grafos incompletos
+    csr = como_csr(G)
+    origens = list(csr.vertices) if origens is None else list(origens)
+    negativos = len(csr.indices) > 0 and _pesos(csr).min() < 0
+
+    matriz = np.empty((len(origens), len(csr.vertices)), dtype=dtype)
+    for i, origem in enumerate(origens):
+        resultado = bellman_ford(csr, origem) if negativos else dijkstra(csr, origem)
+        matriz[i] = resultado.distancias
+    return matriz
+
+
+if __name__ == "__main__":
+    from .grafo_utils import Grafo
+    from .bellmore_nemhauser import bellmore_nemhauser_melhorado
+
+    print("Teste 1: Dijkstra a partir de uma origem")
+    g1 = Grafo(vertices=['A', 'B', 'C', 'D', 'E'], direcionado=False,
+               arestas={('A', 'B'): 4, ('A', 'C'): 1, ('C', 'B'): 2, ('B', 'D'): 5, ('C', 'D'): 8})
+    resultado = dijkstra(g1, 'A')
+    print("Distancias:", resultado.como_dict())
+    print("Caminho ate D:", resultado.caminho('D'))
+    print("Caminho ate E:", resultado.caminho('E'))
+    print()
+
+    print("Teste 2: Varias origens")
+    resultado = dijkstra(g1, ['A', 'D'])
+    print("Distancias:", resultado.como_dict())
+    print()
+
+    print("Teste 3: Bellman-Ford com peso negativo")
+    g2 = Grafo(vertices=[1, 2, 3, 4], arestas={(1, 2): 4, (1, 3): 2, (3, 2): -3, (2, 4): 1})
+    resultado = bellman_ford(g2, 1)
+    print("Distancias:", resultado.como_dict())
+    print("Caminho minimo de 1 a 4:", caminho_minimo(g2, 1, 4))
+    g3 = Grafo(vertices=[1, 2], arestas={(1, 2): 1, (2, 1): -2})
+    try:
+        bellman_ford(g3, 1)
+    except ValueError as e:
+        print("Erro esperado:", e)
+    print()
+
+    print("Teste 4: A* em grade com distancia de Manhattan")
+    lado = 5
+    vertices = [f"{i},{j}" for i in range(lado) for j in range(lado)]
+    arestas = {}
+    for i in range(lado):
+        for j in range(lado):
+            if i + 1 < lado and (i, j) != (1, 2):
+                arestas[(f"{i},{j}", f"{i + 1},{j}")] = 1
+            if j + 1 < lado:
+                arestas[(f"{i},{j}", f"{i},{j + 1}")] = 1
+    g4 = Grafo(vertices=vertices, arestas=arestas, direcionado=False)
+
+    def manhattan(v: str, alvo: str) -> float:
+        (a, b), (c, d) = map(int, v.split(",")), map(int, alvo.split(","))
+        return abs(a - c) + abs(b - d)
+
+    print("A*:", a_estrela(g4, "0,0", "4,4", manhattan))
+    print()
+
+    print("Teste 5: Distancias como matriz de custos do Bellmore-Nemhauser")
+    g5 = Grafo(vertices=['A', 'B', 'C', 'D'], direcionado=False,
+               arestas={('A', 'B'): 1, ('B', 'C'): 2, ('C', 'D'): 1, ('A', 'C'): 2})
+    custos = matriz_de_distancias(g5)
+    print(custos)
+    print("Ciclo no fecho metrico:", bellmore_nemhauser_melhorado(g5, custos=custos))
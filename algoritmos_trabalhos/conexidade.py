@@ -0,0 +1,243 @@
+# Conexidade em tempo linear
+# Substitui a soma de potencias da matriz de adjacencia (O(n^4)) por buscas
+# sobre listas de adjacencia: union-find para componentes fracas, BFS direta e
+# reversa para conexidade forte e Tarjan iterativo para componentes fortes.
+
+import numpy as np
+from collections import deque
+from typing import List, Dict, Tuple, Any, Optional, Sequence
+
+from . import instrumentacao
+
+
+def sucessores_por_indice(G: Any) -> List[List[int]]:
+    if hasattr(G, "para_csr"):
+        csr = G.para_csr()
+        return [csr.vizinhos_idx(i).tolist() for i in range(len(csr.vertices))]
+    
+    vertice_idx = {v: i for i, v in enumerate(G.vertices)}
+    sucessores = [[] for _ in G.vertices]
+
+    for u, w in G.arestas:
+        sucessores[vertice_idx[u]].append(vertice_idx[w])
+
+    return sucessores
+
+
+def _inverter(sucessores: List[List[int]]) -> List[List[int]]:
+    antecessores = [[] for _ in sucessores]
+    for u, vizinhos in enumerate(sucessores):
+        for w in vizinhos:
+            antecessores[w].append(u)
+    return antecessores
+
+
+def _alcancados(sucessores: List[List[int]], origem: int) -> List[bool]:
+    visitados = [False] * len(sucessores)
+    visitados[origem] = True
+    fila = deque([origem])
+
+    while fila:
+        atual = fila.popleft()
+        for w in sucessores[atual]:
+            if not visitados[w]:
+                visitados[w] = True
+                fila.append(w)
+
+    if instrumentacao.ativo:
+        percorridas = sum(len(s) for s, visto in zip(sucessores, visitados) if visto)
+        instrumentacao.arestas_percorridas("conexidade.busca_em_largura", percorridas)
+    return visitados
+
+
+def _encontrar(pai: List[int], x: int) -> int:
+    while pai[x] != x:
+        pai[x] = pai[pai[x]]
+        x = pai[x]
+    return x
+
+
+def _union_find(n: int, sucessores: List[List[int]]) -> Tuple[List[int], int]:
+    pai = list(range(n))
+    tamanho = [1] * n
+
+    for u, vizinhos in enumerate(sucessores):
+        for w in vizinhos:
+            ru, rw = _encontrar(pai, u), _encontrar(pai, w)
+            if ru == rw:
+                continue
+            if tamanho[ru] < tamanho[rw]:
+                ru, rw = rw, ru
+            pai[rw] = ru
+            tamanho[ru] += tamanho[rw]
+
+    rotulos = [-1] * n
+    raiz_rotulo = {}
+    for v in range(n):
+        raiz = _encontrar(pai, v)
+        if raiz not in raiz_rotulo:
+            raiz_rotulo[raiz] = len(raiz_rotulo)
+        rotulos[v] = raiz_rotulo[raiz]
+
+    return rotulos, len(raiz_rotulo)
+
+
+def _tarjan(n: int, sucessores: List[List[int]]) -> Tuple[List[int], int]:
+    indice = [-1] * n
+    low = [0] * n
+    na_pilha = [False] * n
+    pilha = []
+    rotulos = [-1] * n
+    contador = 0
+    componentes = 0
+
+    for s in range(n):
+        if indice[s] != -1:
+            continue
+
+        indice[s] = low[s] = contador
+        contador += 1
+        pilha.append(s)
+        na_pilha[s] = True
+        trabalho = [(s, iter(sucessores[s]))]
+
+        while trabalho:
+            v, vizinhos = trabalho[-1]
+            avancou = False
+
+            for w in vizinhos:
+                if indice[w] == -1:
+                    indice[w] = low[w] = contador
+                    contador += 1
+                    pilha.append(w)
+                    na_pilha[w] = True
+                    trabalho.append((w, iter(sucessores[w])))
+                    avancou = True
+                    break
+                elif na_pilha[w] and indice[w] < low[v]:
+                    low[v] = indice[w]
+
+            if avancou:
+                continue
+
+            trabalho.pop()
+            if trabalho:
+                u = trabalho[-1][0]
+                if low[v] < low[u]:
+                    low[u] = low[v]
+
+            if low[v] == indice[v]:
+                while True:
+                    w = pilha.pop()
+                    na_pilha[w] = False
+                    rotulos[w] = componentes
+                    if w == v:
+                        break
+                componentes += 1
+
+    return rotulos, componentes
+
+
+def componentes_por_indice(sucessores: List[List[int]], fortes: bool = False) -> Tuple[List[int], int]:
+    if fortes:
+        return _tarjan(len(sucessores), sucessores)
+    return _union_find(len(sucessores), sucessores)
+
+
+@instrumentacao.medido()
+def conexo_por_adjacencias(sucessores: List[List[int]],
+                           ignorar_indices: Optional[Sequence[int]] = None) -> bool:
+    n = len(sucessores)
+    ignorados = set(ignorar_indices or [])
+    ativos = [i for i in range(n) if i not in ignorados]
+
+    if len(ativos) <= 1:
+        return True
+
+    origem = ativos[0]
+    ida = _alcancados(sucessores, origem)
+    volta = _alcancados(_inverter(sucessores), origem)
+
+    return all(ida[i] and volta[i] for i in ativos)
+
+
+def sucessores_da_matriz_esparsa(m: Any) -> List[List[int]]:
+    # MatrizEsparsa ou scipy.sparse: so percorre as entradas armazenadas
+    m = m.tocsr()
+    n = m.shape[0]
+    nao_nulos = np.asarray(m.data) != 0
+    linhas = np.repeat(np.arange(n), np.diff(m.indptr))[nao_nulos]
+    cortes = np.cumsum(np.bincount(linhas, minlength=n))[:-1]
+    return [s.tolist() for s in np.split(np.asarray(m.indices)[nao_nulos], cortes)]
+
+
+@instrumentacao.medido()
+def conexo_por_matriz(m: Any, ignorar_indices: Optional[Sequence[int]] = None) -> bool:
+    if hasattr(m, "tocsr"):
+        sucessores = sucessores_da_matriz_esparsa(m)
+    else:
+        sucessores = [np.flatnonzero(linha).tolist() for linha in np.asarray(m)]
+    return conexo_por_adjacencias(sucessores, ignorar_indices)
+
+
+@instrumentacao.medido()
+def componentes_conexas(G: Any) -> Dict[Any, int]:
+    rotulos, _ = _union_find(len(G.vertices), sucessores_por_indice(G))
+    return dict(zip(G.vertices, rotulos))
+
+
+@instrumentacao.medido()
+def componentes_fortemente_conexas(G: Any) -> Dict[Any, int]:
+    rotulos, _ = _tarjan(len(G.vertices), sucessores_por_indice(G))
+    return dict(zip(G.vertices, rotulos))
+
+
+@instrumentacao.medido()
+def numero_de_componentes(G: Any, fortes: bool = False) -> int:
+    sucessores = sucessores_por_indice(G)
+    if fortes:
+        return _tarjan(len(G.vertices), sucessores)[1]
+    return _union_find(len(G.vertices), sucessores)[1]
+
+
+@instrumentacao.medido()
+def eh_conexo(G: Any) -> bool:
+    if len(G.vertices) <= 1:
+        return True
+
+    sucessores = sucessores_por_indice(G)
+    if not G.direcionado:
+        return all(_alcancados(sucessores, 0))
+
+    return _union_find(len(G.vertices), sucessores)[1] == 1
+
+
+@instrumentacao.medido()
+def eh_fortemente_conexo(G: Any) -> bool:
+    return conexo_por_adjacencias(sucessores_por_indice(G))
+
+
+if __name__ == "__main__":
+    from .grafo_utils import Grafo
+
+    print("Teste 1: Grafo direcionado fracamente conexo")
+    g1 = Grafo(vertices=[1, 2, 3, 4], arestas=[(1, 2), (2, 3), (3, 1), (3, 4)])
+    print("Conexo (fraco)?", eh_conexo(g1))
+    print("Fortemente conexo?", eh_fortemente_conexo(g1))
+    print("Componentes fortes:", componentes_fortemente_conexas(g1))
+    print("Numero de componentes fortes:", numero_de_componentes(g1, fortes=True))
+    print()
+
+    print("Teste 2: Grafo nao direcionado com duas componentes")
+    g2 = Grafo(vertices=['A', 'B', 'C', 'D', 'E'], direcionado=False,
+               arestas=[('A', 'B'), ('B', 'C'), ('D', 'E')])
+    print("Conexo?", eh_conexo(g2))
+    print("Componentes:", componentes_conexas(g2))
+    print("Numero de componentes:", numero_de_componentes(g2))
+    print()
+
+    print("Teste 3: Conexidade a partir da matriz de adjacencia")
+    print("Conexo?", conexo_por_matriz(g1.matriz_de_adjacencias()))
+    print("Conexo ignorando o vertice 4?", conexo_por_matriz(g1.matriz_de_adjacencias(), [3]))
+    print("Conexo ignorando o vertice 4 (matriz esparsa)?",
+          conexo_por_matriz(g1.matriz_de_adjacencias(esparsa=True), [3]))
@@ -0,0 +1,260 @@
+# Indice de alcancabilidade pre-computado (fecho transitivo) para grafos estaticos
+# Condensa as componentes fortes (Tarjan ja as numera em ordem topologica reversa) e
+# propaga o fecho do DAG resultante em linhas de bits np.uint64: k componentes custam
+# k * ceil(k / 64) * 8 bytes e cada consulta e um acesso a uma palavra.
+# Quando o fecho nao cabe na memoria, o modo de 2 saltos guarda rotulos podados
+# (pruned landmark labeling): u alcanca v se saida[u] e entrada[v] tem um marco em comum.
+
+import numpy as np
+from collections import deque
+from typing import List, Tuple, Any, Iterable
+
+from . import conexidade
+from . import instrumentacao
+from .grafo_csr import GrafoCSR, como_csr
+from .formato_binario import codificar_rotulos, decodificar_rotulos
+
+MODO_FECHO = "fecho"
+MODO_DOIS_SALTOS = "dois_saltos"
+MODO_AUTOMATICO = "auto"
+
+_CODIGOS_MODO = {MODO_FECHO: 0, MODO_DOIS_SALTOS: 1}
+
+MEMORIA_MAXIMA_FECHO = 512 * 2 ** 20
+
+
+def _listas(indptr: np.ndarray, valores: np.ndarray) -> List[List[int]]:
+    return [valores[indptr[i]:indptr[i + 1]].tolist() for i in range(len(indptr) - 1)]
+
+
+def _compactar(listas: List[List[int]]) -> Tuple[np.ndarray, np.ndarray]:
+    indptr = np.zeros(len(listas) + 1, dtype=np.int64)
+    np.cumsum([len(lista) for lista in listas], out=indptr[1:])
+    valores = np.fromiter((x for lista in listas for x in lista), dtype=np.int32, count=indptr[-1])
+    return indptr, valores
+
+
+def condensacao(csr: GrafoCSR) -> Tuple[np.ndarray, int, np.ndarray, np.ndarray]:
+    # devolve (componente de cada vertice, k, indptr, indices) do DAG das componentes;
+    # toda aresta do DAG vai de um rotulo maior para um menor
+    sucessores = [csr.vizinhos_idx(i).tolist() for i in range(len(csr.vertices))]
+    rotulos, k = conexidade.componentes_por_indice(sucessores, fortes=True)
+    componentes = np.asarray(rotulos, dtype=np.int32)
+
+    cu = componentes[csr.origens_idx()].astype(np.int64)
+    cv = componentes[np.asarray(csr.indices)].astype(np.int64)
+    chaves = np.unique((cu * k + cv)[cu != cv])
+
+    indptr = np.zeros(k + 1, dtype=np.int64)
+    np.cumsum(np.bincount(chaves // k, minlength=k), out=indptr[1:])
+    return componentes, k, indptr, (chaves % k).astype(np.int32)
+
+
+def _fecho_em_bits(k: int, indptr: np.ndarray, indices: np.ndarray) -> np.ndarray:
+    palavras = (k + 63) // 64
+    linhas = np.zeros((k, palavras), dtype=np.uint64)
+    ids = np.arange(k)
+    linhas[ids, ids >> 6] = np.left_shift(np.uint64(1), (ids & 63).astype(np.uint64))
+
+    # em ordem crescente de rotulo os sucessores de c ja tem o fecho completo
+    for c in range(k):
+        inicio, fim = indptr[c], indptr[c + 1]
+        if fim - inicio == 1:
+            linhas[c] |= linhas[indices[inicio]]
+        elif fim > inicio:
+            linhas[c] |= np.bitwise_or.reduce(linhas[indices[inicio:fim]], axis=0)
+
+    return linhas
+
+
+def _rotulos_dois_saltos(k: int, indptr: np.ndarray, indices: np.ndarray) -> Tuple[List[List[int]], List[List[int]]]:
+    sucessores = _listas(indptr, indices)
+    antecessores = [[] for _ in range(k)]
+    for u, vizinhos in enumerate(sucessores):
+        for w in vizinhos:
+            antecessores[w].append(u)
+
+    # marcos de maior grau primeiro podam mais as buscas seguintes
+    graus = np.diff(indptr) + np.bincount(indices, minlength=k)
+    ordem = np.argsort(-graus, kind="stable").tolist()
+
+    saida = [[] for _ in range(k)]
+    entrada = [[] for _ in range(k)]
+    marcado = [False] * k
+    visto = [-1] * k
+
+    def busca_podada(v: int, posicao: int, vizinhos: List[List[int]],
+                     rotulos_v: List[int], rotulos: List[List[int]], destino: int) -> None:
+        for x in rotulos_v:
+            marcado[x] = True
+
+        visto[v] = destino
+        fila = deque([v])
+        while fila:
+            w = fila.popleft()
+            # (v, w) ja e coberto por um marco anterior: nem rotula nem expande
+            if any(marcado[x] for x in rotulos[w]):
+                continue
+            rotulos[w].append(posicao)
+            for y in vizinhos[w]:
+                if visto[y] != destino:
+                    visto[y] = destino
+                    fila.append(y)
+
+        for x in rotulos_v:
+            marcado[x] = False
+
+    for posicao, v in enumerate(ordem):
+        busca_podada(v, posicao, sucessores, saida[v], entrada, 2 * posicao)
+        busca_podada(v, posicao, antecessores, entrada[v], saida, 2 * posicao + 1)
+
+    return saida, entrada
+
+
+class IndiceAlcancabilidade:
+    @instrumentacao.medido()
+    def __init__(self, G: Any, modo: str = MODO_AUTOMATICO,
+                 memoria_maxima: int = MEMORIA_MAXIMA_FECHO):
+        if modo not in (MODO_FECHO, MODO_DOIS_SALTOS, MODO_AUTOMATICO):
+            raise ValueError(f"Modo {modo} invalido")
+
+        csr = como_csr(G)
+
+        self.vertices = list(csr.vertices)
+        self._vertice_idx = {v: i for i, v in enumerate(self.vertices)}
+        self.componentes, self.k, dag_indptr, dag_indices = condensacao(csr)
+
+        if modo == MODO_AUTOMATICO:
+            bytes_fecho = self.k * ((self.k + 63) // 64) * 8
+            modo = MODO_FECHO if bytes_fecho <= memoria_maxima else MODO_DOIS_SALTOS
+
+        self.modo = modo
+        self.linhas = None
+        self._saida = self._entrada = None
+
+        if modo == MODO_FECHO:
+            self.linhas = _fecho_em_bits(self.k, dag_indptr, dag_indices)
+        else:
+            self._saida, self._entrada = _rotulos_dois_saltos(self.k, dag_indptr, dag_indices)
+
+    def _alcanca_componente(self, a: int, b: int) -> bool:
+        if a == b:
+            return True
+        if b > a:
+            return False
+        if self.linhas is not None:
+            return bool((int(self.linhas[a, b >> 6]) >> (b & 63)) & 1)
+        return not set(self._saida[a]).isdisjoint(self._entrada[b])
+
+    def alcanca(self, origem: Any, destino: Any) -> bool:
+        if origem not in self._vertice_idx or destino not in self._vertice_idx:
+            return False
+        comp = self.componentes
+        return self._alcanca_componente(int(comp[self._vertice_idx[origem]]),
+                                        int(comp[self._vertice_idx[destino]]))
+
+    @instrumentacao.medido()
+    def alcanca_lote(self, pares: Iterable[Tuple[Any, Any]]) -> np.ndarray:
+        pares = list(pares)
+        validos = np.fromiter((u in self._vertice_idx and v in self._vertice_idx for u, v in pares),
+                              dtype=bool, count=len(pares))
+        ids = np.array([(self._vertice_idx[u], self._vertice_idx[v])
+                        for (u, v), ok in zip(pares, validos) if ok], dtype=np.int64).reshape(-1, 2)
+        a, b = self.componentes[ids[:, 0]], self.componentes[ids[:, 1]]
+
+        if self.linhas is not None:
+            palavras = self.linhas[a, b >> 6]
+            resultado = ((palavras >> (b & 63).astype(np.uint64)) & np.uint64(1)).astype(bool)
+        else:
+            resultado = np.fromiter((self._alcanca_componente(x, y) for x, y in zip(a.tolist(), b.tolist())),
+                                    dtype=bool, count=len(a))
+
+        respostas = np.zeros(len(pares), dtype=bool)
+        respostas[validos] = resultado
+        return respostas
+
+    def alcancaveis(self, origem: Any) -> List[Any]:
+        if origem not in self._vertice_idx:
+            return []
+        comp = self.componentes
+        a = int(comp[self._vertice_idx[origem]])
+        alvos = np.array([self._alcanca_componente(a, b) for b in range(self.k)], dtype=bool)
+        return [self.vertices[i] for i in np.flatnonzero(alvos[comp]).tolist()]
+
+    def memoria_em_bytes(self) -> int:
+        total = self.componentes.nbytes
+        if self.linhas is not None:
+            return total + self.linhas.nbytes
+        rotulos = sum(len(r) for r in self._saida) + sum(len(r) for r in self._entrada)
+        return total + 4 * rotulos
+
+    def salvar(self, caminho: str) -> None:
+        tipo_rotulos, tabela = codificar_rotulos(self.vertices)
+        arrays = {"modo": np.array(_CODIGOS_MODO[self.modo]),
+                  "tipo_rotulos": np.array(tipo_rotulos),
+                  "rotulos": np.frombuffer(tabela, dtype=np.uint8),
+                  "componentes": self.componentes}
+
+        if self.linhas is not None:
+            arrays["linhas"] = self.linhas
+        else:
+            arrays["saida_indptr"], arrays["saida"] = _compactar(self._saida)
+            arrays["entrada_indptr"], arrays["entrada"] = _compactar(self._entrada)
+
+        with open(caminho, "wb") as arquivo:
+            np.savez(arquivo, **arrays)
+
+    @classmethod
+    def carregar(cls, caminho: str) -> "IndiceAlcancabilidade":
+        with np.load(caminho, allow_pickle=False) as dados:
+            indice = cls.__new__(cls)
+            indice.componentes = dados["componentes"]
+            indice.k = int(indice.componentes.max()) + 1 if len(indice.componentes) else 0
+            indice.vertices = decodificar_rotulos(int(dados["tipo_rotulos"]), dados["rotulos"],
+                                                  len(indice.componentes))
+            indice._vertice_idx = {v: i for i, v in enumerate(indice.vertices)}
+            indice.linhas = None
+            indice._saida = indice._entrada = None
+
+            if int(dados["modo"]) == _CODIGOS_MODO[MODO_FECHO]:
+                indice.modo = MODO_FECHO
+                indice.linhas = dados["linhas"]
+            else:
+                indice.modo = MODO_DOIS_SALTOS
+                indice._saida = _listas(dados["saida_indptr"], dados["saida"])
+                indice._entrada = _listas(dados["entrada_indptr"], dados["entrada"])
+
+        return indice
+
+
+if __name__ == "__main__":
+    import os
+    import tempfile
+    from .grafo_utils import Grafo
+
+    print("Teste 1: Fecho transitivo em bits")
+    g1 = Grafo(vertices=['A', 'B', 'C', 'D', 'E'],
+               arestas=[('A', 'B'), ('B', 'C'), ('C', 'A'), ('C', 'D')])
+    indice = IndiceAlcancabilidade(g1, modo=MODO_FECHO)
+    print("Componentes:", indice.componentes, "k =", indice.k)
+    print("A alcanca D?", indice.alcanca('A', 'D'))
+    print("D alcanca A?", indice.alcanca('D', 'A'))
+    print("Alcancaveis a partir de B:", indice.alcancaveis('B'))
+    print("Lote:", indice.alcanca_lote([('A', 'D'), ('D', 'A'), ('E', 'E'), ('A', 'X')]))
+    print()
+
+    print("Teste 2: Rotulos de 2 saltos")
+    indice2 = IndiceAlcancabilidade(g1, modo=MODO_DOIS_SALTOS)
+    print("A alcanca D?", indice2.alcanca('A', 'D'))
+    print("D alcanca A?", indice2.alcanca('D', 'A'))
+    print("Memoria (bytes):", indice2.memoria_em_bytes())
+    print()
+
+    print("Teste 3: Salvar e carregar")
+    with tempfile.TemporaryDirectory() as pasta:
+        for idx in (indice, indice2):
+            caminho = os.path.join(pasta, f"indice_{idx.modo}.npz")
+            idx.salvar(caminho)
+            carregado = IndiceAlcancabilidade.carregar(caminho)
+            print(f"Modo {carregado.modo}: B alcanca D?", carregado.alcanca('B', 'D'),
+                  "| E alcanca A?", carregado.alcanca('E', 'A'))
@@ -0,0 +1,211 @@
+# Fluxo maximo (Dinic) sobre arrays de adjacencia
+# Os arcos ficam em listas paralelas (cauda, cabeca, capacidade) e o reverso do arco e e
+# o arco e ^ 1; as saidas de cada vertice sao uma fatia contigua de _arcos, como no CSR.
+# A mesma rede serve para varios pares origem/destino: cada chamada de fluxo parte das
+# capacidades originais, e um limite opcional para a busca assim que o fluxo o alcanca.
+
+import numpy as np
+from collections import deque
+from typing import List, Tuple, Any, Union, Optional
+
+from . import instrumentacao
+from .grafo_csr import como_csr
+
+
+class RedeDeFluxo:
+    def __init__(self, n: int):
+        self.n = n
+        self._cauda: List[int] = []
+        self._cabeca: List[int] = []
+        self._capacidade: List[float] = []
+        self._residual: Optional[List[float]] = None
+        self._inicio: Optional[List[int]] = None
+        self._arcos: Optional[List[int]] = None
+
+    @classmethod
+    def de_arrays(cls, n: int, origens: Any, destinos: Any, capacidades: Any,
+                  capacidades_reversas: Any = 0) -> "RedeDeFluxo":
+        # um arco u -> v por posicao, com o reverso v -> u logo em seguida
+        origens = np.asarray(origens, dtype=np.int64)
+        destinos = np.asarray(destinos, dtype=np.int64)
+        m = len(origens)
+
+        cauda = np.empty(2 * m, dtype=np.int64)
+        cauda[0::2], cauda[1::2] = origens, destinos
+        capacidade = np.empty(2 * m, dtype=np.result_type(capacidades, capacidades_reversas))
+        capacidade[0::2], capacidade[1::2] = capacidades, capacidades_reversas
+
+        rede = cls(n)
+        rede._cauda = cauda.tolist()
+        rede._cabeca = np.column_stack((destinos, origens)).ravel().tolist()
+        rede._capacidade = capacidade.tolist()
+        return rede
+
+    def adicionar_arco(self, u: int, v: int, capacidade: float, capacidade_reversa: float = 0) -> int:
+        e = len(self._cabeca)
+        self._cauda += (u, v)
+        self._cabeca += (v, u)
+        self._capacidade += (capacidade, capacidade_reversa)
+        self._inicio = None
+        return e
+
+    def _preparar(self) -> None:
+        if self._inicio is not None:
+            return
+        cauda = np.asarray(self._cauda, dtype=np.int64)
+        self._arcos = np.argsort(cauda, kind="stable").tolist()
+        self._inicio = [0] + np.cumsum(np.bincount(cauda, minlength=self.n)).tolist()
+
+    def _niveis(self, s: int, t: int = -1) -> List[int]:
+        # BFS no residual; -1 para quem nao e alcancado. Com destino t, para no nivel de t:
+        # vertices mais fundos nao entram em nenhum caminho aumentante desta fase
+        inicio, arcos, cabeca, residual = self._inicio, self._arcos, self._cabeca, self._residual
+        nivel = [-1] * self.n
+        nivel[s] = 0
+        fila = deque([s])
+
+        while fila:
+            v = fila.popleft()
+            if t >= 0 and 0 <= nivel[t] <= nivel[v]:
+                break
+            for p in range(inicio[v], inicio[v + 1]):
+                e = arcos[p]
+                w = cabeca[e]
+                if residual[e] > 0 and nivel[w] < 0:
+                    nivel[w] = nivel[v] + 1
+                    fila.append(w)
+
+        if instrumentacao.ativo:
+            percorridas = sum(inicio[v + 1] - inicio[v] for v in range(self.n) if nivel[v] >= 0)
+            instrumentacao.arestas_percorridas("fluxo_maximo.RedeDeFluxo.fluxo", percorridas)
+        return nivel
+
+    def _bloquear(self, s: int, t: int, nivel: List[int], limite: float) -> float:
+        # caminhos aumentantes na rede de niveis ate o fluxo ficar bloqueante; a DFS e
+        # iterativa e cada vertice guarda o ponteiro do proximo arco a tentar
+        inicio, arcos, cabeca, residual = self._inicio, self._arcos, self._cabeca, self._residual
+        ponteiro = inicio[:-1]
+        total = 0
+        caminho = []
+        v = s
+
+        while total < limite:
+            if v == t:
+                gargalo = min(limite - total, min(residual[e] for e in caminho))
+                for e in caminho:
+                    residual[e] -= gargalo
+                    residual[e ^ 1] += gargalo
+                total += gargalo
+                caminho.clear()
+                v = s
+                continue
+
+            p, fim = ponteiro[v], inicio[v + 1]
+            proximo = nivel[v] + 1
+            while p < fim:
+                e = arcos[p]
+                if residual[e] > 0 and nivel[cabeca[e]] == proximo:
+                    break
+                p += 1
+            ponteiro[v] = p
+
+            if p < fim:
+                caminho.append(arcos[p])
+                v = cabeca[arcos[p]]
+            elif v == s:
+                break
+            else:
+                # beco sem saida: sai da rede de niveis e o pai tenta o proximo arco
+                nivel[v] = -1
+                v = self._cauda[caminho.pop()]
+                ponteiro[v] += 1
+
+        if instrumentacao.ativo:
+            percorridas = sum(p - i for p, i in zip(ponteiro, inicio))
+            instrumentacao.arestas_percorridas("fluxo_maximo.RedeDeFluxo.fluxo", percorridas)
+        return total
+
+    def fluxo(self, s: int, t: int, limite: float = float("inf")) -> float:
+        # se o valor devolvido for menor que o limite, ele e o fluxo maximo de s para t
+        if s == t:
+            raise ValueError("Origem e destino do fluxo devem ser diferentes")
+        self._preparar()
+        self._residual = list(self._capacidade)
+        total = 0
+
+        while total < limite:
+            nivel = self._niveis(s, t)
+            if nivel[t] < 0:
+                break
+            total += self._bloquear(s, t, nivel, limite - total)
+        return total
+
+    def lado_da_origem(self, s: int) -> List[bool]:
+        # depois de um fluxo maximo: quem ainda e alcancado de s no residual (corte minimo)
+        return [nivel >= 0 for nivel in self._niveis(s)]
+
+    def corte(self, lado: List[bool]) -> List[Tuple[int, int]]:
+        # pares (u, v) do lado da origem para o outro, um por arco adicionado (ou pelo
+        # seu reverso, quando so ele tem capacidade nesse sentido)
+        pares = []
+        for e in range(0, len(self._cabeca), 2):
+            u, v = self._cauda[e], self._cabeca[e]
+            if lado[u] and not lado[v] and self._capacidade[e] > 0:
+                pares.append((u, v))
+            elif lado[v] and not lado[u] and self._capacidade[e + 1] > 0:
+                pares.append((v, u))
+        return pares
+
+
+def rede_do_grafo(G: Any, pesos: bool = True) -> RedeDeFluxo:
+    # capacidade = peso da aresta (1 sem pesos ou com pesos=False), paralelas somadas pelo
+    # fluxo; aresta nao direcionada vira um par de arcos com a mesma capacidade; lacos saem
+    csr = como_csr(G)
+    origens = csr.origens_idx()
+    destinos = np.asarray(csr.indices, dtype=np.int64)
+    if pesos and csr.weights is not None:
+        capacidades = np.asarray(csr.weights)
+    else:
+        capacidades = np.ones(len(destinos), dtype=np.int64)
+
+    manter = origens < destinos if not csr.direcionado else origens != destinos
+    capacidades = capacidades[manter]
+    reversas = 0 if csr.direcionado else capacidades
+    return RedeDeFluxo.de_arrays(len(csr.vertices), origens[manter], destinos[manter], capacidades, reversas)
+
+
+@instrumentacao.medido()
+def fluxo_maximo(G: Any, origem: Union[str, int], destino: Union[str, int]) -> Tuple[float, List[Tuple]]:
+    # (valor do fluxo maximo, arestas de um corte minimo, do lado da origem para o outro)
+    csr = como_csr(G)
+    vertice_idx = {v: i for i, v in enumerate(csr.vertices)}
+    if origem not in vertice_idx or destino not in vertice_idx:
+        raise ValueError(f"Vertices {origem} ou {destino} nao existem")
+
+    rede = rede_do_grafo(csr)
+    s = vertice_idx[origem]
+    valor = rede.fluxo(s, vertice_idx[destino])
+    corte = rede.corte(rede.lado_da_origem(s))
+    return valor, [(csr.vertices[u], csr.vertices[v]) for u, v in corte]
+
+
+if __name__ == "__main__":
+    from .grafo_utils import Grafo
+
+    print("Teste 1: Fluxo maximo com capacidades nos pesos")
+    g1 = Grafo(vertices=['s', 'a', 'b', 't'],
+               arestas={('s', 'a'): 3, ('s', 'b'): 2, ('a', 'b'): 1, ('a', 't'): 2, ('b', 't'): 3})
+    print("Fluxo e corte:", fluxo_maximo(g1, 's', 't'))
+    print()
+
+    print("Teste 2: Grafo nao direcionado sem pesos (arestas disjuntas)")
+    g2 = Grafo(vertices=[1, 2, 3, 4, 5], direcionado=False,
+               arestas=[(1, 2), (1, 3), (2, 4), (3, 4), (4, 5), (2, 3)])
+    print("Fluxo e corte de 1 para 5:", fluxo_maximo(g2, 1, 5))
+    print("Fluxo e corte de 1 para 4:", fluxo_maximo(g2, 1, 4))
+    print()
+
+    print("Teste 3: Mesma rede, varios pares e limite")
+    rede = rede_do_grafo(g2)
+    print("Fluxo de 0 para 3:", rede.fluxo(0, 3))
+    print("Fluxo de 0 para 3 ate 1:", rede.fluxo(0, 3, limite=1))
@@ -0,0 +1,155 @@
+# Formato binario de grafos com carga por np.memmap
+# Layout (little-endian, secoes alinhadas em 8 bytes):
+#   cabecalho (128 bytes) | tabela de labels | indptr int64[n+1] | indices int32[m]
+#   | grau de entrada int64[n] | pesos float64[m] (so se ponderado)
+# Abrir o arquivo nao le as arestas: os arrays do GrafoCSR apontam direto para as
+# paginas mapeadas, que o sistema operacional compartilha entre processos.
+
+import struct
+import numpy as np
+from typing import List, Union, Any
+
+from .grafo_csr import GrafoCSR
+
+MAGICO = b"GRAFOCSR"
+VERSAO = 1
+TAMANHO_CABECALHO = 128
+_CABECALHO = struct.Struct("<8sIIQQIIQQQQQQ")
+
+DIRECIONADO = 1
+PONDERADO = 2
+
+ROTULOS_INTERVALO = 0
+ROTULOS_INTEIROS = 1
+ROTULOS_GENERICOS = 2
+
+
+def _alinhar(posicao: int) -> int:
+    return (posicao + 7) & ~7
+
+
+def codificar_rotulos(vertices: List[Union[str, int]]) -> tuple:
+    tipos = {type(v) for v in vertices}
+
+    if tipos <= {int} and vertices == list(range(len(vertices))):
+        return ROTULOS_INTERVALO, b""
+
+    if tipos == {int}:
+        return ROTULOS_INTEIROS, np.asarray(vertices, dtype=np.int64).tobytes()
+
+    # generico: um byte de tipo por vertice (0 = int, 1 = str), offsets e texto utf-8
+    eh_str = np.fromiter((isinstance(v, str) for v in vertices), dtype=np.uint8, count=len(vertices))
+    textos = [str(v).encode("utf-8") for v in vertices]
+    offsets = np.zeros(len(vertices) + 1, dtype=np.int64)
+    np.cumsum([len(t) for t in textos], out=offsets[1:])
+
+    tabela = eh_str.tobytes()
+    tabela += b"\0" * (_alinhar(len(tabela)) - len(tabela))
+    return ROTULOS_GENERICOS, tabela + offsets.tobytes() + b"".join(textos)
+
+
+def decodificar_rotulos(tipo: int, dados: Any, n: int) -> List[Union[str, int]]:
+    if tipo == ROTULOS_INTERVALO:
+        return list(range(n))
+
+    if tipo == ROTULOS_INTEIROS:
+        return np.frombuffer(dados, dtype=np.int64, count=n).tolist()
+
+    inicio_offsets = _alinhar(n)
+    eh_str = np.frombuffer(dados, dtype=np.uint8, count=n).tolist()
+    offsets = np.frombuffer(dados, dtype=np.int64, count=n + 1, offset=inicio_offsets).tolist()
+    texto = bytes(dados[inicio_offsets + 8 * (n + 1):])
+
+    vertices = []
+    for i in range(n):
+        rotulo = texto[offsets[i]:offsets[i + 1]].decode("utf-8")
+        vertices.append(rotulo if eh_str[i] else int(rotulo))
+    return vertices
+
+
+def salvar_binario(G: Any, caminho: str) -> None:
+    csr = G if isinstance(G, GrafoCSR) else G.para_csr()
+    n, m = len(csr.vertices), len(csr.indices)
+
+    tipo_rotulos, tabela = codificar_rotulos(csr.vertices)
+    secoes = [tabela,
+              np.ascontiguousarray(csr.indptr, dtype=np.int64).tobytes(),
+              np.ascontiguousarray(csr.indices, dtype=np.int32).tobytes(),
+              np.ascontiguousarray(csr._grau_entrada, dtype=np.int64).tobytes()]
+    if csr.weights is not None:
+        secoes.append(np.ascontiguousarray(csr.weights, dtype=np.float64).tobytes())
+
+    offsets = []
+    posicao = TAMANHO_CABECALHO
+    for secao in secoes:
+        offsets.append(posicao)
+        posicao = _alinhar(posicao + len(secao))
+
+    if csr.weights is None:
+        offsets.append(0)
+
+    flags = (DIRECIONADO if csr.direcionado else 0) | (PONDERADO if csr.weights is not None else 0)
+    cabecalho = _CABECALHO.pack(MAGICO, VERSAO, flags, n, m, tipo_rotulos, 0,
+                                offsets[0], len(tabela), offsets[1], offsets[2], offsets[3], offsets[4])
+
+    with open(caminho, "wb") as arquivo:
+        arquivo.write(cabecalho.ljust(TAMANHO_CABECALHO, b"\0"))
+        for offset, secao in zip(offsets, secoes):
+            arquivo.seek(offset)
+            arquivo.write(secao)
+
+
+def abrir_binario(caminho: str) -> GrafoCSR:
+    with open(caminho, "rb") as arquivo:
+        bruto = arquivo.read(TAMANHO_CABECALHO)
+
+    if len(bruto) < _CABECALHO.size:
+        raise ValueError(f"Arquivo {caminho} nao e um grafo binario valido")
+
+    (magico, versao, flags, n, m, tipo_rotulos, _, off_rotulos, tam_rotulos,
+     off_indptr, off_indices, off_grau, off_pesos) = _CABECALHO.unpack_from(bruto)
+
+    if magico != MAGICO:
+        raise ValueError(f"Arquivo {caminho} nao e um grafo binario valido")
+    if versao != VERSAO:
+        raise ValueError(f"Versao {versao} do formato nao suportada (esperada {VERSAO})")
+
+    def mapear(dtype: Any, offset: int, quantidade: int) -> np.ndarray:
+        if quantidade == 0:
+            return np.empty(0, dtype=dtype)
+        return np.memmap(caminho, dtype=dtype, mode="r", offset=offset, shape=(quantidade,))
+
+    rotulos = mapear(np.uint8, off_rotulos, tam_rotulos)
+    vertices = decodificar_rotulos(tipo_rotulos, rotulos, n)
+
+    indptr = mapear(np.int64, off_indptr, n + 1)
+    indices = mapear(np.int32, off_indices, m)
+    grau_entrada = mapear(np.int64, off_grau, n)
+    pesos = mapear(np.float64, off_pesos, m) if flags & PONDERADO else None
+
+    return GrafoCSR.de_buffers(vertices, indptr, indices, pesos, grau_entrada,
+                               direcionado=bool(flags & DIRECIONADO))
+
+
+if __name__ == "__main__":
+    import os
+    import tempfile
+    from .grafo_utils import Grafo
+
+    print("Teste 1: Salvar e reabrir grafo ponderado")
+    g1 = Grafo(vertices=['A', 'B', 'C', 7], direcionado=False,
+               arestas={('A', 'B'): 5, ('B', 'C'): 2.5, ('C', 7): 1})
+
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = os.path.join(pasta, "g1.grafo")
+        salvar_binario(g1, caminho)
+        print("Tamanho do arquivo (bytes):", os.path.getsize(caminho))
+
+        g2 = abrir_binario(caminho)
+        print("indices mapeados?", isinstance(g2.indices, np.memmap))
+        print("Vertices:", g2.vertices)
+        print("Lista de adjacencia:", g2.lista_adjacencias())
+        print("Grau de entrada:", g2.grau_entrada_dos_vertices())
+        print("Peso de (C, 7):", g2.peso_aresta(('C', 7)))
+        print("Existe caminho de A para 7?", g2.caminho_existe('A', 7))
+        del g2
@@ -0,0 +1,460 @@
+# Representacao CSR (compressed sparse row) de um grafo
+# Vertices viram ids inteiros 0..n-1 e as arestas ficam em tres arrays NumPy:
+#   indptr[i]:indptr[i+1] -> fatia de `indices`/`weights` com os sucessores de i
+# Consultas de grau sao O(1) e de vizinhanca O(grau), sem varrer todas as arestas.
+
+import numpy as np
+from collections import deque
+from typing import List, Dict, Tuple, Union, Any, Optional, Iterable
+
+
+class _IndiceVertices:
+    # Traduz arrays de labels para ids inteiros sem laco Python por aresta:
+    # labels homogeneos sao ordenados uma vez e consultados com searchsorted.
+    def __init__(self, vertices: List[Union[str, int]]):
+        self.vertices = vertices
+        self.n = len(vertices)
+        tipos = {type(v) for v in vertices}
+        
+        self._identidade = tipos <= {int} and vertices == list(range(self.n))
+        self._dict = None
+        self._ordenados = None
+        
+        if not self._identidade and len(tipos) == 1:
+            rotulos = np.asarray(vertices)
+            self._ordem = np.argsort(rotulos, kind="stable")
+            self._ordenados = rotulos[self._ordem]
+    
+    def _ids_por_dict(self, rotulos: np.ndarray) -> np.ndarray:
+        if self._dict is None:
+            self._dict = {v: i for i, v in enumerate(self.vertices)}
+        
+        try:
+            return np.fromiter((self._dict[r] for r in rotulos.tolist()),
+                               dtype=np.int64, count=len(rotulos))
+        except KeyError as e:
+            raise ValueError(f"Aresta contem vertice nao existente: {e.args[0]}")
+    
+    def ids(self, rotulos: Any) -> np.ndarray:
+        rotulos = np.asarray(rotulos)
+        if len(rotulos) == 0:
+            return np.empty(0, dtype=np.int64)
+        
+        # labels heterogeneos (nos vertices ou nas arestas) comparam pelo tipo exato
+        if rotulos.dtype == object or (not self._identidade and self._ordenados is None):
+            return self._ids_por_dict(rotulos)
+        
+        if self._identidade:
+            if rotulos.dtype.kind not in "iu":
+                raise ValueError("Arestas contem vertices nao existentes")
+            invalidos = (rotulos < 0) | (rotulos >= self.n)
+            ids = rotulos.astype(np.int64)
+        else:
+            if rotulos.dtype.kind != self._ordenados.dtype.kind:
+                raise ValueError("Arestas contem vertices nao existentes")
+            pos = np.searchsorted(self._ordenados, rotulos)
+            pos[pos == self.n] = 0
+            invalidos = self._ordenados[pos] != rotulos
+            ids = self._ordem[pos]
+        
+        if np.any(invalidos):
+            raise ValueError(f"Aresta contem vertice nao existente: {rotulos[np.argmax(invalidos)]}")
+        return ids
+
+
+class GrafoCSR:
+    def __init__(self, vertices: List[Union[str, int]],
+                 arestas: Union[List[Tuple], Dict[Tuple, Union[int, float]]],
+                 direcionado: bool = True):
+
+        self.direcionado = direcionado
+
+        for v in vertices:
+            if not isinstance(v, (str, int)):
+                raise ValueError("Os labels dos vertices devem ser inteiros ou strings")
+
+        self.vertices = list(vertices)
+        self._vertice_idx = {v: i for i, v in enumerate(self.vertices)}
+
+        if len(self._vertice_idx) != len(self.vertices):
+            raise ValueError("Os labels dos vertices devem ser unicos")
+
+        if isinstance(arestas, list):
+            self.ponderado = False
+            pares = arestas
+            pesos = None
+        elif isinstance(arestas, dict):
+            self.ponderado = True
+            pares = list(arestas.keys())
+            pesos = np.empty(len(pares), dtype=np.float64)
+            for k, valor in enumerate(arestas.values()):
+                if not isinstance(valor, (int, float)):
+                    raise ValueError("Pesos das arestas devem ser numericos")
+                pesos[k] = valor
+        else:
+            raise ValueError("Arestas devem ser list ou dict")
+
+        origens = np.empty(len(pares), dtype=np.int64)
+        destinos = np.empty(len(pares), dtype=np.int64)
+
+        for k, a in enumerate(pares):
+            if not isinstance(a, tuple) or len(a) != 2:
+                raise ValueError("Arestas devem ser tuplas de tamanho 2")
+
+            u, v = a
+            if u not in self._vertice_idx or v not in self._vertice_idx:
+                raise ValueError(f"Aresta {a} contem vertices nao existentes")
+
+            origens[k] = self._vertice_idx[u]
+            destinos[k] = self._vertice_idx[v]
+
+        if not direcionado:
+            origens, destinos = (np.column_stack((origens, destinos)).ravel(),
+                                 np.column_stack((destinos, origens)).ravel())
+            if pesos is not None:
+                pesos = np.repeat(pesos, 2)
+
+        self._montar(origens, destinos, pesos)
+
+    @classmethod
+    def de_arrays(cls, vertices: List[Union[str, int]], origens: Any, destinos: Any,
+                  pesos: Optional[Any] = None, direcionado: bool = True) -> "GrafoCSR":
+        bloco = (origens, destinos) if pesos is None else (origens, destinos, pesos)
+        return cls.de_blocos(vertices, [bloco], direcionado)
+    
+    @classmethod
+    def de_blocos(cls, vertices: List[Union[str, int]], blocos: Iterable[Tuple],
+                  direcionado: bool = True) -> "GrafoCSR":
+        vertices = vertices.tolist() if isinstance(vertices, np.ndarray) else list(vertices)
+        for v in vertices:
+            if not isinstance(v, (str, int)):
+                raise ValueError("Os labels dos vertices devem ser inteiros ou strings")
+        
+        if len(set(vertices)) != len(vertices):
+            raise ValueError("Os labels dos vertices devem ser unicos")
+        
+        indice = _IndiceVertices(vertices)
+        
+        # cada bloco vira imediatamente ids int32 (4 bytes por ponta)
+        tipo_id = np.int32 if len(vertices) < 2 ** 31 else np.int64
+        lista_origens, lista_destinos, lista_pesos = [], [], []
+        ponderado = None
+        
+        for bloco in blocos:
+            if len(bloco) not in (2, 3):
+                raise ValueError("Blocos devem ser (origens, destinos) ou (origens, destinos, pesos)")
+            
+            bloco_ponderado = len(bloco) == 3 and bloco[2] is not None
+            if ponderado is None:
+                ponderado = bloco_ponderado
+            elif ponderado != bloco_ponderado:
+                raise ValueError("Todos os blocos devem ter (ou nao ter) pesos")
+            
+            o = indice.ids(bloco[0]).astype(tipo_id)
+            d = indice.ids(bloco[1]).astype(tipo_id)
+            if len(o) != len(d):
+                raise ValueError("Origens e destinos devem ter o mesmo tamanho")
+            
+            lista_origens.append(o)
+            lista_destinos.append(d)
+            
+            if ponderado:
+                try:
+                    p = np.asarray(bloco[2], dtype=np.float64)
+                except (TypeError, ValueError):
+                    raise ValueError("Pesos das arestas devem ser numericos")
+                if len(p) != len(o):
+                    raise ValueError("Pesos devem ter o mesmo tamanho das arestas")
+                lista_pesos.append(p)
+        
+        origens = np.concatenate(lista_origens) if lista_origens else np.empty(0, dtype=tipo_id)
+        destinos = np.concatenate(lista_destinos) if lista_destinos else np.empty(0, dtype=tipo_id)
+        pesos = np.concatenate(lista_pesos) if ponderado else None
+        del lista_origens, lista_destinos, lista_pesos
+        
+        if not direcionado:
+            origens, destinos = (np.column_stack((origens, destinos)).ravel(),
+                                 np.column_stack((destinos, origens)).ravel())
+            if pesos is not None:
+                pesos = np.repeat(pesos, 2)
+        
+        csr = cls.__new__(cls)
+        csr.direcionado = direcionado
+        csr.ponderado = bool(ponderado)
+        csr.vertices = vertices
+        csr._vertice_idx = {v: i for i, v in enumerate(vertices)}
+        csr._montar(origens, destinos, pesos)
+        return csr
+    
+    @classmethod
+    def de_indices(cls, vertices: List[Union[str, int]], origens: np.ndarray, destinos: np.ndarray,
+                   pesos: Optional[np.ndarray], direcionado: bool) -> "GrafoCSR":
+        # origens/destinos ja sao posicoes em vertices e ja trazem as duas direcoes
+        # quando o grafo nao e direcionado, como nos indices internos do Grafo
+        csr = cls.__new__(cls)
+        csr.direcionado = direcionado
+        csr.ponderado = pesos is not None
+        csr.vertices = list(vertices)
+        csr._vertice_idx = {v: i for i, v in enumerate(csr.vertices)}
+        csr._montar(origens, destinos, pesos)
+        return csr
+    
+    @classmethod
+    def de_buffers(cls, vertices: List[Union[str, int]], indptr: np.ndarray, indices: np.ndarray,
+                   weights: Optional[np.ndarray], grau_entrada: np.ndarray,
+                   direcionado: bool) -> "GrafoCSR":
+        # usa os arrays como vieram (por exemplo np.memmap), sem copiar
+        csr = cls.__new__(cls)
+        csr.direcionado = direcionado
+        csr.ponderado = weights is not None
+        csr.vertices = vertices
+        csr._vertice_idx = {v: i for i, v in enumerate(vertices)}
+        csr.indptr = indptr
+        csr.indices = indices
+        csr.weights = weights
+        csr._grau_entrada = grau_entrada
+        return csr
+    
+    @classmethod
+    def de_grafo(cls, G: Any) -> "GrafoCSR":
+        # G.arestas ja guarda as duas direcoes quando o grafo nao e direcionado
+        arestas = dict(G.arestas.items()) if G.ponderado else list(G.arestas)
+        csr = cls(G.vertices, arestas, direcionado=True)
+        csr.direcionado = G.direcionado
+        return csr
+
+    def _montar(self, origens: np.ndarray, destinos: np.ndarray,
+                pesos: Optional[np.ndarray]) -> None:
+        n = len(self.vertices)
+
+        if pesos is not None and len(origens) > 0:
+            # mesma semantica do dict: a ultima ocorrencia de (u, v) vence
+            chaves = origens.astype(np.int64) * max(n, 1) + destinos
+            _, ultimas = np.unique(chaves[::-1], return_index=True)
+            manter = np.sort(len(chaves) - 1 - ultimas)
+            origens, destinos, pesos = origens[manter], destinos[manter], pesos[manter]
+
+        ordem = np.argsort(origens.astype(np.int64) * max(n, 1) + destinos, kind="stable")
+
+        self.indices = destinos[ordem].astype(np.int32)
+        self.weights = pesos[ordem] if pesos is not None else None
+
+        del ordem
+        self.indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(origens, minlength=n), out=self.indptr[1:])
+
+        self._grau_entrada = np.bincount(self.indices, minlength=n)
+
+    def _idx(self, v: Union[str, int]) -> int:
+        if v not in self._vertice_idx:
+            raise ValueError(f"Vertice {v} nao existe no grafo")
+        return self._vertice_idx[v]
+
+    def vizinhos_idx(self, i: int) -> np.ndarray:
+        return self.indices[self.indptr[i]:self.indptr[i + 1]]
+
+    def grau_entrada_dos_vertices(self) -> Dict[Any, int]:
+        return dict(zip(self.vertices, self._grau_entrada.tolist()))
+
+    def grau_saida_dos_vertices(self) -> Dict[Any, int]:
+        return dict(zip(self.vertices, np.diff(self.indptr).tolist()))
+
+    def graus_de_um_vertice(self, v: Union[str, int]) -> Tuple[int, int]:
+        i = self._idx(v)
+        return int(self._grau_entrada[i]), int(self.indptr[i + 1] - self.indptr[i])
+
+    def verificar_aresta(self, aresta: Tuple) -> bool:
+        if not isinstance(aresta, tuple) or len(aresta) != 2:
+            return False
+
+        u, v = aresta
+        if u not in self._vertice_idx or v not in self._vertice_idx:
+            return False
+
+        vizinhos = self.vizinhos_idx(self._vertice_idx[u])
+        j = self._vertice_idx[v]
+        pos = np.searchsorted(vizinhos, j)
+        return bool(pos < len(vizinhos) and vizinhos[pos] == j)
+
+    def peso_aresta(self, aresta: Tuple) -> Union[int, float]:
+        u, v = aresta
+        i, j = self._idx(u), self._idx(v)
+        inicio = self.indptr[i]
+        vizinhos = self.indices[inicio:self.indptr[i + 1]]
+        pos = np.searchsorted(vizinhos, j)
+
+        if pos >= len(vizinhos) or vizinhos[pos] != j:
+            raise ValueError(f"Aresta {aresta} nao existe no grafo")
+
+        return 1 if self.weights is None else self.weights[inicio + pos].item()
+
+    def vertice_isolado(self, v: Union[str, int]) -> bool:
+        i = self._idx(v)
+        return bool(self._grau_entrada[i] == 0 and self.indptr[i + 1] == self.indptr[i])
+
+    def vertices_vizinhos(self, v: Union[str, int]) -> List[Any]:
+        vizinhos = np.unique(self.vizinhos_idx(self._idx(v)))
+        return [self.vertices[j] for j in vizinhos.tolist()]
+
+    def lista_adjacencias(self) -> Dict[Any, List[Any]]:
+        return {v: self.vertices_vizinhos(v) for v in self.vertices}
+
+    def numero_de_arestas(self) -> int:
+        return len(self.indices)
+    
+    def caminho_existe(self, origem: Union[str, int], destino: Union[str, int]) -> bool:
+        if origem not in self._vertice_idx or destino not in self._vertice_idx:
+            return False
+        
+        s, t = self._vertice_idx[origem], self._vertice_idx[destino]
+        if s == t:
+            return True
+        
+        visitados = bytearray(len(self.vertices))
+        visitados[s] = 1
+        fila = deque([s])
+        
+        while fila:
+            atual = fila.popleft()
+            for w in self.vizinhos_idx(atual).tolist():
+                if w == t:
+                    return True
+                if not visitados[w]:
+                    visitados[w] = 1
+                    fila.append(w)
+        
+        return False
+
+    def origens_idx(self) -> np.ndarray:
+        return np.repeat(np.arange(len(self.vertices), dtype=self.indices.dtype), np.diff(self.indptr))
+    
+    def memoria_em_bytes(self) -> int:
+        total = self.indptr.nbytes + self.indices.nbytes + self._grau_entrada.nbytes
+        if self.weights is not None:
+            total += self.weights.nbytes
+        return total
+
+    def matriz_esparsa(self, dtype: Any = None) -> "MatrizEsparsa":
+        # mesmos valores da matriz densa: 1 por par (u, v) mesmo com arestas paralelas, ou o peso
+        n = len(self.vertices)
+        origens = self.origens_idx()
+        distintas = np.ones(len(self.indices), dtype=bool)
+        distintas[1:] = (origens[1:] != origens[:-1]) | (self.indices[1:] != self.indices[:-1])
+
+        if dtype is None:
+            dtype = np.int64 if self.weights is None else np.float64
+
+        if self.weights is None:
+            dados = np.ones(int(distintas.sum()), dtype=dtype)
+        else:
+            dados = np.asarray(self.weights[distintas], dtype=dtype)
+
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(origens[distintas], minlength=n), out=indptr[1:])
+        return MatrizEsparsa(indptr, np.asarray(self.indices[distintas]), dados, (n, n))
+
+
+def como_csr(G: Any) -> GrafoCSR:
+    # aceita GrafoCSR, Grafo (usa o CSR em cache) ou qualquer objeto com vertices/arestas
+    if isinstance(G, GrafoCSR):
+        return G
+    if hasattr(G, "para_csr"):
+        return G.para_csr()
+    return GrafoCSR.de_grafo(G)
+
+
+class MatrizEsparsa:
+    # matriz de adjacencia em CSR; indices ordenados dentro de cada linha
+    def __init__(self, indptr: np.ndarray, indices: np.ndarray, dados: np.ndarray,
+                 forma: Tuple[int, int]):
+        self.indptr = indptr
+        self.indices = indices
+        self.dados = dados
+        self.forma = forma
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return self.forma
+
+    @property
+    def dtype(self) -> np.dtype:
+        return self.dados.dtype
+
+    @property
+    def data(self) -> np.ndarray:
+        return self.dados
+
+    @property
+    def nnz(self) -> int:
+        return len(self.indices)
+
+    def linha(self, i: int) -> Tuple[np.ndarray, np.ndarray]:
+        inicio, fim = self.indptr[i], self.indptr[i + 1]
+        return self.indices[inicio:fim], self.dados[inicio:fim]
+
+    def para_coo(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        linhas = np.repeat(np.arange(self.forma[0], dtype=self.indices.dtype), np.diff(self.indptr))
+        return linhas, self.indices, self.dados
+
+    def tocsr(self) -> "MatrizEsparsa":
+        return self
+
+    def toarray(self) -> np.ndarray:
+        densa = np.zeros(self.forma, dtype=self.dados.dtype)
+        linhas, colunas, dados = self.para_coo()
+        densa[linhas, colunas] = dados
+        return densa
+
+    def para_scipy(self) -> Any:
+        try:
+            from scipy.sparse import csr_matrix
+        except ImportError:
+            raise ImportError("Conversao para scipy.sparse requer o pacote scipy instalado") from None
+        return csr_matrix((self.dados, self.indices, self.indptr), shape=self.forma)
+
+    def __repr__(self) -> str:
+        return f"MatrizEsparsa(forma={self.forma}, nnz={self.nnz}, dtype={self.dtype})"
+
+
+if __name__ == "__main__":
+    print("Teste 1: Grafo direcionado simples")
+    g1 = GrafoCSR(vertices=[1, 2, 3, 4], arestas=[(1, 2), (2, 3), (1, 3)])
+    print("indptr:", g1.indptr)
+    print("indices:", g1.indices)
+    print("Grau de entrada:", g1.grau_entrada_dos_vertices())
+    print("Grau de saida:", g1.grau_saida_dos_vertices())
+    print("Graus do vertice 3:", g1.graus_de_um_vertice(3))
+    print("Vizinhos de 1:", g1.vertices_vizinhos(1))
+    print("Vertice 4 e isolado?", g1.vertice_isolado(4))
+    print("Existe aresta (2, 3)?", g1.verificar_aresta((2, 3)))
+    print("Existe aresta (3, 2)?", g1.verificar_aresta((3, 2)))
+    print()
+
+    print("Teste 2: Grafo ponderado nao direcionado")
+    g2 = GrafoCSR(vertices=['A', 'B', 'C'], direcionado=False,
+                  arestas={('A', 'B'): 5, ('B', 'C'): 2.5})
+    print("weights:", g2.weights)
+    print("Peso de (C, B):", g2.peso_aresta(('C', 'B')))
+    print("Lista de adjacencia:", g2.lista_adjacencias())
+    print("Numero de arestas:", g2.numero_de_arestas())
+    print("Memoria (bytes):", g2.memoria_em_bytes())
+    print()
+
+    print("Teste 3: Carga em lote a partir de arrays")
+    origens = np.array([0, 1, 2, 3])
+    destinos = np.array([1, 2, 3, 0])
+    g3 = GrafoCSR.de_arrays(list(range(4)), origens, destinos, direcionado=False)
+    print("indptr:", g3.indptr, "indices:", g3.indices)
+    blocos = ((np.array(['A', 'B']), np.array(['B', 'C']), np.array([1.0, 2.0])),
+              (np.array(['C']), np.array(['A']), np.array([3.0])))
+    g4 = GrafoCSR.de_blocos(['A', 'B', 'C'], blocos)
+    print("Lista de adjacencia:", g4.lista_adjacencias())
+    print("Peso de (C, A):", g4.peso_aresta(('C', 'A')))
+    print()
+
+    print("Teste 4: Matriz de adjacencia esparsa")
+    m4 = g4.matriz_esparsa(dtype=np.float32)
+    print(m4)
+    print("COO:", m4.para_coo())
+    print("Densa:")
+    print(m4.toarray())
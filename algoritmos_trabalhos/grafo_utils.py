@@ -1,8 +1,205 @@
 import numpy as np
-from typing import List, Dict, Tuple, Union, Any, Optional
+from collections import Counter
+from collections.abc import Mapping, MutableMapping
+from typing import List, Dict, Tuple, Union, Any, Callable, Optional
+
+from . import conexidade
+from . import caminhos_minimos
+from . import instrumentacao
+from .alcancabilidade import busca_bidirecional, MotorAlcancabilidade
+from .grafo_csr import GrafoCSR, MatrizEsparsa
+from .isomorfismo import hash_canonico, isomorfismo
+from .k_conexidade import conectividade_de_arestas, conectividade_de_vertices, corte_minimo_global
+from .pontes import Biconexidade, PontesIncrementais
+
+# chave de um arco no indice ordenado do grafo: (id de origem << 32) | id de destino
+_DESLOCAMENTO = 32
+_MASCARA = (1 << _DESLOCAMENTO) - 1
+
+
+class MulticonjuntoArestas:
+    # Arestas de grafos nao ponderados, vistas a partir dos indices do grafo. Nao guarda
+    # nada alem da referencia ao grafo: pertinencia e remocao continuam O(1), arestas
+    # paralelas sao mantidas pela contagem e append/remove passam pelo grafo, entao os
+    # indices ficam sempre em dia. A iteracao segue a ordem de insercao de cada par, com
+    # as copias de uma aresta paralela juntas.
+    __slots__ = ("_grafo",)
+    
+    def __init__(self, grafo: "Grafo"):
+        self._grafo = grafo
+    
+    def _ids(self, aresta: Tuple) -> Optional[Tuple[int, int]]:
+        if not isinstance(aresta, tuple) or len(aresta) != 2:
+            return None
+        
+        ids = self._grafo._ids
+        u, v = aresta
+        if u not in ids or v not in ids:
+            return None
+        return ids[u], ids[v]
+    
+    def append(self, aresta: Tuple) -> None:
+        ids = self._ids(aresta)
+        if ids is None:
+            raise ValueError(f"Aresta {aresta} contem vertices nao existentes")
+        
+        self._grafo._registrar_arco(*ids)
+        self._grafo._invalidar_caches()
+    
+    def extend(self, arestas: List[Tuple]) -> None:
+        for aresta in arestas:
+            self.append(aresta)
+    
+    def remove(self, aresta: Tuple) -> None:
+        if self.multiplicidade(aresta) == 0:
+            raise ValueError(f"Aresta {aresta} nao existe")
+        
+        self._grafo._desregistrar_arco(*self._ids(aresta))
+        self._grafo._invalidar_caches()
+    
+    def remover_todas(self, aresta: Tuple) -> int:
+        quantidade = self.multiplicidade(aresta)
+        for _ in range(quantidade):
+            self._grafo._desregistrar_arco(*self._ids(aresta))
+        if quantidade:
+            self._grafo._invalidar_caches()
+        return quantidade
+    
+    def multiplicidade(self, aresta: Tuple) -> int:
+        ids = self._ids(aresta)
+        if ids is None:
+            return 0
+        return self._grafo._sucessores[ids[0]].get(ids[1], 0)
+    
+    def items(self):
+        rotulos = self._grafo._rotulos
+        for chave, quantidade in self._grafo._arcos.items():
+            yield (rotulos[chave >> _DESLOCAMENTO], rotulos[chave & _MASCARA]), quantidade
+    
+    def __contains__(self, aresta: Tuple) -> bool:
+        return self.multiplicidade(aresta) > 0
+    
+    def __len__(self) -> int:
+        return self._grafo._numero_arcos
+    
+    def __iter__(self):
+        for aresta, quantidade in self.items():
+            for _ in range(quantidade):
+                yield aresta
+    
+    def __eq__(self, outro: Any) -> bool:
+        if isinstance(outro, MulticonjuntoArestas):
+            return dict(self.items()) == dict(outro.items())
+        return Counter(self) == Counter(outro)
+    
+    def __repr__(self) -> str:
+        return repr(list(self))
+
+
+class ArestasPonderadas(MutableMapping):
+    # Arestas de grafos ponderados: dict (u, v) -> peso visto a partir do indice ordenado
+    # de arcos do grafo. Escrever ou apagar uma chave passa pelo grafo, entao graus e
+    # adjacencias acompanham; cada chave e um arco (como no dict, (v, u) e outra chave).
+    __slots__ = ("_grafo",)
+    
+    def __init__(self, grafo: "Grafo"):
+        self._grafo = grafo
+    
+    def _chave(self, aresta: Any) -> Optional[int]:
+        if not isinstance(aresta, tuple) or len(aresta) != 2:
+            return None
+        
+        ids = self._grafo._ids
+        u, v = aresta
+        if u not in ids or v not in ids:
+            return None
+        return ids[u] << _DESLOCAMENTO | ids[v]
+    
+    def __getitem__(self, aresta: Tuple) -> Union[int, float]:
+        chave = self._chave(aresta)
+        if chave is None or chave not in self._grafo._arcos:
+            raise KeyError(aresta)
+        return self._grafo._arcos[chave]
+    
+    def __setitem__(self, aresta: Tuple, peso: Union[int, float]) -> None:
+        chave = self._chave(aresta)
+        if chave is None:
+            raise ValueError(f"Aresta {aresta} contem vertices nao existentes")
+        if not isinstance(peso, (int, float)):
+            raise ValueError("Pesos das arestas devem ser numericos")
+        
+        self._grafo._definir_peso(chave >> _DESLOCAMENTO, chave & _MASCARA, peso)
+        self._grafo._invalidar_caches()
+    
+    def __delitem__(self, aresta: Tuple) -> None:
+        chave = self._chave(aresta)
+        if chave is None or chave not in self._grafo._arcos:
+            raise KeyError(aresta)
+        
+        self._grafo._desregistrar_arco(chave >> _DESLOCAMENTO, chave & _MASCARA)
+        self._grafo._invalidar_caches()
+    
+    def __contains__(self, aresta: Any) -> bool:
+        chave = self._chave(aresta)
+        return chave is not None and chave in self._grafo._arcos
+    
+    def __len__(self) -> int:
+        return len(self._grafo._arcos)
+    
+    def __iter__(self):
+        rotulos = self._grafo._rotulos
+        for chave in self._grafo._arcos:
+            yield rotulos[chave >> _DESLOCAMENTO], rotulos[chave & _MASCARA]
+    
+    def items(self):
+        rotulos = self._grafo._rotulos
+        for chave, peso in self._grafo._arcos.items():
+            yield (rotulos[chave >> _DESLOCAMENTO], rotulos[chave & _MASCARA]), peso
+    
+    def values(self):
+        return self._grafo._arcos.values()
+    
+    def __repr__(self) -> str:
+        return repr(dict(self.items()))
+
+
+class ListaAdjacencias(Mapping):
+    # label -> vizinhos de saida (labels), lidos do indice de sucessores a cada acesso na
+    # ordem em que cada vizinho apareceu; nada e copiado nem precisa ser atualizado
+    __slots__ = ("_grafo",)
+    
+    def __init__(self, grafo: "Grafo"):
+        self._grafo = grafo
+    
+    def __getitem__(self, v: Union[str, int]) -> List[Any]:
+        if v not in self._grafo._ids:
+            raise KeyError(v)
+        rotulos = self._grafo._rotulos
+        return [rotulos[j] for j in self._grafo._sucessores[self._grafo._ids[v]]]
+    
+    def __iter__(self):
+        return iter(self._grafo.vertices)
+    
+    def __len__(self) -> int:
+        return len(self._grafo.vertices)
+    
+    def __repr__(self) -> str:
+        return repr(dict(self.items()))
 
 
 class Grafo:
+    # Cada vertice recebe um id inteiro estavel na insercao (_ids: label -> id,
+    # _rotulos: id -> label, None depois de removido). Indices, graus e arestas sao
+    # guardados por id; labels so aparecem na entrada e na saida da API. _arcos guarda
+    # cada par (origem, destino) uma vez, na ordem de insercao, com a multiplicidade
+    # (sem pesos) ou o peso; arestas e lista_adjacencias() sao visoes sobre esses indices.
+    __slots__ = ("direcionado", "ponderado", "vertices", "arestas",
+                 "_ids", "_rotulos", "_posicoes_cache",
+                 "_sucessores", "_antecessores", "_grau_entrada", "_grau_saida",
+                 "_arcos", "_numero_arcos",
+                 "_csr_cache", "_matriz_esparsa_cache", "_alcancabilidade_cache",
+                 "_biconexidade_cache")
+    
     def __init__(self, vertices: List[Union[str, int]], 
                  arestas: Union[List[Tuple], Dict[Tuple, Union[int, float]]], 
                  direcionado: bool = True):
@@ -14,10 +211,11 @@ class Grafo:
                 raise ValueError("Os labels dos vertices devem ser inteiros ou strings")
         
         self.vertices = vertices
-        self._vertices_set = set(vertices)
+        self._iniciar_indices()
+        ids = self._ids
         
         if isinstance(arestas, list):
-            self.arestas = []
+            self.arestas = MulticonjuntoArestas(self)
             self.ponderado = False
             
             for a in arestas:
@@ -25,16 +223,15 @@ class Grafo:
                     raise ValueError("Arestas devem ser tuplas de tamanho 2")
                 
                 u, v = a
-                if u not in self._vertices_set or v not in self._vertices_set:
+                if u not in ids or v not in ids:
                     raise ValueError(f"Aresta {a} contem vertices nao existentes")
                 
+                self._registrar_arco(ids[u], ids[v])
                 if not direcionado:
-                    self.arestas.extend([(u, v), (v, u)])
-                else:
-                    self.arestas.append((u, v))
+                    self._registrar_arco(ids[v], ids[u])
         
         elif isinstance(arestas, dict):
-            self.arestas = {}
+            self.arestas = ArestasPonderadas(self)
             self.ponderado = True
             
             for aresta, valor in arestas.items():
@@ -42,28 +239,174 @@ class Grafo:
                     raise ValueError("Arestas devem ser tuplas de tamanho 2")
                 
                 u, v = aresta
-                if u not in self._vertices_set or v not in self._vertices_set:
+                if u not in ids or v not in ids:
                     raise ValueError(f"Aresta {aresta} contem vertices nao existentes")
                 
                 if not isinstance(valor, (int, float)):
                     raise ValueError("Pesos das arestas devem ser numericos")
                 
+                self._definir_peso(ids[u], ids[v], valor)
                 if not direcionado:
-                    self.arestas[aresta] = valor
-                    self.arestas[(v, u)] = valor
-                else:
-                    self.arestas[aresta] = valor
+                    self._definir_peso(ids[v], ids[u], valor)
         
         else:
             raise ValueError("Arestas devem ser list ou dict")
         
-        self._lista_adj_cache = None
+        self._invalidar_caches()
+
+    @property
+    def _vertices_set(self) -> Dict[Any, int]:
+        # compatibilidade: consultas "v in G._vertices_set" usam o proprio indice de ids
+        return self._ids
+
+    def _invalidar_caches(self) -> None:
+        self._posicoes_cache = None
+        self._csr_cache = None
+        self._matriz_esparsa_cache = {}
+        self._alcancabilidade_cache = None
+        self._biconexidade_cache = None
+
+    def _iniciar_indices(self) -> None:
+        # multiconjuntos de sucessores/antecessores e contadores de grau por id,
+        # mantidos pelos mutadores para que nenhuma consulta precise varrer as arestas
+        n = len(self.vertices)
+        self._ids = {v: i for i, v in enumerate(self.vertices)}
+        self._rotulos = list(self.vertices)
+        self._sucessores = [{} for _ in range(n)]
+        self._antecessores = [{} for _ in range(n)]
+        self._grau_entrada = [0] * n
+        self._grau_saida = [0] * n
+        self._arcos = {}
+        self._numero_arcos = 0
+
+    def _registrar_arco(self, i: int, j: int, quantidade: int = 1) -> None:
+        sucessores = self._sucessores[i]
+        if j in sucessores:
+            sucessores[j] += quantidade
+        else:
+            sucessores[j] = quantidade
+        
+        antecessores = self._antecessores[j]
+        antecessores[i] = antecessores.get(i, 0) + quantidade
+        
+        if not self.ponderado:
+            chave = i << _DESLOCAMENTO | j
+            self._arcos[chave] = self._arcos.get(chave, 0) + quantidade
+        
+        self._grau_saida[i] += quantidade
+        self._grau_entrada[j] += quantidade
+        self._numero_arcos += quantidade
+
+    def _desregistrar_arco(self, i: int, j: int) -> None:
+        sucessores = self._sucessores[i]
+        sucessores[j] -= 1
+        if sucessores[j] == 0:
+            del sucessores[j]
+        
+        antecessores = self._antecessores[j]
+        antecessores[i] -= 1
+        if antecessores[i] == 0:
+            del antecessores[i]
+        
+        chave = i << _DESLOCAMENTO | j
+        if self.ponderado:
+            del self._arcos[chave]
+        else:
+            self._arcos[chave] -= 1
+            if self._arcos[chave] == 0:
+                del self._arcos[chave]
+        
+        self._grau_saida[i] -= 1
+        self._grau_entrada[j] -= 1
+        self._numero_arcos -= 1
+
+    def _definir_peso(self, i: int, j: int, peso: Union[int, float]) -> None:
+        if j not in self._sucessores[i]:
+            self._registrar_arco(i, j)
+        self._arcos[i << _DESLOCAMENTO | j] = peso
+
+    def _posicoes(self) -> np.ndarray:
+        # id -> posicao em self.vertices; ids crescem na ordem de insercao, entao a
+        # posicao de um id e o numero de ids vivos antes dele
+        if self._posicoes_cache is None:
+            vivos = np.fromiter((r is not None for r in self._rotulos), dtype=bool,
+                                count=len(self._rotulos))
+            self._posicoes_cache = np.cumsum(vivos) - 1
+        return self._posicoes_cache
+
+    def _arcos_por_posicao(self) -> Tuple[np.ndarray, np.ndarray, Optional[np.ndarray]]:
+        chaves = np.fromiter(self._arcos, dtype=np.int64, count=len(self._arcos))
+        if not self.ponderado:
+            contagens = np.fromiter(self._arcos.values(), dtype=np.int64, count=len(chaves))
+            chaves = np.repeat(chaves, contagens)
+            pesos = None
+        else:
+            pesos = np.fromiter(self._arcos.values(), dtype=np.float64, count=len(chaves))
+        origens, destinos = chaves >> _DESLOCAMENTO, chaves & _MASCARA
+        
+        if len(self._rotulos) != len(self.vertices):
+            posicoes = self._posicoes()
+            origens, destinos = posicoes[origens], posicoes[destinos]
+        return origens, destinos, pesos
+
+    @staticmethod
+    def _agrupar_por_id(chaves: np.ndarray, vizinhos: np.ndarray, contagens: np.ndarray,
+                        n: int) -> List[Dict[int, int]]:
+        # um dict vizinho -> multiplicidade por id, cortado de fatias de um arranjo ordenado
+        # por chave (ordenacao estavel: dentro de cada id fica a ordem de entrada)
+        ordem = np.argsort(chaves, kind="stable")
+        limites = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(chaves, minlength=n), out=limites[1:])
+        vizinhos, contagens, limites = vizinhos[ordem].tolist(), contagens[ordem].tolist(), limites.tolist()
+        return [dict(zip(vizinhos[limites[i]:limites[i + 1]], contagens[limites[i]:limites[i + 1]]))
+                for i in range(n)]
+
+    @classmethod
+    def de_csr(cls, csr: GrafoCSR) -> "Grafo":
+        G = cls(list(csr.vertices), {} if csr.ponderado else [], csr.direcionado)
+        
+        n = len(csr.vertices)
+        chaves = csr.origens_idx().astype(np.int64) << _DESLOCAMENTO | csr.indices.astype(np.int64)
+        
+        # cada par (origem, destino) uma vez, na ordem da primeira ocorrencia, como se os
+        # arcos fossem registrados um a um; com pesos vale o ultimo peso do par
+        unicas, primeiras, contagens = np.unique(chaves, return_index=True, return_counts=True)
+        ordem = np.argsort(primeiras, kind="stable")
+        if csr.ponderado:
+            _, ultimas = np.unique(chaves[::-1], return_index=True)
+            valores = csr.weights[len(chaves) - 1 - ultimas][ordem]
+            contagens = np.ones(len(unicas), dtype=np.int64)
+        else:
+            contagens = contagens[ordem]
+            valores = contagens
+        unicas = unicas[ordem]
+        origens, destinos = unicas >> _DESLOCAMENTO, unicas & _MASCARA
+        
+        G._arcos = dict(zip(unicas.tolist(), valores.tolist()))
+        G._grau_saida = np.bincount(origens, weights=contagens, minlength=n).astype(np.int64).tolist()
+        G._grau_entrada = np.bincount(destinos, weights=contagens, minlength=n).astype(np.int64).tolist()
+        G._numero_arcos = int(contagens.sum())
+        G._sucessores = cls._agrupar_por_id(origens, destinos, contagens, n)
+        G._antecessores = cls._agrupar_por_id(destinos, origens, contagens, n)
+        
+        G._csr_cache = csr
+        return G
+    
+    @classmethod
+    def de_arrays(cls, vertices: List[Union[str, int]], origens: Any, destinos: Any,
+                  pesos: Optional[Any] = None, direcionado: bool = True) -> "Grafo":
+        return cls.de_csr(GrafoCSR.de_arrays(vertices, origens, destinos, pesos, direcionado))
+    
+    @classmethod
+    def de_blocos(cls, vertices: List[Union[str, int]], blocos: Any,
+                  direcionado: bool = True) -> "Grafo":
+        return cls.de_csr(GrafoCSR.de_blocos(vertices, blocos, direcionado))
 
     def printar_grafo(self) -> None:
         print(f"G=(V = [", end="")
         print(", ".join(map(str, self.vertices)), end="], A = [")
         
-        if isinstance(self.arestas, list):
+        if not self.ponderado:
             arestas_str = ", ".join(str(a) for a in self.arestas)
             print(arestas_str, end="")
         else:
@@ -73,81 +416,45 @@ class Grafo:
         print("])")
 
     def grau_entrada_dos_vertices(self) -> Dict[Any, int]:
-        graus = {v: 0 for v in self.vertices}
-        
-        if isinstance(self.arestas, list):
-            for _, v in self.arestas:
-                graus[v] += 1
-        else:
-            for (_, v) in self.arestas:
-                graus[v] += 1
-        
-        return graus
+        grau, ids = self._grau_entrada, self._ids
+        return {v: grau[ids[v]] for v in self.vertices}
     
     def grau_saida_dos_vertices(self) -> Dict[Any, int]:
-        graus = {v: 0 for v in self.vertices}
-        
-        if isinstance(self.arestas, list):
-            for u, _ in self.arestas:
-                graus[u] += 1
-        else:
-            for (u, _) in self.arestas:
-                graus[u] += 1
-        
-        return graus
+        grau, ids = self._grau_saida, self._ids
+        return {v: grau[ids[v]] for v in self.vertices}
     
     def graus_de_um_vertice(self, v: Union[str, int]) -> Tuple[int, int]:
-        if v not in self._vertices_set:
+        if v not in self._ids:
             raise ValueError(f"Vertice {v} nao existe no grafo")
         
-        entrada = saida = 0
-        
-        if isinstance(self.arestas, list):
-            for u, w in self.arestas:
-                if u == v:
-                    saida += 1
-                if w == v:
-                    entrada += 1
-        else:
-            for (u, w) in self.arestas:
-                if u == v:
-                    saida += 1
-                if w == v:
-                    entrada += 1
-        
-        return entrada, saida
+        i = self._ids[v]
+        return self._grau_entrada[i], self._grau_saida[i]
     
     def verificar_aresta(self, aresta: Tuple) -> bool:
-        if isinstance(self.arestas, list):
-            return aresta in self.arestas
-        else:
-            return aresta in self.arestas
+        return aresta in self.arestas
     
     def vertice_isolado(self, v: Union[str, int]) -> bool:
-        if v not in self._vertices_set:
+        if v not in self._ids:
             raise ValueError(f"Vertice {v} nao existe no grafo")
         
-        if isinstance(self.arestas, list):
-            for u, w in self.arestas:
-                if v in (u, w):
-                    return False
-        else:
-            for (u, w) in self.arestas:
-                if v in (u, w):
-                    return False
-        
-        return True
+        i = self._ids[v]
+        return self._grau_entrada[i] == 0 and self._grau_saida[i] == 0
     
     def adicionar_vertice(self, v: Union[str, int]) -> None:
         if not isinstance(v, (str, int)):
             raise ValueError("Vertice a adicionar deve ser string ou inteiro")
         
-        if v in self._vertices_set:
+        if v in self._ids:
             raise ValueError(f"Vertice {v} ja existe no grafo")
         
         self.vertices.append(v)
-        self._vertices_set.add(v)
-        self._lista_adj_cache = None
+        self._ids[v] = len(self._rotulos)
+        self._rotulos.append(v)
+        self._sucessores.append({})
+        self._antecessores.append({})
+        self._grau_entrada.append(0)
+        self._grau_saida.append(0)
+        self._invalidar_caches()
 
     def adicionar_aresta(self, aresta: Tuple, peso: Union[int, float] = 1) -> None:
         if not isinstance(aresta, tuple) or len(aresta) != 2:
@@ -155,117 +462,127 @@ class Grafo:
         
         u, v = aresta
         
-        if u not in self._vertices_set or v not in self._vertices_set:
+        if u not in self._ids or v not in self._ids:
             raise ValueError(f"Vertices {u} ou {v} nao existem")
         
-        if isinstance(self.arestas, list):
+        if not self.ponderado:
+            i, j = self._ids[u], self._ids[v]
+            self._registrar_arco(i, j)
             if not self.direcionado:
-                self.arestas.extend([(u, v), (v, u)])
-            else:
-                self.arestas.append(aresta)
+                self._registrar_arco(j, i)
         else:
+            i, j = self._ids[u], self._ids[v]
+            self._definir_peso(i, j, peso)
             if not self.direcionado:
-                self.arestas[aresta] = peso
-                self.arestas[(v, u)] = peso
-            else:
-                self.arestas[aresta] = peso
+                self._definir_peso(j, i, peso)
         
-        self._lista_adj_cache = None
+        self._invalidar_caches()
     
     def remover_vertice(self, v: Union[str, int]) -> None:
-        if v not in self._vertices_set:
+        if v not in self._ids:
             raise ValueError(f"Vertice {v} nao existe no grafo")
         
+        i = self._ids.pop(v)
         self.vertices.remove(v)
-        self._vertices_set.remove(v)
-        
-        if isinstance(self.arestas, list):
-            self.arestas = [(u, w) for u, w in self.arestas if u != v and w != v]
-        else:
-            self.arestas = {(u, w): peso for (u, w), peso in self.arestas.items() 
-                           if u != v and w != v}
-        
-        self._lista_adj_cache = None
+        sucessores, antecessores = self._sucessores[i], self._antecessores[i]
+        rotulos = self._rotulos
+        
+        for j in sucessores:
+            del self._arcos[i << _DESLOCAMENTO | j]
+        for u in antecessores:
+            if u != i:
+                del self._arcos[u << _DESLOCAMENTO | i]
+        
+        for j, multiplicidade in sucessores.items():
+            if j != i:
+                del self._antecessores[j][i]
+                self._grau_entrada[j] -= multiplicidade
+        
+        for u, multiplicidade in antecessores.items():
+            if u != i:
+                del self._sucessores[u][i]
+                self._grau_saida[u] -= multiplicidade
+        
+        self._numero_arcos -= self._grau_saida[i] + self._grau_entrada[i] - sucessores.get(i, 0)
+        self._sucessores[i] = self._antecessores[i] = None
+        self._grau_entrada[i] = self._grau_saida[i] = 0
+        rotulos[i] = None
+        
+        self._invalidar_caches()
     
     def remover_aresta(self, aresta: Tuple) -> None:
-        if isinstance(self.arestas, list):
-            if aresta in self.arestas:
-                self.arestas.remove(aresta)
-                if not self.direcionado:
-                    self.arestas.remove((aresta[1], aresta[0]))
-        else:
-            if aresta in self.arestas:
-                del self.arestas[aresta]
+        if aresta in self.arestas:
+            u, v = aresta
+            i, j = self._ids[u], self._ids[v]
+            
+            if not self.ponderado:
+                self._desregistrar_arco(i, j)
                 if not self.direcionado:
-                    del self.arestas[(aresta[1], aresta[0])]
+                    self._desregistrar_arco(j, i)
+            else:
+                self._desregistrar_arco(i, j)
+                if not self.direcionado and i != j:
+                    self._desregistrar_arco(j, i)
         
-        self._lista_adj_cache = None
+        self._invalidar_caches()
     
-    def lista_adjacencias(self) -> Dict[Any, List[Any]]:
-        if self._lista_adj_cache is not None:
-            return self._lista_adj_cache
-        
-        lista_adjacencias = {v: [] for v in self.vertices}
-        
-        if isinstance(self.arestas, list):
-            for v1, v2 in self.arestas:
-                if v2 not in lista_adjacencias[v1]:
-                    lista_adjacencias[v1].append(v2)
-        else:
-            for (v1, v2) in self.arestas:
-                if v2 not in lista_adjacencias[v1]:
-                    lista_adjacencias[v1].append(v2)
-        
-        self._lista_adj_cache = lista_adjacencias
-        return lista_adjacencias
+    def lista_adjacencias(self) -> ListaAdjacencias:
+        return ListaAdjacencias(self)
+    
+    def para_csr(self) -> GrafoCSR:
+        instrumentacao.cache("Grafo.csr", self._csr_cache is not None)
+        if self._csr_cache is None:
+            origens, destinos, pesos = self._arcos_por_posicao()
+            self._csr_cache = GrafoCSR.de_indices(self.vertices, origens, destinos, pesos, self.direcionado)
+        return self._csr_cache
     
-    def matriz_de_adjacencias(self) -> List[List[int]]:
+    @instrumentacao.medido()
+    def matriz_de_adjacencias(self, esparsa: bool = False,
+                              dtype: Any = None) -> Union[List[List[int]], MatrizEsparsa]:
+        if esparsa:
+            chave = np.dtype(dtype) if dtype is not None else None
+            instrumentacao.cache("Grafo.matriz_esparsa", chave in self._matriz_esparsa_cache)
+            if chave not in self._matriz_esparsa_cache:
+                self._matriz_esparsa_cache[chave] = self.para_csr().matriz_esparsa(dtype)
+            return self._matriz_esparsa_cache[chave]
+        
         tam = len(self.vertices)
         matriz = [[0 for _ in range(tam)] for _ in range(tam)]
         
-        vertice_idx = {v: i for i, v in enumerate(self.vertices)}
+        origens, destinos, _ = self._arcos_por_posicao()
+        valores = self.arestas.values() if self.ponderado else [1] * len(origens)
         
-        if isinstance(self.arestas, list):
-            for v1, v2 in self.arestas:
-                i1, i2 = vertice_idx[v1], vertice_idx[v2]
-                matriz[i1][i2] = 1
-        else:
-            for (v1, v2), peso in self.arestas.items():
-                i1, i2 = vertice_idx[v1], vertice_idx[v2]
-                matriz[i1][i2] = peso
+        for i1, i2, valor in zip(origens.tolist(), destinos.tolist(), valores):
+            matriz[i1][i2] = valor
         
         return matriz
 
-    def conexo_por_mm(self, m: Optional[List[List[int]]] = None, 
+    @instrumentacao.medido()
+    def conexo_por_mm(self, m: Optional[Union[List[List[int]], MatrizEsparsa]] = None, 
                       ignorar_indices: Optional[List[int]] = None) -> bool:
-        tam = len(self.vertices)
-        R = np.zeros((tam, tam), dtype=int)
-        
         if m is None:
-            m = np.array(self.matriz_de_adjacencias())
-        else:
-            m = np.array(m)
+            sucessores = conexidade.sucessores_por_indice(self)
+            return conexidade.conexo_por_adjacencias(sucessores, ignorar_indices)
         
-        if ignorar_indices is None:
-            ignorar_indices = []
-
-        for i in range(1, tam + 1):
-            R += np.linalg.matrix_power(m, i)
-
-        np.fill_diagonal(R, 1)
-
-        for i in ignorar_indices:
-            for j in range(tam):
-                R[i][j] = 1
-                R[j][i] = 1
-
-        return np.all(R > 0)
+        return conexidade.conexo_por_matriz(m, ignorar_indices)
+    
+    def eh_conexo(self) -> bool:
+        return conexidade.eh_conexo(self)
+    
+    def eh_fortemente_conexo(self) -> bool:
+        return conexidade.eh_fortemente_conexo(self)
+    
+    def componentes_conexas(self) -> Dict[Any, int]:
+        return conexidade.componentes_conexas(self)
+    
+    def componentes_fortemente_conexas(self) -> Dict[Any, int]:
+        return conexidade.componentes_fortemente_conexas(self)
+    
+    def numero_de_componentes(self, fortes: bool = False) -> int:
+        return conexidade.numero_de_componentes(self, fortes)
     
     def numero_de_arestas(self) -> int:
-        if isinstance(self.arestas, list):
-            return len(self.arestas)
-        else:
-            return len(self.arestas)
+        return len(self.arestas)
     
     def densidade(self) -> float:
         n = len(self.vertices)
@@ -282,53 +599,86 @@ class Grafo:
         return abs(self.densidade() - 1.0) < 1e-9
     
     def vertices_vizinhos(self, v: Union[str, int]) -> List[Any]:
-        if v not in self._vertices_set:
+        if v not in self._ids:
             raise ValueError(f"Vertice {v} nao existe no grafo")
         
-        vizinhos = set()
+        i, rotulos = self._ids[v], self._rotulos
+        if self.direcionado:
+            return [rotulos[j] for j in self._sucessores[i]]
         
-        if isinstance(self.arestas, list):
-            for u, w in self.arestas:
-                if u == v:
-                    vizinhos.add(w)
-                if not self.direcionado and w == v:
-                    vizinhos.add(u)
-        else:
-            for (u, w) in self.arestas:
-                if u == v:
-                    vizinhos.add(w)
-                if not self.direcionado and w == v:
-                    vizinhos.add(u)
-        
-        return list(vizinhos)
+        return [rotulos[j] for j in self._sucessores[i].keys() | self._antecessores[i].keys()]
     
+    @instrumentacao.medido()
     def caminho_existe(self, origem: Union[str, int], destino: Union[str, int]) -> bool:
-        if origem not in self._vertices_set or destino not in self._vertices_set:
+        if origem not in self._ids or destino not in self._ids:
             return False
         
-        if origem == destino:
-            return True
-        
-        visitados = set()
-        fila = [origem]
-        
-        while fila:
-            atual = fila.pop(0)
-            if atual == destino:
-                return True
-            
-            if atual in visitados:
-                continue
-                
-            visitados.add(atual)
-            
-            lista_adj = self.lista_adjacencias()
-            for vizinho in lista_adj[atual]:
-                if vizinho not in visitados:
-                    fila.append(vizinho)
-        
-        return False
-
+        # os indices de sucessores e antecessores ja sao as listas de adjacencia direta e reversa
+        return busca_bidirecional(self._sucessores, self._antecessores,
+                                  self._ids[origem], self._ids[destino])
+    
+    def dijkstra(self, origens: Any, destino: Optional[Union[str, int]] = None) -> caminhos_minimos.CaminhosMinimos:
+        return caminhos_minimos.dijkstra(self, origens, destino)
+    
+    def bellman_ford(self, origens: Any) -> caminhos_minimos.CaminhosMinimos:
+        return caminhos_minimos.bellman_ford(self, origens)
+    
+    def a_estrela(self, origem: Union[str, int], destino: Union[str, int],
+                  heuristica: Callable[[Any, Any], float]) -> Union[Tuple[List, float], bool]:
+        return caminhos_minimos.a_estrela(self, origem, destino, heuristica)
+    
+    def caminho_minimo(self, origem: Union[str, int], destino: Union[str, int]) -> Union[Tuple[List, float], bool]:
+        return caminhos_minimos.caminho_minimo(self, origem, destino)
+    
+    def matriz_de_distancias(self, dtype: Any = np.float64) -> np.ndarray:
+        return caminhos_minimos.matriz_de_distancias(self, dtype=dtype)
+    
+    def motor_de_alcancabilidade(self) -> MotorAlcancabilidade:
+        instrumentacao.cache("Grafo.alcancabilidade", self._alcancabilidade_cache is not None)
+        if self._alcancabilidade_cache is None:
+            self._alcancabilidade_cache = MotorAlcancabilidade(self, componentes=True)
+        return self._alcancabilidade_cache
+    
+    @instrumentacao.medido()
+    def caminhos_existem(self, pares: List[Tuple]) -> List[bool]:
+        return self.motor_de_alcancabilidade().caminhos_existem(pares)
+    
+    def biconexidade(self) -> Biconexidade:
+        instrumentacao.cache("Grafo.biconexidade", self._biconexidade_cache is not None)
+        if self._biconexidade_cache is None:
+            self._biconexidade_cache = Biconexidade(self)
+        return self._biconexidade_cache
+    
+    def pontes(self) -> List[Tuple]:
+        return self.biconexidade().pontes()
+    
+    def articulacoes(self) -> List[Union[str, int]]:
+        return self.biconexidade().articulacoes()
+    
+    def componentes_biconexas(self) -> List[List[Tuple]]:
+        return self.biconexidade().componentes()
+    
+    def eh_ponte(self, u: Union[str, int], v: Union[str, int]) -> bool:
+        return self.biconexidade().eh_ponte(u, v)
+    
+    def conectividade_de_vertices(self, trabalhadores: int = 1) -> Tuple[int, List]:
+        return conectividade_de_vertices(self, trabalhadores=trabalhadores)
+    
+    def conectividade_de_arestas(self, trabalhadores: int = 1) -> Tuple[int, List[Tuple]]:
+        return conectividade_de_arestas(self, trabalhadores=trabalhadores)
+    
+    def corte_minimo(self) -> Tuple[float, List, List[Tuple]]:
+        return corte_minimo_global(self)
+    
+    def hash_canonico(self) -> str:
+        return hash_canonico(self)
+    
+    def isomorfismo(self, outro: "Grafo") -> Union[Dict[Any, Any], bool]:
+        return isomorfismo(self, outro)
+    
+    def pontes_incrementais(self) -> PontesIncrementais:
+        # estado proprio, sem cache: quem usa remove arestas dele, nao do Grafo
+        return PontesIncrementais(self)
 
 if __name__ == "__main__":
     print("Teste 1: Grafo direcionado simples")
@@ -365,4 +715,44 @@ if __name__ == "__main__":
     print("Densidade do grafo:", grafo1.densidade())
     print("Grafo completo?", grafo1.eh_completo())
     print("Vizinhos do vertice 2:", grafo1.vertices_vizinhos(2))
-    print("Existe caminho de 1 para 4?", grafo1.caminho_existe(1, 4))
\ No newline at end of file
+    print("Existe caminho de 1 para 4?", grafo1.caminho_existe(1, 4))
+    print("Conexo por MM?", grafo1.conexo_por_mm())
+    print("Fracamente conexo?", grafo1.eh_conexo())
+    print("Componentes fortes:", grafo1.componentes_fortemente_conexas())
+    print()
+
+    print("Teste 5: Backend CSR")
+    csr1 = grafo1.para_csr()
+    print("indptr:", csr1.indptr, "indices:", csr1.indices)
+    print("Graus do vertice 2 (CSR):", csr1.graus_de_um_vertice(2))
+    print("Vizinhos do vertice 3 (CSR):", csr1.vertices_vizinhos(3))
+    print()
+
+    print("Teste 6: Carga em lote")
+    grafo3 = Grafo.de_arrays(['x', 'y', 'z'], np.array(['x', 'y']), np.array(['y', 'z']),
+                             pesos=np.array([1.5, 2.5]), direcionado=False)
+    grafo3.printar_grafo()
+    print("Graus de y:", grafo3.graus_de_um_vertice('y'))
+    print()
+
+    print("Teste 7: Matriz de adjacencia esparsa")
+    esparsa = grafo1.matriz_de_adjacencias(esparsa=True, dtype=np.int8)
+    print(esparsa)
+    print("Linha do vertice 1:", esparsa.linha(0))
+    print("Mesma matriz densa?", (esparsa.toarray() == np.array(grafo1.matriz_de_adjacencias())).all())
+    print()
+
+    print("Teste 8: Pontes e articulacoes")
+    grafo4 = Grafo(vertices=[1, 2, 3, 4], direcionado=False, arestas=[(1, 2), (2, 3), (3, 1), (3, 4)])
+    print("Pontes:", grafo4.pontes())
+    print("Articulacoes:", grafo4.articulacoes())
+    print("Componentes biconexas:", grafo4.componentes_biconexas())
+    print("Conectividade de vertices:", grafo4.conectividade_de_vertices())
+    print("Conectividade de arestas:", grafo4.conectividade_de_arestas())
+    print()
+
+    print("Teste 9: Isomorfismo")
+    grafo5 = Grafo(vertices=['a', 'b', 'c', 'd'], direcionado=False,
+                   arestas=[('d', 'c'), ('c', 'b'), ('b', 'd'), ('b', 'a')])
+    print("Isomorfismo:", grafo4.isomorfismo(grafo5))
+    print("Mesmo hash canonico?", grafo4.hash_canonico() == grafo5.hash_canonico())
@@ -0,0 +1,164 @@
+# Instrumentacao opcional: chamadas e tempo por operacao, acertos/falhas dos caches do
+# Grafo e arestas percorridas por consulta. Desligada por padrao; nesse estado cada ponto
+# instrumentado custa so a leitura de um booleano (nenhum contador e tocado).
+#
+# with instrumentar() as medicao:
+#     G.caminho_existe(1, 4)
+# medicao.snapshot()     -> dict
+# medicao.prometheus()   -> texto no formato de exposicao do Prometheus
+#
+# Processos de trabalho (dijkstra_repetido, bellmore_nemhauser_paralelo) tem contadores
+# proprios que nao voltam para o processo principal.
+
+import functools
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from typing import Dict, Any, Callable, Optional, Iterator
+
+ativo = False
+
+_chamadas = Counter()
+_tempos = defaultdict(float)
+_acertos = Counter()
+_falhas = Counter()
+_arestas = Counter()
+
+
+def ativar() -> None:
+    global ativo
+    ativo = True
+
+
+def desativar() -> None:
+    global ativo
+    ativo = False
+
+
+def zerar() -> None:
+    for contador in (_chamadas, _tempos, _acertos, _falhas, _arestas):
+        contador.clear()
+
+
+def medido(nome: Optional[str] = None) -> Callable:
+    # decorador: conta chamadas e soma o tempo (inclusivo) de quem o usa
+    def decorador(funcao: Callable) -> Callable:
+        modulo = funcao.__module__.rpartition(".")[2]
+        rotulo = nome or f"{modulo}.{funcao.__qualname__}"
+
+        @functools.wraps(funcao)
+        def envoltorio(*args, **kwargs):
+            if not ativo:
+                return funcao(*args, **kwargs)
+
+            inicio = time.perf_counter()
+            try:
+                return funcao(*args, **kwargs)
+            finally:
+                _tempos[rotulo] += time.perf_counter() - inicio
+                _chamadas[rotulo] += 1
+
+        return envoltorio
+    return decorador
+
+
+def cache(nome: str, acerto: bool) -> None:
+    if ativo:
+        if acerto:
+            _acertos[nome] += 1
+        else:
+            _falhas[nome] += 1
+
+
+def arestas_percorridas(nome: str, quantidade: int) -> None:
+    # quem chama ja deve ter testado `ativo` antes de calcular a quantidade
+    _arestas[nome] += quantidade
+
+
+def snapshot() -> Dict[str, Any]:
+    caches = sorted(set(_acertos) | set(_falhas))
+    return {
+        "chamadas": dict(_chamadas),
+        "tempo_s": dict(_tempos),
+        "cache": {c: {"acertos": _acertos[c], "falhas": _falhas[c]} for c in caches},
+        "arestas_percorridas": dict(_arestas),
+    }
+
+
+def _escapar(valor: str) -> str:
+    return valor.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def prometheus(prefixo: str = "grafos") -> str:
+    metricas = [
+        ("chamadas_total", "Chamadas por operacao", "operacao", _chamadas),
+        ("tempo_segundos_total", "Tempo de parede acumulado por operacao", "operacao", _tempos),
+        ("cache_acertos_total", "Acertos de cache", "cache", _acertos),
+        ("cache_falhas_total", "Falhas de cache", "cache", _falhas),
+        ("arestas_percorridas_total", "Arestas percorridas por operacao", "operacao", _arestas),
+    ]
+
+    linhas = []
+    for nome, ajuda, rotulo, valores in metricas:
+        linhas.append(f"# HELP {prefixo}_{nome} {ajuda}")
+        linhas.append(f"# TYPE {prefixo}_{nome} counter")
+        for chave in sorted(valores):
+            linhas.append(f"{prefixo}_{nome}{{{rotulo}=\"{_escapar(chave)}\"}} {valores[chave]}")
+    return "\n".join(linhas) + "\n"
+
+
+class Medicao:
+    # visao dos contadores globais devolvida por instrumentar()
+    def snapshot(self) -> Dict[str, Any]:
+        return snapshot()
+
+    def prometheus(self, prefixo: str = "grafos") -> str:
+        return prometheus(prefixo)
+
+    def zerar(self) -> None:
+        zerar()
+
+
+@contextmanager
+def instrumentar(zerar_contadores: bool = True) -> Iterator[Medicao]:
+    global ativo
+    anterior = ativo
+    if zerar_contadores:
+        zerar()
+    ativo = True
+    try:
+        yield Medicao()
+    finally:
+        ativo = anterior
+
+
+if __name__ == "__main__":
+    # os modulos instrumentados usam algoritmos_trabalhos.instrumentacao, nao este __main__
+    from . import instrumentacao
+    from .grafo_utils import Grafo
+    from .alg_fleury import alg_fleury
+
+    print("Teste 1: Desligada por padrao")
+    g1 = Grafo(vertices=[1, 2, 3, 4, 5], arestas=[(1, 2), (2, 3), (3, 1), (3, 4)])
+    g1.caminho_existe(1, 4)
+    print("Snapshot:", instrumentacao.snapshot())
+    print()
+
+    print("Teste 2: Contadores dentro do contexto")
+    with instrumentacao.instrumentar() as medicao:
+        g1.caminho_existe(1, 4)
+        g1.caminho_existe(4, 1)
+        g1.para_csr()
+        g1.para_csr()
+        g1.caminhos_existem([(1, 4), (2, 5)])
+        g2 = Grafo(vertices=['A', 'B', 'C'], direcionado=False,
+                   arestas=[('A', 'B'), ('B', 'C'), ('C', 'A')])
+        alg_fleury(g2)
+    dados = medicao.snapshot()
+    print("Chamadas:", dados["chamadas"])
+    print("Cache:", dados["cache"])
+    print("Arestas percorridas:", dados["arestas_percorridas"])
+    print()
+
+    print("Teste 3: Texto para o Prometheus")
+    print(medicao.prometheus())
@@ -0,0 +1,500 @@
+# Isomorfismo de grafos: refinamento de cores, VF2 e forma canonica
+# Refinamento de cores (Weisfeiler-Lehman): a cor de cada vertice e um hash de 64 bits da
+# cor anterior com o multiconjunto das cores dos vizinhos (de saida e de entrada, com
+# multiplicidade e peso do arco). Como a cor so depende da estrutura, cores de grafos
+# diferentes sao comparaveis, e um lote inteiro de grafos e refinado de uma vez sobre a
+# uniao disjunta dos arrays, sem laco por grafo. Grafos com hashes diferentes nao sao
+# isomorfos; hashes iguais ainda precisam de confirmacao.
+#
+# isomorfismo(G, H): VF2 com candidatos restritos a mesma cor e aos mesmos graus.
+# hash_canonico(G): individualizacao e refinamento; a menor codificacao das arestas entre
+# as folhas da busca e canonica. A busca roda por componente e vertices gemeos (trocaveis
+# por um automorfismo) geram um ramo so; grafos muito simetricos ainda podem custar caro,
+# o alvo sao grafos pequenos.
+# agrupar_isomorfos: baldes pelo hash WL em lote e hash canonico so nos baldes com mais
+# de um grafo, sem comparar pares.
+
+import hashlib
+import numpy as np
+from collections import defaultdict
+from typing import List, Dict, Tuple, Any, Union, Iterable, Iterator, Optional
+
+from . import instrumentacao
+from .grafo_csr import GrafoCSR, como_csr
+from .conexidade import componentes_por_indice
+
+_C1 = np.uint64(0x9E3779B97F4A7C15)
+_C2 = np.uint64(0xBF58476D1CE4E5B9)
+_C3 = np.uint64(0x94D049BB133111EB)
+_INDIVIDUO = np.uint64(0xD6E8FEB86659FD93)
+
+
+def _misturar(x: np.ndarray) -> np.ndarray:
+    # splitmix64, com a multiplicacao dando a volta em 64 bits
+    with np.errstate(over="ignore"):
+        x = np.asarray(x, dtype=np.uint64) + _C1
+        x = (x ^ (x >> np.uint64(30))) * _C2
+        x = (x ^ (x >> np.uint64(27))) * _C3
+        return x ^ (x >> np.uint64(31))
+
+
+class _Arcos:
+    # arcos de um grafo (ou de um lote) em posicoes, com o peso em bits
+    __slots__ = ("n", "origens", "destinos", "pesos", "pesos_misturados")
+
+    def __init__(self, n: int, origens: np.ndarray, destinos: np.ndarray, pesos: np.ndarray):
+        self.n = n
+        self.origens = origens
+        self.destinos = destinos
+        self.pesos = pesos
+        self.pesos_misturados = _misturar(pesos)
+
+    @classmethod
+    def do_csr(cls, csr: GrafoCSR) -> "_Arcos":
+        destinos = np.asarray(csr.indices, dtype=np.int64)
+        if csr.weights is None:
+            pesos = np.zeros(len(destinos), dtype=np.uint64)
+        else:
+            pesos = np.ascontiguousarray(csr.weights, dtype=np.float64).view(np.uint64)
+        return cls(len(csr.vertices), csr.origens_idx().astype(np.int64), destinos, pesos)
+
+
+def _cores_iniciais(arcos: _Arcos) -> np.ndarray:
+    entrada = np.bincount(arcos.destinos, minlength=arcos.n).astype(np.uint64)
+    saida = np.bincount(arcos.origens, minlength=arcos.n).astype(np.uint64)
+    with np.errstate(over="ignore"):
+        return _misturar(entrada * _C2 + saida)
+
+
+def _rodada(cores: np.ndarray, arcos: _Arcos) -> np.ndarray:
+    # soma de hashes = hash do multiconjunto de (cor do vizinho, peso do arco)
+    with np.errstate(over="ignore"):
+        saida = np.zeros(arcos.n, dtype=np.uint64)
+        np.add.at(saida, arcos.origens, _misturar(cores[arcos.destinos] + arcos.pesos_misturados))
+        entrada = np.zeros(arcos.n, dtype=np.uint64)
+        np.add.at(entrada, arcos.destinos, _misturar((cores[arcos.origens] ^ _C3) + arcos.pesos_misturados))
+        return _misturar(cores * _C1 + _misturar(saida) + _misturar(entrada ^ _C2))
+
+
+def _classes_por_grafo(cores: np.ndarray, grafo_de: np.ndarray, total: int) -> np.ndarray:
+    ordem = np.lexsort((cores, grafo_de))
+    c, g = cores[ordem], grafo_de[ordem]
+    nova = np.ones(len(c), dtype=bool)
+    nova[1:] = (g[1:] != g[:-1]) | (c[1:] != c[:-1])
+    return np.bincount(g[nova], minlength=total)
+
+
+def _refinar(cores: np.ndarray, arcos: _Arcos, grafo_de: Optional[np.ndarray] = None,
+             total: int = 1) -> np.ndarray:
+    # rodadas ate a particao de cada grafo parar de se dividir; cada grafo fica com as
+    # cores da primeira rodada sem divisao, entao o resultado nao depende do lote
+    if grafo_de is None:
+        classes = len(np.unique(cores))
+        while True:
+            cores = _rodada(cores, arcos)
+            novas = len(np.unique(cores))
+            if novas == classes:
+                return cores
+            classes = novas
+
+    finais = cores.copy()
+    pendente = np.ones(total, dtype=bool)
+    classes = _classes_por_grafo(cores, grafo_de, total)
+
+    while pendente.any():
+        cores = _rodada(cores, arcos)
+        novas = _classes_por_grafo(cores, grafo_de, total)
+        estaveis = pendente & (novas == classes)
+        congelar = estaveis[grafo_de]
+        finais[congelar] = cores[congelar]
+        pendente &= ~estaveis
+        classes = novas
+    return finais
+
+
+def refinamento_de_cores(G: Any) -> Dict[Any, int]:
+    # cor estavel de cada vertice; vertices de cores diferentes nunca se correspondem
+    csr = como_csr(G)
+    arcos = _Arcos.do_csr(csr)
+    cores = _refinar(_cores_iniciais(arcos), arcos)
+    return dict(zip(csr.vertices, cores.tolist()))
+
+
+def _cabecalho(csr: GrafoCSR) -> int:
+    return hash((len(csr.vertices), len(csr.indices), csr.direcionado, csr.ponderado)) & 0xFFFFFFFFFFFFFFFF
+
+
+@instrumentacao.medido()
+def hashes_wl(grafos: Iterable[Any]) -> List[int]:
+    # invariante WL de cada grafo, todos refinados juntos na uniao disjunta
+    csrs = [como_csr(G) for G in grafos]
+    if not csrs:
+        return []
+
+    tamanhos = np.array([len(c.vertices) for c in csrs], dtype=np.int64)
+    deslocamentos = np.concatenate(([0], np.cumsum(tamanhos)[:-1]))
+    partes = [_Arcos.do_csr(c) for c in csrs]
+    por_grafo = np.array([len(p.origens) for p in partes], dtype=np.int64)
+    deslocamento_arco = np.repeat(deslocamentos, por_grafo)
+
+    arcos = _Arcos(int(tamanhos.sum()),
+                   np.concatenate([p.origens for p in partes]) + deslocamento_arco,
+                   np.concatenate([p.destinos for p in partes]) + deslocamento_arco,
+                   np.concatenate([p.pesos for p in partes]))
+    grafo_de = np.repeat(np.arange(len(csrs)), tamanhos)
+    cores = _refinar(_cores_iniciais(arcos), arcos, grafo_de, len(csrs))
+
+    somas = np.zeros(len(csrs), dtype=np.uint64)
+    np.add.at(somas, grafo_de, _misturar(cores))
+    cabecalhos = np.array([_cabecalho(c) for c in csrs], dtype=np.uint64)
+    return _misturar(somas ^ _misturar(cabecalhos)).tolist()
+
+
+def hash_wl(G: Any) -> int:
+    return hashes_wl([G])[0]
+
+
+def _adjacencias(arcos: _Arcos, ponderado: bool) -> Tuple[List[Dict[int, Any]], List[Dict[int, Any]]]:
+    # saida[i][j] / entrada[j][i]: multiplicidade do arco (sem pesos) ou os bits do peso
+    saida = [{} for _ in range(arcos.n)]
+    entrada = [{} for _ in range(arcos.n)]
+    origens = arcos.origens.tolist()
+    destinos = arcos.destinos.tolist()
+
+    if not ponderado:
+        for i, j in zip(origens, destinos):
+            saida[i][j] = saida[i].get(j, 0) + 1
+            entrada[j][i] = entrada[j].get(i, 0) + 1
+    else:
+        for i, j, p in zip(origens, destinos, arcos.pesos.tolist()):
+            saida[i][j] = entrada[j][i] = p
+    return saida, entrada
+
+
+def _gemeos(u: int, w: int, saida: List[Dict], entrada: List[Dict]) -> bool:
+    # a transposicao (u w) e automorfismo: mesmos arcos para os demais vertices e
+    # arcos entre u e w (e lacos) que trocam de lugar sem mudar
+    if saida[u].get(u) != saida[w].get(w) or saida[u].get(w) != saida[w].get(u):
+        return False
+    for lado in (saida, entrada):
+        a = {x: r for x, r in lado[u].items() if x != u and x != w}
+        b = {x: r for x, r in lado[w].items() if x != u and x != w}
+        if a != b:
+            return False
+    return True
+
+
+def _ramos(cores: np.ndarray, saida: List[Dict], entrada: List[Dict]) -> Iterator[int]:
+    # celula alvo: a menor nao unitaria (desempate pela cor); um ramo por classe de gemeos
+    valores, contagens = np.unique(cores, return_counts=True)
+    multiplas = contagens > 1
+    alvo = valores[multiplas][np.lexsort((valores[multiplas], contagens[multiplas]))[0]]
+
+    escolhidos = []
+    for v in np.flatnonzero(cores == alvo).tolist():
+        if not any(_gemeos(u, v, saida, entrada) for u in escolhidos):
+            escolhidos.append(v)
+            yield v
+
+
+def _separar_gemeos(cores: np.ndarray, arcos: _Arcos, saida: List[Dict], entrada: List[Dict]) -> np.ndarray:
+    # celula feita so de gemeos: as transposicoes sao automorfismos que preservam as cores,
+    # entao qualquer ordem dentro dela leva ao mesmo certificado e ela e quebrada sem ramos
+    while True:
+        valores, inverso, contagens = np.unique(cores, return_inverse=True, return_counts=True)
+        ordem = np.argsort(inverso, kind="stable")
+        inicio = np.concatenate(([0], np.cumsum(contagens))).tolist()
+        novas = None
+        for c in np.flatnonzero(contagens > 1).tolist():
+            membros = ordem[inicio[c]:inicio[c + 1]]
+            primeiro = int(membros[0])
+            if all(_gemeos(primeiro, v, saida, entrada) for v in membros[1:].tolist()):
+                if novas is None:
+                    novas = cores.copy()
+                with np.errstate(over="ignore"):
+                    novas[membros] = _misturar(valores[c] ^ (_INDIVIDUO * np.arange(1, len(membros) + 1, dtype=np.uint64)))
+        if novas is None:
+            return cores
+        cores = _refinar(novas, arcos)
+
+
+def _individualizar(cores: np.ndarray, v: int, arcos: _Arcos) -> np.ndarray:
+    filho = cores.copy()
+    filho[v] = _misturar(filho[v:v + 1] ^ _INDIVIDUO)[0]
+    return _refinar(filho, arcos)
+
+
+def _certificado(cores: np.ndarray, arcos: _Arcos) -> Tuple[bytes, np.ndarray]:
+    ordem = np.argsort(cores, kind="stable")
+    posicao = np.empty(arcos.n, dtype=np.int64)
+    posicao[ordem] = np.arange(arcos.n)
+    o, d, p = posicao[arcos.origens], posicao[arcos.destinos], arcos.pesos.view(np.int64)
+    arestas = np.column_stack((o, d, p))[np.lexsort((p, d, o))]
+    return arestas.tobytes(), ordem
+
+
+def _busca_canonica(arcos: _Arcos, ponderado: bool) -> Tuple[bytes, np.ndarray]:
+    # (menor certificado entre as folhas, ordem dos vertices que o produz)
+    saida, entrada = _adjacencias(arcos, ponderado)
+    melhor, melhor_ordem = None, None
+    pilha = []
+
+    def visitar(cores: np.ndarray) -> None:
+        nonlocal melhor, melhor_ordem
+        cores = _separar_gemeos(cores, arcos, saida, entrada)
+        if len(np.unique(cores)) == arcos.n:
+            certificado, ordem = _certificado(cores, arcos)
+            if melhor is None or certificado < melhor:
+                melhor, melhor_ordem = certificado, ordem
+        else:
+            pilha.append((cores, _ramos(cores, saida, entrada)))
+
+    visitar(_refinar(_cores_iniciais(arcos), arcos))
+    while pilha:
+        cores, ramos = pilha[-1]
+        v = next(ramos, None)
+        if v is None:
+            pilha.pop()
+            continue
+        visitar(_individualizar(cores, v, arcos))
+    return melhor, melhor_ordem
+
+
+def _componentes(arcos: _Arcos) -> List[Tuple[np.ndarray, _Arcos]]:
+    # (vertices, arcos renumerados) de cada componente fraca
+    sucessores = [[] for _ in range(arcos.n)]
+    for u, w in zip(arcos.origens.tolist(), arcos.destinos.tolist()):
+        sucessores[u].append(w)
+    rotulos, total = componentes_por_indice(sucessores)
+    if total == 1:
+        return [(np.arange(arcos.n), arcos)]
+    rotulos = np.asarray(rotulos, dtype=np.int64)
+    membros = np.split(np.argsort(rotulos, kind="stable"), np.cumsum(np.bincount(rotulos, minlength=total))[:-1])
+    local = np.empty(arcos.n, dtype=np.int64)
+    for vertices in membros:
+        local[vertices] = np.arange(len(vertices))
+
+    do_arco = rotulos[arcos.origens]
+    por_arco = np.argsort(do_arco, kind="stable")
+    fatias = np.split(por_arco, np.cumsum(np.bincount(do_arco, minlength=total))[:-1])
+    return [(vertices, _Arcos(len(vertices), local[arcos.origens[f]], local[arcos.destinos[f]], arcos.pesos[f]))
+            for vertices, f in zip(membros, fatias)]
+
+
+@instrumentacao.medido()
+def rotulacao_canonica(G: Any) -> List[Union[str, int]]:
+    # vertices numa ordem que so depende da classe de isomorfismo do grafo; cada componente
+    # tem a sua busca e as componentes entram ordenadas por (tamanho, certificado), o que
+    # evita a busca multiplicar as simetrias entre copias de uma mesma componente
+    csr = como_csr(G)
+    arcos = _Arcos.do_csr(csr)
+    if arcos.n == 0:
+        return []
+
+    partes = []
+    for vertices, sub in _componentes(arcos):
+        certificado, ordem = _busca_canonica(sub, csr.weights is not None)
+        partes.append((len(vertices), certificado, vertices[ordem]))
+    partes.sort(key=lambda parte: parte[:2])
+    return [csr.vertices[i] for i in np.concatenate([parte[2] for parte in partes]).tolist()]
+
+
+@instrumentacao.medido()
+def hash_canonico(G: Any) -> str:
+    # igual para grafos isomorfos e (a menos de colisao do blake2b) so para eles
+    csr = como_csr(G)
+    arcos = _Arcos.do_csr(csr)
+    ordem = rotulacao_canonica(csr)
+    certificado = b""
+    if ordem:
+        posicao = np.empty(arcos.n, dtype=np.int64)
+        posicao[[csr._vertice_idx[v] for v in ordem]] = np.arange(arcos.n)
+        certificado = _certificado(posicao.astype(np.uint64), arcos)[0]
+
+    resumo = hashlib.blake2b(digest_size=16)
+    resumo.update(f"{len(csr.vertices)}:{len(csr.indices)}:{int(csr.direcionado)}:{int(csr.ponderado)}:".encode())
+    resumo.update(certificado)
+    return resumo.hexdigest()
+
+
+def _graus(csr: GrafoCSR) -> List[Tuple[int, int]]:
+    entrada = csr.grau_entrada_dos_vertices()
+    saida = csr.grau_saida_dos_vertices()
+    return [(entrada[v], saida[v]) for v in csr.vertices]
+
+
+def _ordem_de_busca(n: int, saida: List[Dict], entrada: List[Dict], raridade: List[int]) -> List[int]:
+    # proximo vertice: o mais ligado aos ja escolhidos; desempate pela cor mais rara e
+    # pelo maior grau (corta a busca cedo)
+    ligacoes = [0] * n
+    escolhido = [False] * n
+    ordem = []
+    for _ in range(n):
+        v = min((i for i in range(n) if not escolhido[i]),
+                key=lambda i: (-ligacoes[i], raridade[i], -len(saida[i]) - len(entrada[i])))
+        escolhido[v] = True
+        ordem.append(v)
+        for w in (*saida[v], *entrada[v]):
+            ligacoes[w] += 1
+    return ordem
+
+
+@instrumentacao.medido()
+def isomorfismo(G: Any, H: Any) -> Union[Dict[Any, Any], bool]:
+    # bijecao vertice de G -> vertice de H que preserva arcos (multiplicidade e peso), ou False
+    g, h = como_csr(G), como_csr(H)
+    if (len(g.vertices), len(g.indices), g.direcionado, g.ponderado) != \
+            (len(h.vertices), len(h.indices), h.direcionado, h.ponderado):
+        return False
+
+    graus_g, graus_h = _graus(g), _graus(h)
+    if sorted(graus_g) != sorted(graus_h):
+        return False
+
+    arcos_g, arcos_h = _Arcos.do_csr(g), _Arcos.do_csr(h)
+    cores_g = _refinar(_cores_iniciais(arcos_g), arcos_g).tolist()
+    cores_h = _refinar(_cores_iniciais(arcos_h), arcos_h).tolist()
+    if sorted(cores_g) != sorted(cores_h):
+        return False
+
+    n = len(g.vertices)
+    if n == 0:
+        return {}
+
+    saida_g, entrada_g = _adjacencias(arcos_g, g.weights is not None)
+    saida_h, entrada_h = _adjacencias(arcos_h, h.weights is not None)
+    por_cor = defaultdict(list)
+    for v, cor in enumerate(cores_h):
+        por_cor[cor].append(v)
+    raridade = [len(por_cor[cor]) for cor in cores_g]
+    ordem = _ordem_de_busca(n, saida_g, entrada_g, raridade)
+
+    mapa_g, mapa_h = [-1] * n, [-1] * n
+    # quantos vizinhos ja mapeados cada vertice tem (fronteira da busca)
+    ligados_g, ligados_h = [0] * n, [0] * n
+    lados = [(saida_g, saida_h)] if not g.direcionado else [(saida_g, saida_h), (entrada_g, entrada_h)]
+
+    def marcar(x: int, y: int, passo: int) -> None:
+        for w in (*saida_g[x], *entrada_g[x]):
+            ligados_g[w] += passo
+        for w in (*saida_h[y], *entrada_h[y]):
+            ligados_h[w] += passo
+
+    def candidatos(u: int) -> List[int]:
+        # se u -> x com x ja mapeado, a imagem de u e antecessora da imagem de x (e vice-versa);
+        # sem vizinho mapeado, toda a classe de cor
+        for adj_g, oposta_h in ((saida_g, entrada_h), (entrada_g, saida_h)):
+            for x in adj_g[u]:
+                if x != u and mapa_g[x] != -1:
+                    return [v for v in oposta_h[mapa_g[x]] if cores_h[v] == cores_g[u]]
+        return por_cor[cores_g[u]]
+
+    def viavel(u: int, v: int) -> bool:
+        if mapa_h[v] != -1 or graus_g[u] != graus_h[v] or saida_g[u].get(u) != saida_h[v].get(v):
+            return False
+        for adj_g, adj_h in lados:
+            mapeados = 0
+            fronteira_g, fora_g = 0, 0
+            for x, rotulo in adj_g[u].items():
+                if x == u:
+                    continue
+                if mapa_g[x] != -1:
+                    if adj_h[v].get(mapa_g[x]) != rotulo:
+                        return False
+                    mapeados += 1
+                elif ligados_g[x]:
+                    fronteira_g += 1
+                else:
+                    fora_g += 1
+            fronteira_h, fora_h = 0, 0
+            for y in adj_h[v]:
+                if y == v:
+                    continue
+                if mapa_h[y] != -1:
+                    mapeados -= 1
+                elif ligados_h[y]:
+                    fronteira_h += 1
+                else:
+                    fora_h += 1
+            if mapeados != 0 or fronteira_g != fronteira_h or fora_g != fora_h:
+                return False
+        return True
+
+    pilha = [iter(candidatos(ordem[0]))]
+    while pilha:
+        u = ordem[len(pilha) - 1]
+        if mapa_g[u] != -1:
+            marcar(u, mapa_g[u], -1)
+            mapa_h[mapa_g[u]] = -1
+            mapa_g[u] = -1
+
+        for v in pilha[-1]:
+            if viavel(u, v):
+                mapa_g[u], mapa_h[v] = v, u
+                marcar(u, v, 1)
+                break
+        else:
+            pilha.pop()
+            continue
+
+        if len(pilha) == n:
+            return {g.vertices[i]: h.vertices[j] for i, j in enumerate(mapa_g)}
+        pilha.append(iter(candidatos(ordem[len(pilha)])))
+
+    return False
+
+
+def sao_isomorfos(G: Any, H: Any) -> bool:
+    return isomorfismo(G, H) is not False
+
+
+@instrumentacao.medido()
+def agrupar_isomorfos(grafos: Iterable[Any]) -> List[List[int]]:
+    # indices dos grafos agrupados por classe de isomorfismo, na ordem da primeira aparicao
+    grafos = list(grafos)
+    baldes = defaultdict(list)
+    for i, h in enumerate(hashes_wl(grafos)):
+        baldes[h].append(i)
+
+    grupos = []
+    for indices in baldes.values():
+        if len(indices) == 1:
+            grupos.append(indices)
+            continue
+        por_forma = defaultdict(list)
+        for i in indices:
+            por_forma[hash_canonico(grafos[i])].append(i)
+        grupos.extend(por_forma.values())
+    return sorted(grupos)
+
+
+if __name__ == "__main__":
+    from .grafo_utils import Grafo
+
+    print("Teste 1: Mesmo ciclo com rotulos diferentes")
+    g1 = Grafo(vertices=[1, 2, 3, 4], direcionado=False, arestas=[(1, 2), (2, 3), (3, 4), (4, 1)])
+    g2 = Grafo(vertices=['A', 'B', 'C', 'D'], direcionado=False,
+               arestas=[('A', 'C'), ('C', 'B'), ('B', 'D'), ('D', 'A')])
+    print("Isomorfismo:", isomorfismo(g1, g2))
+    print("Mesmo hash canonico?", hash_canonico(g1) == hash_canonico(g2))
+    print()
+
+    print("Teste 2: Mesmas cores WL, grafos diferentes (C6 e dois triangulos)")
+    c6 = Grafo(vertices=list(range(6)), direcionado=False, arestas=[(i, (i + 1) % 6) for i in range(6)])
+    dois_triangulos = Grafo(vertices=list(range(6)), direcionado=False,
+                            arestas=[(0, 1), (1, 2), (2, 0), (3, 4), (4, 5), (5, 3)])
+    print("Mesmo hash WL?", hash_wl(c6) == hash_wl(dois_triangulos))
+    print("Isomorfos?", sao_isomorfos(c6, dois_triangulos))
+    print("Mesmo hash canonico?", hash_canonico(c6) == hash_canonico(dois_triangulos))
+    print()
+
+    print("Teste 3: Grafos direcionados e cores")
+    g3 = Grafo(vertices=[1, 2, 3], arestas=[(1, 2), (2, 3)])
+    g4 = Grafo(vertices=[1, 2, 3], arestas=[(2, 1), (3, 2)])
+    print("Cores:", refinamento_de_cores(g3))
+    print("Isomorfismo:", isomorfismo(g3, g4))
+    print()
+
+    print("Teste 4: Agrupamento em lote")
+    lote = [g1, c6, g2, dois_triangulos, g3, g4]
+    print("Grupos:", agrupar_isomorfos(lote))
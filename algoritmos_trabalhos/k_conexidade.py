@@ -0,0 +1,277 @@
+# Conectividade de vertices e de arestas (quantas falhas o grafo aguenta sem se partir)
+# Arestas: fluxos de um vertice fixo para todos os outros, com capacidade 1 por aresta.
+# Vertices: reducao de Even, cada vertice v vira v_entrada -> v_saida com capacidade 1,
+# e so pares nao adjacentes com o primeiro vertice entre os k+1 primeiros precisam de
+# fluxo. Todo fluxo para assim que alcanca o melhor valor ja conhecido (comecando pelo
+# grau minimo). Os fluxos sao independentes e, com trabalhadores > 1, vao em blocos para
+# um pool de processos que recebe a rede uma vez so.
+# Grafos ponderados: corte minimo global de Stoer-Wagner (soma dos pesos), vetorizado
+# sobre a matriz de pesos.
+
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Tuple, Any, Optional
+
+from . import instrumentacao
+from .fluxo_maximo import RedeDeFluxo, rede_do_grafo
+from .grafo_csr import como_csr
+
+
+def _arcos_simples(csr: Any) -> Tuple[np.ndarray, np.ndarray]:
+    # pares (u, v) distintos, sem lacos; nos nao direcionados aparecem os dois sentidos
+    origens = csr.origens_idx()
+    destinos = np.asarray(csr.indices, dtype=np.int64)
+    manter = origens != destinos
+    pares = np.unique(np.column_stack((origens[manter], destinos[manter])), axis=0)
+    return pares[:, 0], pares[:, 1]
+
+
+def _rede_dividida(n: int, origens: np.ndarray, destinos: np.ndarray) -> RedeDeFluxo:
+    # reducao de Even: v_entrada = 2v, v_saida = 2v + 1; so a passagem por dentro de um
+    # vertice tem capacidade 1, os arcos do grafo tem capacidade n (nunca saturam)
+    internos = np.arange(n, dtype=np.int64)
+    return RedeDeFluxo.de_arrays(2 * n,
+                                 np.concatenate((2 * internos, 2 * origens + 1)),
+                                 np.concatenate((2 * internos + 1, 2 * destinos)),
+                                 np.concatenate((np.ones(n, dtype=np.int64),
+                                                 np.full(len(origens), n, dtype=np.int64))))
+
+
+def _corte_de_vertices(rede: RedeDeFluxo, s: int) -> List[int]:
+    lado = rede.lado_da_origem(s)
+    return [v for v in range(rede.n // 2) if lado[2 * v] and not lado[2 * v + 1]]
+
+
+def _corte_de_arestas(rede: RedeDeFluxo, s: int) -> List[Tuple[int, int]]:
+    return rede.corte(rede.lado_da_origem(s))
+
+
+_rede_trabalhador = None
+_tipo_trabalhador = None
+
+
+def _iniciar_trabalhador(rede: RedeDeFluxo, tipo: str) -> None:
+    global _rede_trabalhador, _tipo_trabalhador
+    _rede_trabalhador, _tipo_trabalhador = rede, tipo
+
+
+def _melhor_do_bloco(rede: RedeDeFluxo, tipo: str, pares: List[Tuple[int, int]],
+                     limite: float) -> Optional[Tuple[float, List]]:
+    # primeiro par do bloco com o menor fluxo abaixo do limite, com o corte; None se nenhum
+    melhor = None
+    for s, t in pares:
+        valor = rede.fluxo(s, t, limite)
+        if valor < limite:
+            limite = valor
+            corte = _corte_de_vertices(rede, s) if tipo == "vertices" else _corte_de_arestas(rede, s)
+            melhor = (valor, corte)
+            if valor == 0:
+                break
+    return melhor
+
+
+def _calcular_bloco(pares: List[Tuple[int, int]], limite: float) -> Optional[Tuple[float, List]]:
+    return _melhor_do_bloco(_rede_trabalhador, _tipo_trabalhador, pares, limite)
+
+
+def _menor_fluxo(rede: RedeDeFluxo, tipo: str, pares: List[Tuple[int, int]], limite: float,
+                 trabalhadores: int, tamanho_bloco: int) -> Optional[Tuple[float, List]]:
+    if trabalhadores <= 1 or len(pares) <= tamanho_bloco:
+        return _melhor_do_bloco(rede, tipo, pares, limite)
+
+    blocos = [pares[i:i + tamanho_bloco] for i in range(0, len(pares), tamanho_bloco)]
+    with ProcessPoolExecutor(max_workers=trabalhadores, initializer=_iniciar_trabalhador,
+                             initargs=(rede, tipo)) as executor:
+        resultados = list(executor.map(_calcular_bloco, blocos, [limite] * len(blocos)))
+
+    # o primeiro bloco com o menor valor da o mesmo corte que a versao sequencial
+    melhor = None
+    for resultado in resultados:
+        if resultado is not None and (melhor is None or resultado[0] < melhor[0]):
+            melhor = resultado
+    return melhor
+
+
+@instrumentacao.medido()
+def conectividade_de_arestas(G: Any, trabalhadores: int = 1,
+                             tamanho_bloco: int = 16) -> Tuple[int, List[Tuple]]:
+    # (menor numero de arestas cuja remocao desconecta o grafo, essas arestas);
+    # pesos sao ignorados, arestas paralelas contam uma a uma
+    csr = como_csr(G)
+    n = len(csr.vertices)
+    if n <= 1:
+        return 0, []
+
+    rede = rede_do_grafo(csr, pesos=False)
+    origens = csr.origens_idx()
+    destinos = np.asarray(csr.indices, dtype=np.int64)
+    laco = origens == destinos
+
+    # limite inicial: as arestas do vertice de menor grau (de saida ou de entrada)
+    graus = [(np.bincount(origens[~laco], minlength=n), True)]
+    if csr.direcionado:
+        graus.append((np.bincount(destinos[~laco], minlength=n), False))
+    grau, saida = min(graus, key=lambda g: g[0].min())
+    v = int(np.argmin(grau))
+    incidentes = (~laco) & ((origens if saida else destinos) == v)
+    corte = list(zip(origens[incidentes].tolist(), destinos[incidentes].tolist()))
+    melhor = int(grau[v])
+
+    if melhor > 0:
+        pares = [(0, t) for t in range(1, n)]
+        if csr.direcionado:
+            pares += [(t, 0) for t in range(1, n)]
+        resultado = _menor_fluxo(rede, "arestas", pares, melhor, trabalhadores, tamanho_bloco)
+        if resultado is not None:
+            melhor, corte = int(resultado[0]), resultado[1]
+
+    rotulos = csr.vertices
+    return melhor, [(rotulos[u], rotulos[w]) for u, w in corte]
+
+
+@instrumentacao.medido()
+def conectividade_de_vertices(G: Any, trabalhadores: int = 1,
+                              tamanho_bloco: int = 16) -> Tuple[int, List]:
+    # (menor numero de vertices cuja remocao desconecta o grafo, esses vertices);
+    # no grafo completo nao ha corte e a conectividade e n - 1
+    csr = como_csr(G)
+    n = len(csr.vertices)
+    if n <= 1:
+        return 0, []
+
+    origens, destinos = _arcos_simples(csr)
+    vizinhos = [set() for _ in range(n)]
+    for u, w in zip(origens.tolist(), destinos.tolist()):
+        vizinhos[u].add(w)
+
+    # limite inicial: os vizinhos do vertice de menor grau separam-no de quem nao e vizinho
+    graus = [(np.bincount(origens, minlength=n), origens, destinos)]
+    if csr.direcionado:
+        graus.append((np.bincount(destinos, minlength=n), destinos, origens))
+    grau, de, para = min(graus, key=lambda g: g[0].min())
+    v = int(np.argmin(grau))
+    melhor = int(grau[v])
+    if melhor >= n - 1:
+        return n - 1, []
+    corte = sorted(para[de == v].tolist())
+
+    if melhor > 0:
+        # Even: algum dos melhor + 1 primeiros vertices fica fora do corte minimo
+        # (os pares com j < i ja sairam na vez de j)
+        pares = []
+        for i in range(min(melhor + 1, n)):
+            for j in range(i + 1, n):
+                if j not in vizinhos[i]:
+                    pares.append((2 * i + 1, 2 * j))
+                if csr.direcionado and i not in vizinhos[j]:
+                    pares.append((2 * j + 1, 2 * i))
+
+        rede = _rede_dividida(n, origens, destinos)
+        resultado = _menor_fluxo(rede, "vertices", pares, melhor, trabalhadores, tamanho_bloco)
+        if resultado is not None:
+            melhor, corte = int(resultado[0]), resultado[1]
+
+    return melhor, [csr.vertices[u] for u in corte]
+
+
+def _matriz_simetrica(csr: Any) -> np.ndarray:
+    # peso total entre cada par (paralelas somadas, lacos fora)
+    n = len(csr.vertices)
+    origens = csr.origens_idx()
+    destinos = np.asarray(csr.indices, dtype=np.int64)
+    pesos = np.asarray(csr.weights, dtype=np.float64) if csr.weights is not None else np.ones(len(destinos))
+
+    W = np.zeros((n, n), dtype=np.float64)
+    np.add.at(W, (origens, destinos), pesos)
+    np.fill_diagonal(W, 0)
+    return W
+
+
+@instrumentacao.medido()
+def corte_minimo_global(G: Any) -> Tuple[float, List, List[Tuple]]:
+    # Stoer-Wagner: (peso do corte, um dos lados, arestas que cruzam o corte);
+    # cada fase e uma ordem de adjacencia maxima com argmax sobre um vetor de pesos
+    csr = como_csr(G)
+    if csr.direcionado:
+        raise ValueError("Corte minimo global funciona apenas para grafos nao direcionados")
+    n = len(csr.vertices)
+    if n < 2:
+        raise ValueError("Corte minimo precisa de pelo menos 2 vertices")
+
+    W = _matriz_simetrica(csr)
+    ativo = np.ones(n, dtype=bool)
+    grupos = [[v] for v in range(n)]
+    melhor_valor, melhor_lado = np.inf, None
+
+    for restantes in range(n, 1, -1):
+        inicio = int(np.flatnonzero(ativo)[0])
+        conexao = W[inicio].copy()
+        fora = ~ativo
+        fora[inicio] = True
+        anterior, ultimo = inicio, inicio
+
+        for _ in range(restantes - 1):
+            conexao[fora] = -np.inf
+            anterior, ultimo = ultimo, int(np.argmax(conexao))
+            valor = conexao[ultimo]
+            fora[ultimo] = True
+            conexao += W[ultimo]
+
+        # corte da fase: o ultimo vertice sozinho contra o resto
+        if valor < melhor_valor:
+            melhor_valor, melhor_lado = float(valor), list(grupos[ultimo])
+
+        W[anterior] += W[ultimo]
+        W[:, anterior] += W[:, ultimo]
+        W[anterior, anterior] = 0
+        ativo[ultimo] = False
+        grupos[anterior].extend(grupos[ultimo])
+
+    no_lado = np.zeros(n, dtype=bool)
+    no_lado[melhor_lado] = True
+    origens = csr.origens_idx()
+    destinos = np.asarray(csr.indices, dtype=np.int64)
+    cruzam = no_lado[origens] & ~no_lado[destinos]
+
+    rotulos = csr.vertices
+    arestas = [(rotulos[u], rotulos[w]) for u, w in zip(origens[cruzam].tolist(), destinos[cruzam].tolist())]
+    return melhor_valor, [rotulos[v] for v in sorted(melhor_lado)], arestas
+
+
+def eh_k_conexo(G: Any, k: int, arestas: bool = False) -> bool:
+    # aguenta k - 1 falhas de vertices (ou de arestas) sem se partir?
+    if arestas:
+        return conectividade_de_arestas(G)[0] >= k
+    return conectividade_de_vertices(G)[0] >= k
+
+
+if __name__ == "__main__":
+    from .grafo_utils import Grafo
+
+    print("Teste 1: Ciclo com uma corda")
+    g1 = Grafo(vertices=[1, 2, 3, 4, 5, 6], direcionado=False,
+               arestas=[(1, 2), (2, 3), (3, 4), (4, 5), (5, 6), (6, 1), (1, 4)])
+    print("Conectividade de vertices:", conectividade_de_vertices(g1))
+    print("Conectividade de arestas:", conectividade_de_arestas(g1))
+    print("2-conexo?", eh_k_conexo(g1, 2), "3-conexo?", eh_k_conexo(g1, 3))
+    print()
+
+    print("Teste 2: Dois K4 ligados por um vertice")
+    k4 = [(a, b) for a in range(4) for b in range(a + 1, 4)]
+    g2 = Grafo(vertices=list(range(7)), direcionado=False,
+               arestas=k4 + [(a + 3, b + 3) for a, b in k4])
+    print("Conectividade de vertices:", conectividade_de_vertices(g2))
+    print("Conectividade de arestas:", conectividade_de_arestas(g2))
+    print("Em paralelo:", conectividade_de_vertices(g2, trabalhadores=2, tamanho_bloco=2))
+    print()
+
+    print("Teste 3: Corte minimo global ponderado (Stoer-Wagner)")
+    g3 = Grafo(vertices=['A', 'B', 'C', 'D'], direcionado=False,
+               arestas={('A', 'B'): 3, ('B', 'C'): 1, ('C', 'D'): 4, ('D', 'A'): 2, ('A', 'C'): 1})
+    print("Corte minimo:", corte_minimo_global(g3))
+    print()
+
+    print("Teste 4: Grafo direcionado")
+    g4 = Grafo(vertices=[1, 2, 3, 4], arestas=[(1, 2), (2, 3), (3, 4), (4, 1), (1, 3), (3, 1)])
+    print("Conectividade de vertices:", conectividade_de_vertices(g4))
+    print("Conectividade de arestas:", conectividade_de_arestas(g4))
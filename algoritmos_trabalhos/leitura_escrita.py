@@ -0,0 +1,404 @@
+# Leitura e escrita de grafos em arquivos texto
+# Formatos: listas de arestas CSV/TSV, DIMACS (p sp / p edge) e TSPLIB (EUC_2D e
+# EXPLICIT, alem de arquivos TOUR). Os leitores sao geradores que entregam blocos
+# de arrays (origens, destinos[, pesos]) para Grafo.de_blocos / GrafoCSR.de_blocos,
+# entao a memoria gasta alem do grafo final fica limitada ao tamanho do bloco.
+
+import numpy as np
+from typing import List, Dict, Tuple, Union, Any, Optional, Iterator, Callable
+
+from .grafo_csr import GrafoCSR
+from .grafo_utils import Grafo
+
+TAMANHO_BLOCO = 1_000_000
+
+
+def _montar(vertices: List[Union[str, int]], blocos: Iterator[Tuple], direcionado: bool,
+            compacto: bool) -> Union[Grafo, GrafoCSR]:
+    if compacto:
+        return GrafoCSR.de_blocos(vertices, blocos, direcionado)
+    return Grafo.de_blocos(vertices, blocos, direcionado)
+
+
+def _numero(x: float) -> str:
+    # inteiros sem ".0"; o resto com repr, que volta exatamente ao mesmo float
+    return str(int(x)) if float(x).is_integer() else repr(float(x))
+
+
+def _linhas_validas(caminho: str, comentario: str = "#", pular: int = 0) -> Iterator[str]:
+    with open(caminho, "r", encoding="utf-8") as arquivo:
+        for numero, linha in enumerate(arquivo):
+            linha = linha.strip()
+            if numero < pular or not linha or linha.startswith(comentario):
+                continue
+            yield linha
+
+
+def _converter_bloco(origens: List[str], destinos: List[str], pesos: List[str],
+                     rotulo: Callable) -> Tuple:
+    if rotulo is int:
+        o = np.array(origens).astype(np.int64)
+        d = np.array(destinos).astype(np.int64)
+    else:
+        o = np.array(origens, dtype=str)
+        d = np.array(destinos, dtype=str)
+
+    if pesos:
+        return o, d, np.array(pesos).astype(np.float64)
+    return o, d
+
+
+def blocos_lista_arestas(caminho: str, separador: Optional[str] = ",",
+                         tamanho_bloco: int = TAMANHO_BLOCO, rotulo: Callable = int,
+                         cabecalho: bool = False) -> Iterator[Tuple]:
+    origens, destinos, pesos = [], [], []
+    colunas = None
+
+    for linha in _linhas_validas(caminho, pular=1 if cabecalho else 0):
+        campos = [c.strip() for c in linha.split(separador)]
+
+        if colunas is None:
+            colunas = len(campos)
+            if colunas not in (2, 3):
+                raise ValueError("Linhas devem ter 2 (u, v) ou 3 (u, v, peso) colunas")
+        elif len(campos) != colunas:
+            raise ValueError(f"Linha com numero de colunas inconsistente: {linha}")
+
+        origens.append(campos[0])
+        destinos.append(campos[1])
+        if colunas == 3:
+            pesos.append(campos[2])
+
+        if len(origens) == tamanho_bloco:
+            yield _converter_bloco(origens, destinos, pesos, rotulo)
+            origens, destinos, pesos = [], [], []
+
+    if origens:
+        yield _converter_bloco(origens, destinos, pesos, rotulo)
+
+
+def vertices_da_lista_arestas(caminho: str, separador: Optional[str] = ",",
+                              tamanho_bloco: int = TAMANHO_BLOCO, rotulo: Callable = int,
+                              cabecalho: bool = False) -> List[Union[str, int]]:
+    vertices = np.empty(0, dtype=np.int64 if rotulo is int else str)
+    for bloco in blocos_lista_arestas(caminho, separador, tamanho_bloco, rotulo, cabecalho):
+        vertices = np.union1d(vertices, np.union1d(bloco[0], bloco[1]))
+    return vertices.tolist()
+
+
+def ler_lista_arestas(caminho: str, separador: Optional[str] = ",", direcionado: bool = True,
+                      vertices: Optional[List[Union[str, int]]] = None,
+                      tamanho_bloco: int = TAMANHO_BLOCO, rotulo: Callable = int,
+                      cabecalho: bool = False, compacto: bool = False) -> Union[Grafo, GrafoCSR]:
+    # sem a lista de vertices, uma primeira passada coleta os labels (memoria O(n))
+    if vertices is None:
+        vertices = vertices_da_lista_arestas(caminho, separador, tamanho_bloco, rotulo, cabecalho)
+
+    blocos = blocos_lista_arestas(caminho, separador, tamanho_bloco, rotulo, cabecalho)
+    return _montar(vertices, blocos, direcionado, compacto)
+
+
+def _arestas_csr(G: Any) -> Tuple[GrafoCSR, np.ndarray, np.ndarray, Optional[np.ndarray]]:
+    csr = G if isinstance(G, GrafoCSR) else G.para_csr()
+    origens, destinos, pesos = csr.origens_idx(), csr.indices, csr.weights
+
+    if not csr.direcionado:
+        # grava cada aresta nao direcionada uma vez; lacos aparecem duas vezes
+        # no multiconjunto nao ponderado e uma vez no dict ponderado
+        manter = origens < destinos
+        laco = np.flatnonzero(origens == destinos)
+        if not csr.ponderado:
+            laco = laco[0::2]
+        manter[laco] = True
+        origens, destinos = origens[manter], destinos[manter]
+        pesos = pesos[manter] if pesos is not None else None
+
+    return csr, origens, destinos, pesos
+
+
+def escrever_lista_arestas(G: Any, caminho: str, separador: str = ",",
+                           tamanho_bloco: int = TAMANHO_BLOCO) -> None:
+    csr, origens, destinos, pesos = _arestas_csr(G)
+    rotulos = np.empty(len(csr.vertices), dtype=object)
+    rotulos[:] = csr.vertices
+
+    with open(caminho, "w", encoding="utf-8") as arquivo:
+        for ini in range(0, len(origens), tamanho_bloco):
+            fim = ini + tamanho_bloco
+            colunas = [rotulos[origens[ini:fim]].tolist(), rotulos[destinos[ini:fim]].tolist()]
+            if pesos is not None:
+                colunas.append(pesos[ini:fim].tolist())
+            arquivo.writelines(separador.join(map(str, campos)) + "\n" for campos in zip(*colunas))
+
+
+def cabecalho_dimacs(caminho: str) -> Tuple[str, int, int]:
+    for linha in _linhas_validas(caminho, comentario="c"):
+        campos = linha.split()
+        if campos[0] == "p":
+            return campos[1], int(campos[2]), int(campos[3])
+        raise ValueError("Arquivo DIMACS sem linha 'p' antes das arestas")
+    raise ValueError("Arquivo DIMACS sem linha 'p'")
+
+
+def blocos_dimacs(caminho: str, tamanho_bloco: int = TAMANHO_BLOCO,
+                  ponderado: Optional[bool] = None) -> Iterator[Tuple]:
+    # "p edge" so aceita linhas "e" e os demais formatos so "a"; ponderado=False descarta
+    # os pesos das linhas "a" (arcos paralelos continuam separados) e ponderado=True da
+    # peso 1 as linhas "e"
+    formato, _, _ = cabecalho_dimacs(caminho)
+    tipo = "e" if formato == "edge" else "a"
+    if ponderado is None:
+        ponderado = tipo == "a"
+    origens, destinos, pesos = [], [], []
+
+    for linha in _linhas_validas(caminho, comentario="c"):
+        campos = linha.split()
+        if campos[0] not in ("a", "e"):
+            continue
+        if campos[0] != tipo:
+            raise ValueError(f"Linha '{campos[0]}' em arquivo DIMACS 'p {formato}': {linha}")
+
+        origens.append(campos[1])
+        destinos.append(campos[2])
+        if ponderado:
+            pesos.append(campos[3] if tipo == "a" else "1")
+
+        if len(origens) == tamanho_bloco:
+            yield _converter_bloco(origens, destinos, pesos, int)
+            origens, destinos, pesos = [], [], []
+
+    if origens:
+        yield _converter_bloco(origens, destinos, pesos, int)
+
+
+def ler_dimacs(caminho: str, direcionado: Optional[bool] = None,
+               tamanho_bloco: int = TAMANHO_BLOCO, compacto: bool = False,
+               ponderado: Optional[bool] = None) -> Union[Grafo, GrafoCSR]:
+    # por padrao "p edge" vira grafo nao direcionado sem pesos e o resto, direcionado
+    # com pesos; ponderado=False le um "p sp" gravado de um grafo sem pesos
+    formato, n, _ = cabecalho_dimacs(caminho)
+    if direcionado is None:
+        direcionado = formato != "edge"
+
+    blocos = blocos_dimacs(caminho, tamanho_bloco, ponderado)
+    return _montar(list(range(1, n + 1)), blocos, direcionado, compacto)
+
+
+def escrever_dimacs(G: Any, caminho: str, tamanho_bloco: int = TAMANHO_BLOCO) -> None:
+    # "p edge" e nao direcionado e sem pesos; qualquer outro caso vira "p sp",
+    # cujos arcos "a" sao direcionados (grafo nao direcionado grava os dois sentidos);
+    # sem pesos os arcos saem com peso 1 e voltam com ler_dimacs(..., ponderado=False)
+    csr = G if isinstance(G, GrafoCSR) else G.para_csr()
+    if csr.direcionado or csr.ponderado:
+        formato = "sp"
+        origens, destinos = csr.origens_idx(), csr.indices
+        pesos = csr.weights if csr.weights is not None else np.ones(len(destinos))
+    else:
+        formato = "edge"
+        _, origens, destinos, pesos = _arestas_csr(csr)
+
+    with open(caminho, "w", encoding="utf-8") as arquivo:
+        arquivo.write(f"p {formato} {len(csr.vertices)} {len(origens)}\n")
+        for ini in range(0, len(origens), tamanho_bloco):
+            fim = ini + tamanho_bloco
+            u = (origens[ini:fim] + 1).tolist()
+            v = (destinos[ini:fim] + 1).tolist()
+            if formato == "sp":
+                arquivo.writelines(f"a {a} {b} {_numero(p)}\n" for a, b, p in zip(u, v, pesos[ini:fim].tolist()))
+            else:
+                arquivo.writelines(f"e {a} {b}\n" for a, b in zip(u, v))
+
+
+def _ler_tsplib(caminho: str) -> Tuple[Dict[str, str], List[Union[str, int]], np.ndarray]:
+    # uma passada so: cabecalho e os numeros da secao, ja como float64
+    cabecalho = {}
+    secao = None
+    dados = []
+
+    for linha in _linhas_validas(caminho):
+        if linha == "EOF":
+            break
+        if linha.endswith("_SECTION"):
+            secao = linha
+            continue
+        if secao is None:
+            chave, _, valor = linha.partition(":")
+            cabecalho[chave.strip()] = valor.strip()
+        else:
+            dados.append(np.array(linha.split(), dtype=np.float64))
+
+    n = int(cabecalho["DIMENSION"])
+    tipo = cabecalho.get("EDGE_WEIGHT_TYPE", "")
+    valores = np.concatenate(dados) if dados else np.empty(0, dtype=np.float64)
+
+    if tipo == "EUC_2D":
+        tabela = valores.reshape(n, 3)
+        return cabecalho, tabela[:, 0].astype(np.int64).tolist(), tabela[:, 1:]
+
+    if tipo == "EXPLICIT":
+        formato = cabecalho.get("EDGE_WEIGHT_FORMAT", "FULL_MATRIX")
+        if formato != "FULL_MATRIX" and formato not in _TRIANGULOS:
+            raise ValueError(f"EDGE_WEIGHT_FORMAT {formato} nao suportado")
+        return cabecalho, list(range(1, n + 1)), valores
+
+    raise ValueError(f"EDGE_WEIGHT_TYPE {tipo} nao suportado (use EUC_2D ou EXPLICIT)")
+
+
+def _distancias_euc_2d(coordenadas: np.ndarray, linhas: slice) -> np.ndarray:
+    diferenca = coordenadas[linhas, None, :] - coordenadas[None, :, :]
+    return np.floor(np.sqrt((diferenca ** 2).sum(axis=2)) + 0.5)
+
+
+# triangulo guardado -> (forma por linhas equivalente, com diagonal?); a matriz e simetrica,
+# entao o triangulo superior por colunas tem a mesma ordem do inferior por linhas e vice-versa
+_TRIANGULOS = {
+    "UPPER_ROW": ("UPPER", False), "LOWER_COL": ("UPPER", False),
+    "UPPER_DIAG_ROW": ("UPPER", True), "LOWER_DIAG_COL": ("UPPER", True),
+    "LOWER_ROW": ("LOWER", False), "UPPER_COL": ("LOWER", False),
+    "LOWER_DIAG_ROW": ("LOWER", True), "UPPER_DIAG_COL": ("LOWER", True),
+}
+
+
+def _linhas_explicitas(valores: np.ndarray, n: int, formato: str, linhas: slice) -> np.ndarray:
+    # so as linhas pedidas da matriz, lidas direto dos valores da secao
+    if formato == "FULL_MATRIX":
+        return valores[linhas.start * n:linhas.stop * n].reshape(-1, n)
+
+    triangulo, diagonal = _TRIANGULOS[formato]
+    i = np.arange(linhas.start, linhas.stop)[:, None]
+    j = np.arange(n)[None, :]
+    if triangulo == "UPPER":
+        a, b = np.minimum(i, j), np.maximum(i, j)
+        posicao = a * n - a * (a - 1) // 2 + b - a if diagonal else a * n - a * (a + 1) // 2 + b - a - 1
+    else:
+        a, b = np.maximum(i, j), np.minimum(i, j)
+        posicao = a * (a + 1) // 2 + b if diagonal else a * (a - 1) // 2 + b
+
+    custos = np.zeros(posicao.shape, dtype=np.float64)
+    presente = (i != j) | diagonal
+    custos[presente] = valores[posicao[presente]]
+    return custos
+
+
+def _linhas_tsplib(cabecalho: Dict[str, str], dados: np.ndarray, n: int, linhas: slice) -> np.ndarray:
+    if cabecalho["EDGE_WEIGHT_TYPE"] == "EUC_2D":
+        return _distancias_euc_2d(dados, linhas)
+    return _linhas_explicitas(dados, n, cabecalho.get("EDGE_WEIGHT_FORMAT", "FULL_MATRIX"), linhas)
+
+
+def matriz_tsplib(caminho: str) -> Tuple[List[int], np.ndarray]:
+    cabecalho, vertices, dados = _ler_tsplib(caminho)
+    custos = _linhas_tsplib(cabecalho, dados, len(vertices), slice(0, len(vertices))).copy()
+    np.fill_diagonal(custos, np.inf)
+    return vertices, custos
+
+
+def _blocos_tsplib(cabecalho: Dict[str, str], vertices: List[Union[str, int]], dados: np.ndarray,
+                   linhas_por_bloco: int) -> Iterator[Tuple]:
+    n = len(vertices)
+    rotulos = np.asarray(vertices)
+
+    for ini in range(0, n, linhas_por_bloco):
+        linhas = slice(ini, min(ini + linhas_por_bloco, n))
+        bloco = _linhas_tsplib(cabecalho, dados, n, linhas)
+
+        # grafo simetrico completo: so o par i < j de cada aresta
+        i, j = np.nonzero(np.arange(linhas.start, linhas.stop)[:, None] < np.arange(n)[None, :])
+        yield rotulos[i + linhas.start], rotulos[j], bloco[i, j]
+
+
+def blocos_tsplib(caminho: str, linhas_por_bloco: int = 256) -> Iterator[Tuple]:
+    return _blocos_tsplib(*_ler_tsplib(caminho), linhas_por_bloco)
+
+
+def ler_tsplib(caminho: str, linhas_por_bloco: int = 256, compacto: bool = False) -> Union[Grafo, GrafoCSR]:
+    cabecalho, vertices, dados = _ler_tsplib(caminho)
+    return _montar(vertices, _blocos_tsplib(cabecalho, vertices, dados, linhas_por_bloco), False, compacto)
+
+
+def escrever_tsplib(vertices: List[Union[str, int]], custos: np.ndarray, caminho: str,
+                    nome: str = "grafo", ausente: Optional[float] = None) -> None:
+    # par sem aresta (custo infinito fora da diagonal) so e gravado com um valor ausente
+    # explicito, ja que o formato nao tem infinito; a diagonal vira 0
+    n = len(vertices)
+    custos = np.asarray(custos, dtype=np.float64)
+    faltando = ~np.isfinite(custos)
+    np.fill_diagonal(faltando, False)
+    if faltando.any() and ausente is None:
+        raise ValueError("Matriz com pares sem aresta: informe o custo ausente")
+
+    matriz = np.where(faltando, ausente if ausente is not None else 0.0, custos)
+    np.fill_diagonal(matriz, 0.0)
+
+    with open(caminho, "w", encoding="utf-8") as arquivo:
+        arquivo.write(f"NAME : {nome}\nTYPE : TSP\nDIMENSION : {n}\n")
+        arquivo.write("EDGE_WEIGHT_TYPE : EXPLICIT\nEDGE_WEIGHT_FORMAT : FULL_MATRIX\n")
+        arquivo.write("EDGE_WEIGHT_SECTION\n")
+        for linha in matriz:
+            arquivo.write(" ".join(map(_numero, linha.tolist())) + "\n")
+        arquivo.write("EOF\n")
+
+
+def escrever_ciclo(ciclo: List, caminho: str, nome: str = "ciclo",
+                   custo: Optional[float] = None) -> None:
+    # formato TOUR do TSPLIB: o ciclo sem repetir o vertice inicial, terminado em -1
+    with open(caminho, "w", encoding="utf-8") as arquivo:
+        arquivo.write(f"NAME : {nome}\nTYPE : TOUR\n")
+        if custo is not None:
+            arquivo.write(f"COMMENT : custo {custo}\n")
+        arquivo.write(f"DIMENSION : {len(ciclo) - 1}\nTOUR_SECTION\n")
+        arquivo.writelines(f"{v}\n" for v in ciclo[:-1])
+        arquivo.write("-1\nEOF\n")
+
+
+def ler_ciclo(caminho: str, rotulo: Callable = int) -> List:
+    ciclo = []
+    na_secao = False
+
+    for linha in _linhas_validas(caminho):
+        if linha == "TOUR_SECTION":
+            na_secao = True
+        elif na_secao:
+            if linha in ("-1", "EOF"):
+                break
+            ciclo.extend(rotulo(x) for x in linha.split())
+
+    return ciclo + ciclo[:1]
+
+
+if __name__ == "__main__":
+    import os
+    import tempfile
+    from .bellmore_nemhauser import bellmore_nemhauser_melhorado
+
+    with tempfile.TemporaryDirectory() as pasta:
+        print("Teste 1: Lista de arestas CSV")
+        csv = os.path.join(pasta, "g.csv")
+        with open(csv, "w") as f:
+            f.write("# origem,destino,peso\n1,2,3.5\n2,3,1\n3,1,2\n")
+        g1 = ler_lista_arestas(csv, direcionado=False)
+        g1.printar_grafo()
+        tsv = os.path.join(pasta, "g.tsv")
+        escrever_lista_arestas(g1, tsv, separador="\t")
+        print("Reescrito em TSV:", open(tsv).read().split("\n")[:3])
+        print()
+
+        print("Teste 2: DIMACS")
+        dimacs = os.path.join(pasta, "g.gr")
+        escrever_dimacs(g1, dimacs)
+        print(open(dimacs).read().strip())
+        g2 = ler_dimacs(dimacs, direcionado=False, compacto=True)
+        print("Lista de adjacencia:", g2.lista_adjacencias())
+        print()
+
+        print("Teste 3: TSPLIB EUC_2D e ciclo")
+        tsp = os.path.join(pasta, "p5.tsp")
+        with open(tsp, "w") as f:
+            f.write("NAME : p5\nTYPE : TSP\nDIMENSION : 5\nEDGE_WEIGHT_TYPE : EUC_2D\n"
+                    "NODE_COORD_SECTION\n1 0 0\n2 10 0\n3 10 10\n4 0 10\n5 5 12\nEOF\n")
+        g3 = ler_tsplib(tsp)
+        ciclo, custo = bellmore_nemhauser_melhorado(g3)
+        print(f"Ciclo: {ciclo} custo: {custo}")
+        tour = os.path.join(pasta, "p5.tour")
+        escrever_ciclo(ciclo, tour, nome="p5", custo=custo)
+        print("Ciclo relido:", ler_ciclo(tour))
@@ -0,0 +1,345 @@
+# Operacoes entre grafos: uniao, intersecao, complemento, contracao e subgrafo induzido
+# Tudo trabalha sobre os arrays do CSR (em cache no Grafo): cada resultado sai de uma
+# passada vetorizada pelos arcos, sem deepcopy nem remover_vertice um a um. Nos grafos
+# nao direcionados o CSR ja traz os dois sentidos, entao filtrar ou remapear arcos
+# preserva a simetria.
+#
+# subgrafo_induzido e complemento devolvem visoes: a visao guarda o CSR do grafo de
+# origem (do momento em que foi criada) e uma mascara de vertices, responde consultas
+# locais direto dele e so monta o proprio CSR quando um algoritmo pede (para_csr, usado
+# por como_csr). materializar() devolve um Grafo.
+
+import numpy as np
+from typing import List, Dict, Tuple, Any, Union, Iterable, Optional
+
+from . import instrumentacao
+from .grafo_csr import GrafoCSR, como_csr
+from .grafo_utils import Grafo
+
+# ufunc e valor neutro para juntar pesos de arcos que ficam paralelos numa contracao
+_COMBINAR = {"soma": (np.add, 0.0), "min": (np.minimum, np.inf), "max": (np.maximum, -np.inf)}
+
+
+def _arcos(csr: GrafoCSR) -> Tuple[np.ndarray, np.ndarray]:
+    return csr.origens_idx().astype(np.int64), np.asarray(csr.indices, dtype=np.int64)
+
+
+def _novo_grafo(vertices: List, origens: np.ndarray, destinos: np.ndarray,
+                pesos: Optional[np.ndarray], direcionado: bool) -> Grafo:
+    return Grafo.de_csr(GrafoCSR.de_indices(vertices, origens, destinos, pesos, direcionado))
+
+
+def _compativeis(G: GrafoCSR, H: GrafoCSR) -> None:
+    if G.direcionado != H.direcionado:
+        raise ValueError("Os grafos devem ser ambos direcionados ou ambos nao direcionados")
+    if G.ponderado != H.ponderado:
+        raise ValueError("Os grafos devem ser ambos ponderados ou ambos sem pesos")
+
+
+def _contagens(chaves: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    return np.unique(chaves, return_counts=True)
+
+
+@instrumentacao.medido()
+def uniao(G: Any, H: Any) -> Grafo:
+    # vertices de G e depois os novos de H; arco presente nos dois aparece com a maior
+    # multiplicidade (sem pesos) ou com o peso de G
+    g, h = como_csr(G), como_csr(H)
+    _compativeis(g, h)
+
+    vertices = list(g.vertices) + [v for v in h.vertices if v not in g._vertice_idx]
+    posicao = {v: i for i, v in enumerate(vertices)}
+    de_h = np.fromiter((posicao[v] for v in h.vertices), dtype=np.int64, count=len(h.vertices))
+
+    og, dg = _arcos(g)
+    oh, dh = _arcos(h)
+    oh, dh = de_h[oh], de_h[dh]
+    n = max(len(vertices), 1)
+
+    if g.ponderado:
+        # _montar fica com a ultima ocorrencia de cada par: G vem por ultimo
+        return _novo_grafo(vertices, np.concatenate((oh, og)), np.concatenate((dh, dg)),
+                           np.concatenate((h.weights, g.weights)), g.direcionado)
+
+    chaves_g, quantos_g = _contagens(og * n + dg)
+    chaves_h, quantos_h = _contagens(oh * n + dh)
+    chaves = np.union1d(chaves_g, chaves_h)
+    multiplicidade = np.zeros(len(chaves), dtype=np.int64)
+    multiplicidade[np.searchsorted(chaves, chaves_g)] = quantos_g
+    em_h = np.searchsorted(chaves, chaves_h)
+    multiplicidade[em_h] = np.maximum(multiplicidade[em_h], quantos_h)
+
+    chaves = np.repeat(chaves, multiplicidade)
+    return _novo_grafo(vertices, chaves // n, chaves % n, None, g.direcionado)
+
+
+@instrumentacao.medido()
+def intersecao(G: Any, H: Any) -> Grafo:
+    # vertices comuns (na ordem de G) e arcos presentes nos dois, com a menor
+    # multiplicidade (sem pesos) ou com o peso de G
+    g, h = como_csr(G), como_csr(H)
+    _compativeis(g, h)
+
+    vertices = [v for v in g.vertices if v in h._vertice_idx]
+    n = max(len(vertices), 1)
+    # posicao na intersecao de cada vertice de G e de H (-1 fora dela)
+    posicao = {v: i for i, v in enumerate(vertices)}
+    de_g = np.fromiter((posicao.get(v, -1) for v in g.vertices), dtype=np.int64, count=len(g.vertices))
+    de_h = np.fromiter((posicao.get(v, -1) for v in h.vertices), dtype=np.int64, count=len(h.vertices))
+
+    og, dg = _arcos(g)
+    oh, dh = _arcos(h)
+    og, dg, oh, dh = de_g[og], de_g[dg], de_h[oh], de_h[dh]
+    manter_g = (og >= 0) & (dg >= 0)
+    manter_h = (oh >= 0) & (dh >= 0)
+    chaves_g = og[manter_g] * n + dg[manter_g]
+    chaves_h = oh[manter_h] * n + dh[manter_h]
+
+    if g.ponderado:
+        comuns = np.isin(chaves_g, chaves_h)
+        chaves = chaves_g[comuns]
+        return _novo_grafo(vertices, chaves // n, chaves % n, g.weights[manter_g][comuns], g.direcionado)
+
+    chaves_g, quantos_g = _contagens(chaves_g)
+    chaves_h, quantos_h = _contagens(chaves_h)
+    chaves, em_g, em_h = np.intersect1d(chaves_g, chaves_h, assume_unique=True, return_indices=True)
+    chaves = np.repeat(chaves, np.minimum(quantos_g[em_g], quantos_h[em_h]))
+    return _novo_grafo(vertices, chaves // n, chaves % n, None, g.direcionado)
+
+
+@instrumentacao.medido()
+def contrair_vertices(G: Any, grupo: Iterable[Union[str, int]], rotulo: Optional[Union[str, int]] = None,
+                      manter_lacos: bool = False, pesos: str = "soma") -> Grafo:
+    # os vertices do grupo viram um so (rotulo, por padrao o primeiro do grupo), na
+    # posicao do primeiro deles. Arcos internos ao grupo somem (ou viram lacos); arcos
+    # que ficam paralelos continuam paralelos sem pesos, e com pesos sao combinados por
+    # "soma", "min" ou "max"
+    if pesos not in _COMBINAR:
+        raise ValueError(f"Combinacao de pesos {pesos} invalida")
+
+    csr = como_csr(G)
+    grupo = list(dict.fromkeys(grupo))
+    if not grupo:
+        raise ValueError("Grupo de vertices a contrair esta vazio")
+    for v in grupo:
+        if v not in csr._vertice_idx:
+            raise ValueError(f"Vertice {v} nao existe no grafo")
+
+    rotulo = grupo[0] if rotulo is None else rotulo
+    no_grupo = np.zeros(len(csr.vertices), dtype=bool)
+    no_grupo[[csr._vertice_idx[v] for v in grupo]] = True
+    if rotulo in csr._vertice_idx and not no_grupo[csr._vertice_idx[rotulo]]:
+        raise ValueError(f"Rotulo {rotulo} ja e de outro vertice")
+
+    # quem fica: todos fora do grupo e o primeiro do grupo, que recebe o rotulo
+    representante = csr._vertice_idx[grupo[0]]
+    fica = ~no_grupo
+    fica[representante] = True
+    nova_posicao = np.cumsum(fica) - 1
+    nova_posicao[no_grupo] = nova_posicao[representante]
+    vertices = [rotulo if i == representante else v for i, v in enumerate(csr.vertices) if fica[i]]
+
+    antigas_origens, antigos_destinos = _arcos(csr)
+    origens, destinos = nova_posicao[antigas_origens], nova_posicao[antigos_destinos]
+    manter = np.ones(len(origens), dtype=bool) if manter_lacos else origens != destinos
+    if manter_lacos and csr.ponderado and not csr.direcionado:
+        # com pesos, o laco nao direcionado e um arco so, mas a aresta interna vem nos
+        # dois sentidos: so u -> v com u < v vira laco
+        manter &= (origens != destinos) | (antigas_origens <= antigos_destinos)
+    origens, destinos = origens[manter], destinos[manter]
+
+    if not csr.ponderado:
+        return _novo_grafo(vertices, origens, destinos, None, csr.direcionado)
+
+    n = max(len(vertices), 1)
+    chaves, inverso = np.unique(origens * n + destinos, return_inverse=True)
+    juntar, neutro = _COMBINAR[pesos]
+    combinados = np.full(len(chaves), neutro)
+    juntar.at(combinados, inverso, csr.weights[manter])
+    return _novo_grafo(vertices, chaves // n, chaves % n, combinados, csr.direcionado)
+
+
+def contrair_aresta(G: Any, aresta: Tuple, rotulo: Optional[Union[str, int]] = None,
+                    pesos: str = "soma") -> Grafo:
+    csr = como_csr(G)
+    if not csr.verificar_aresta(aresta):
+        raise ValueError(f"Aresta {aresta} nao existe no grafo")
+    return contrair_vertices(csr, aresta, rotulo, pesos=pesos)
+
+
+class SubgrafoInduzido:
+    # visao: mascara de vertices sobre o CSR do grafo de origem
+    def __init__(self, G: Any, vertices: Iterable[Union[str, int]]):
+        self._origem = como_csr(G)
+        self.direcionado = self._origem.direcionado
+        self.ponderado = self._origem.ponderado
+
+        indice = self._origem._vertice_idx
+        self._mascara = np.zeros(len(self._origem.vertices), dtype=bool)
+        for v in vertices:
+            if v not in indice:
+                raise ValueError(f"Vertice {v} nao existe no grafo")
+            self._mascara[indice[v]] = True
+
+        # mantem a ordem do grafo de origem
+        self._posicoes = np.flatnonzero(self._mascara)
+        self.vertices = [self._origem.vertices[i] for i in self._posicoes.tolist()]
+        self._vertice_idx = {v: i for i, v in enumerate(self.vertices)}
+        self._csr = None
+
+    def _linha(self, v: Union[str, int]) -> np.ndarray:
+        if v not in self._vertice_idx:
+            raise ValueError(f"Vertice {v} nao existe no subgrafo")
+        vizinhos = self._origem.vizinhos_idx(self._origem._vertice_idx[v])
+        return vizinhos[self._mascara[vizinhos]]
+
+    def vertices_vizinhos(self, v: Union[str, int]) -> List[Any]:
+        return [self._origem.vertices[j] for j in np.unique(self._linha(v)).tolist()]
+
+    def verificar_aresta(self, aresta: Tuple) -> bool:
+        if not isinstance(aresta, tuple) or len(aresta) != 2:
+            return False
+        u, v = aresta
+        return u in self._vertice_idx and v in self._vertice_idx and self._origem.verificar_aresta(aresta)
+
+    def graus_de_um_vertice(self, v: Union[str, int]) -> Tuple[int, int]:
+        saida = len(self._linha(v))
+        if not self.direcionado:
+            return saida, saida
+        return self.para_csr().graus_de_um_vertice(v)[0], saida
+
+    def lista_adjacencias(self) -> Dict[Any, List[Any]]:
+        return {v: self.vertices_vizinhos(v) for v in self.vertices}
+
+    def numero_de_arestas(self) -> int:
+        return self.para_csr().numero_de_arestas()
+
+    def para_csr(self) -> GrafoCSR:
+        if self._csr is None:
+            origens, destinos = _arcos(self._origem)
+            manter = self._mascara[origens] & self._mascara[destinos]
+            nova_posicao = np.cumsum(self._mascara) - 1
+            pesos = self._origem.weights[manter] if self.ponderado else None
+            self._csr = GrafoCSR.de_indices(self.vertices, nova_posicao[origens[manter]],
+                                            nova_posicao[destinos[manter]], pesos, self.direcionado)
+        return self._csr
+
+    def materializar(self) -> Grafo:
+        return Grafo.de_csr(self.para_csr())
+
+
+class Complemento:
+    # visao: (u, v) e aresta, para u != v, quando nao e aresta do grafo de origem;
+    # sem pesos e sem lacos, e so montado por inteiro em para_csr()
+    def __init__(self, G: Any):
+        self._origem = como_csr(G)
+        self.direcionado = self._origem.direcionado
+        self.ponderado = False
+        self.vertices = list(self._origem.vertices)
+        self._vertice_idx = self._origem._vertice_idx
+        self._csr = None
+
+        # vizinhos distintos (sem lacos) de cada vertice no grafo de origem
+        n = len(self.vertices)
+        origens, destinos = _arcos(self._origem)
+        distintos = origens != destinos
+        if len(origens) > 1:
+            distintos[1:] &= (origens[1:] != origens[:-1]) | (destinos[1:] != destinos[:-1])
+        self._grau_saida = n - 1 - np.bincount(origens[distintos], minlength=n)
+        self._grau_entrada = n - 1 - np.bincount(destinos[distintos], minlength=n)
+
+    def _idx(self, v: Union[str, int]) -> int:
+        if v not in self._vertice_idx:
+            raise ValueError(f"Vertice {v} nao existe no grafo")
+        return self._vertice_idx[v]
+
+    def vertices_vizinhos(self, v: Union[str, int]) -> List[Any]:
+        i = self._idx(v)
+        fora = np.ones(len(self.vertices), dtype=bool)
+        fora[self._origem.vizinhos_idx(i)] = False
+        fora[i] = False
+        return [self.vertices[j] for j in np.flatnonzero(fora).tolist()]
+
+    def verificar_aresta(self, aresta: Tuple) -> bool:
+        if not isinstance(aresta, tuple) or len(aresta) != 2:
+            return False
+        u, v = aresta
+        if u not in self._vertice_idx or v not in self._vertice_idx or u == v:
+            return False
+        return not self._origem.verificar_aresta(aresta)
+
+    def graus_de_um_vertice(self, v: Union[str, int]) -> Tuple[int, int]:
+        i = self._idx(v)
+        return int(self._grau_entrada[i]), int(self._grau_saida[i])
+
+    def lista_adjacencias(self) -> Dict[Any, List[Any]]:
+        return {v: self.vertices_vizinhos(v) for v in self.vertices}
+
+    def numero_de_arestas(self) -> int:
+        return int(self._grau_saida.sum())
+
+    def para_csr(self) -> GrafoCSR:
+        if self._csr is None:
+            n = len(self.vertices)
+            adjacente = np.eye(n, dtype=bool)
+            adjacente[_arcos(self._origem)] = True
+            origens, destinos = np.nonzero(~adjacente)
+            self._csr = GrafoCSR.de_indices(self.vertices, origens, destinos, None, self.direcionado)
+        return self._csr
+
+    def materializar(self) -> Grafo:
+        return Grafo.de_csr(self.para_csr())
+
+
+def subgrafo_induzido(G: Any, vertices: Iterable[Union[str, int]]) -> SubgrafoInduzido:
+    return SubgrafoInduzido(G, vertices)
+
+
+def subgrafo_sem_vertices(G: Any, removidos: Iterable[Union[str, int]]) -> SubgrafoInduzido:
+    # o mesmo que remover_vertice para cada um, sem copiar nem reconstruir o grafo
+    csr = como_csr(G)
+    removidos = set(removidos)
+    for v in removidos:
+        if v not in csr._vertice_idx:
+            raise ValueError(f"Vertice {v} nao existe no grafo")
+    return SubgrafoInduzido(csr, [v for v in csr.vertices if v not in removidos])
+
+
+def complemento(G: Any) -> Complemento:
+    return Complemento(G)
+
+
+if __name__ == "__main__":
+    print("Teste 1: Uniao e intersecao")
+    g1 = Grafo(vertices=[1, 2, 3], direcionado=False, arestas=[(1, 2), (2, 3)])
+    g2 = Grafo(vertices=[2, 3, 4], direcionado=False, arestas=[(2, 3), (3, 4)])
+    print("Uniao:")
+    uniao(g1, g2).printar_grafo()
+    print("Intersecao:")
+    intersecao(g1, g2).printar_grafo()
+    print()
+
+    print("Teste 2: Complemento (visao)")
+    c = complemento(g1)
+    print("Vizinhos de 1 no complemento:", c.vertices_vizinhos(1))
+    print("(1, 3) e aresta do complemento?", c.verificar_aresta((1, 3)))
+    print("Complemento conexo?", c.materializar().eh_conexo())
+    print()
+
+    print("Teste 3: Contracao de vertices")
+    g3 = Grafo(vertices=['A', 'B', 'C', 'D'], direcionado=False,
+               arestas={('A', 'B'): 1, ('B', 'C'): 2, ('A', 'C'): 3, ('C', 'D'): 4})
+    contraido = contrair_aresta(g3, ('A', 'B'), rotulo='AB')
+    contraido.printar_grafo()
+    print()
+
+    print("Teste 4: Subgrafo induzido (visao) e algoritmos sobre ele")
+    g4 = Grafo(vertices=[1, 2, 3, 4, 5], arestas=[(1, 2), (2, 3), (3, 1), (3, 4), (4, 5)])
+    sub = subgrafo_induzido(g4, [1, 2, 3, 4])
+    print("Vertices:", sub.vertices)
+    print("Vizinhos de 3:", sub.vertices_vizinhos(3))
+    print("Graus de 3:", sub.graus_de_um_vertice(3))
+    sem = subgrafo_sem_vertices(g4, [4])
+    from .conexidade import eh_fortemente_conexo
+    print("Sem o vertice 4, fortemente conexo?", eh_fortemente_conexo(sem))
+    sem.materializar().printar_grafo()
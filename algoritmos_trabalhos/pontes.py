@@ -0,0 +1,329 @@
+# Pontes, articulacoes e componentes biconexas (Tarjan, low-link) em grafos nao direcionados
+# A busca em profundidade e iterativa (pilha de iteradores), entao grafos grandes nao
+# esbarram no limite de recursao do Python. As arestas tem id proprio: arestas paralelas
+# nunca sao pontes e lacos sao ignorados (nao ligam vertices diferentes).
+#
+# PontesIncrementais mantem o conjunto de pontes enquanto arestas sao removidas, como num
+# percurso de Fleury. Remover uma ponte nao muda as demais; remover uma aresta que nao e
+# ponte so marca a componente 2-aresta-conexa dela como desatualizada, unico lugar onde
+# podem surgir pontes novas. Fora dessas componentes a consulta custa O(1); dentro delas
+# uma busca bidirecional a partir das duas pontas (sem a propria aresta) responde, parando
+# no encontro ou quando o lado menor se esgota, em vez de refazer a componente inteira.
+# Essa busca nao tem custo amortizado garantido: cada consulta numa componente
+# desatualizada custa ate O(m), e um percurso de Fleury inteiro ate O(m^2) no pior caso
+# (em multigrafos eulerianos aleatorios o tempo cresce perto de m^1.7). So uma estrutura
+# de conectividade totalmente dinamica daria custo polilogaritmico por remocao.
+
+import numpy as np
+from typing import List, Dict, Tuple, Any, Callable, Iterable, Optional, Set
+
+from . import instrumentacao
+from .grafo_csr import como_csr
+
+
+def arestas_nao_direcionadas(G: Any) -> Tuple[np.ndarray, np.ndarray]:
+    # uma entrada por aresta (u <= v, em posicoes de G.vertices), paralelas repetidas
+    csr = como_csr(G)
+    if csr.direcionado:
+        raise ValueError("Algoritmo funciona apenas para grafos nao direcionados")
+
+    origens = np.repeat(np.arange(len(csr.vertices), dtype=np.int64), np.diff(csr.indptr))
+    destinos = np.asarray(csr.indices, dtype=np.int64)
+
+    # cada aresta aparece como (u, v) e (v, u); fica uma copia.
+    # lacos (u, u) aparecem duas vezes no Grafo sem pesos, mas so uma vez no dict de pesos
+    lacos = np.sort(origens[origens == destinos])
+    if not csr.ponderado:
+        lacos = lacos[0::2]
+
+    manter = origens < destinos
+    return np.concatenate((origens[manter], lacos)), np.concatenate((destinos[manter], lacos))
+
+
+def _incidencias(n: int, origens: List[int], destinos: List[int]) -> List[Dict[int, int]]:
+    # incidentes[v] = {id da aresta: outra ponta}, na ordem das arestas
+    incidentes = [{} for _ in range(n)]
+    for e, (u, v) in enumerate(zip(origens, destinos)):
+        incidentes[u][e] = v
+        incidentes[v][e] = u
+    return incidentes
+
+
+def _busca_low(raizes: Iterable[int], incidentes: List[Dict[int, int]],
+               aceitar: Optional[Callable[[int], bool]] = None,
+               blocos: bool = False) -> Tuple[List[int], Set[int], List[List[int]]]:
+    # devolve (ids das pontes, articulacoes, componentes biconexas como listas de ids)
+    ordem, low = {}, {}
+    pontes, articulacoes, componentes = [], set(), []
+    pilha_arestas = []
+    contador = 0
+    percorridas = 0
+
+    for raiz in raizes:
+        if raiz in ordem:
+            continue
+
+        ordem[raiz] = low[raiz] = contador
+        contador += 1
+        filhos_raiz = 0
+        pilha = [(raiz, -1, iter(incidentes[raiz].items()))]
+
+        while pilha:
+            v, aresta_pai, vizinhos = pilha[-1]
+            desceu = False
+
+            for e, w in vizinhos:
+                percorridas += 1
+                if e == aresta_pai or w == v or (aceitar is not None and not aceitar(e)):
+                    continue
+                if w not in ordem:
+                    ordem[w] = low[w] = contador
+                    contador += 1
+                    if blocos:
+                        pilha_arestas.append(e)
+                    pilha.append((w, e, iter(incidentes[w].items())))
+                    desceu = True
+                    break
+                if ordem[w] < ordem[v]:
+                    # aresta de retorno para um ancestral (ou paralela a aresta do pai)
+                    if ordem[w] < low[v]:
+                        low[v] = ordem[w]
+                    if blocos:
+                        pilha_arestas.append(e)
+
+            if desceu:
+                continue
+
+            pilha.pop()
+            if not pilha:
+                break
+
+            u = pilha[-1][0]
+            if low[v] < low[u]:
+                low[u] = low[v]
+            if low[v] > ordem[u]:
+                pontes.append(aresta_pai)
+            if low[v] >= ordem[u]:
+                if u == raiz:
+                    filhos_raiz += 1
+                else:
+                    articulacoes.add(u)
+                if blocos:
+                    bloco = []
+                    while True:
+                        e = pilha_arestas.pop()
+                        bloco.append(e)
+                        if e == aresta_pai:
+                            break
+                    componentes.append(bloco)
+
+        if filhos_raiz > 1:
+            articulacoes.add(raiz)
+
+    if instrumentacao.ativo:
+        instrumentacao.arestas_percorridas("pontes._busca_low", percorridas)
+    return pontes, articulacoes, componentes
+
+
+class Biconexidade:
+    def __init__(self, G: Any):
+        origens, destinos = arestas_nao_direcionadas(G)
+        self.vertices = list(como_csr(G).vertices)
+        self._vertice_idx = {v: i for i, v in enumerate(self.vertices)}
+        self._origens, self._destinos = origens.tolist(), destinos.tolist()
+
+        n = len(self.vertices)
+        incidentes = _incidencias(n, self._origens, self._destinos)
+        ids_pontes, ids_articulacoes, blocos = _busca_low(range(n), incidentes, blocos=True)
+
+        self._ids_pontes = ids_pontes
+        self._pares_pontes = {self._par(e) for e in ids_pontes}
+        self._articulacoes = sorted(ids_articulacoes)
+        self._blocos = blocos
+
+    def _par(self, e: int) -> Tuple[int, int]:
+        return self._origens[e], self._destinos[e]
+
+    def _aresta(self, e: int) -> Tuple[Any, Any]:
+        return self.vertices[self._origens[e]], self.vertices[self._destinos[e]]
+
+    def pontes(self) -> List[Tuple[Any, Any]]:
+        return [self._aresta(e) for e in self._ids_pontes]
+
+    def articulacoes(self) -> List[Any]:
+        return [self.vertices[i] for i in self._articulacoes]
+
+    def componentes(self) -> List[List[Tuple[Any, Any]]]:
+        return [[self._aresta(e) for e in bloco] for bloco in self._blocos]
+
+    def eh_ponte(self, u: Any, v: Any) -> bool:
+        if u not in self._vertice_idx or v not in self._vertice_idx:
+            return False
+        i, j = self._vertice_idx[u], self._vertice_idx[v]
+        return (min(i, j), max(i, j)) in self._pares_pontes
+
+
+class PontesIncrementais:
+    def __init__(self, G: Any):
+        origens, destinos = arestas_nao_direcionadas(G)
+        self.vertices = list(como_csr(G).vertices)
+        self._vertice_idx = {v: i for i, v in enumerate(self.vertices)}
+        self._origens, self._destinos = origens.tolist(), destinos.tolist()
+
+        n, m = len(self.vertices), len(self._origens)
+        self._incidentes = _incidencias(n, self._origens, self._destinos)
+        self._ponte = bytearray(m)
+        self._arestas_restantes = m
+
+        # componente 2-aresta-conexa de cada vertice (ligados por arestas que nao sao pontes)
+        self._componente = [0] * n
+        self._membros: Dict[int, Set[int]] = {}
+        self._desatualizadas: Set[int] = set()
+        self._proximo_rotulo = 0
+
+        for e in _busca_low(range(n), self._incidentes)[0]:
+            self._ponte[e] = 1
+        self._rotular(range(n))
+
+    def _rotular(self, vertices: Iterable[int]) -> None:
+        # separa `vertices` pelas arestas que nao sao pontes; cada parte ganha um rotulo novo
+        pendentes = set(vertices)
+        while pendentes:
+            inicio = pendentes.pop()
+            rotulo = self._proximo_rotulo
+            self._proximo_rotulo += 1
+            membros = {inicio}
+            fronteira = [inicio]
+            while fronteira:
+                v = fronteira.pop()
+                self._componente[v] = rotulo
+                for e, w in self._incidentes[v].items():
+                    if not self._ponte[e] and w not in membros:
+                        membros.add(w)
+                        pendentes.discard(w)
+                        fronteira.append(w)
+            self._membros[rotulo] = membros
+
+    def incidentes(self, i: int) -> Dict[int, int]:
+        # {id da aresta: outra ponta} das arestas restantes no vertice de posicao i
+        return self._incidentes[i]
+
+    def _recalcular(self, rotulo: int) -> None:
+        membros = self._membros.pop(rotulo)
+        self._desatualizadas.discard(rotulo)
+        novas = _busca_low(membros, self._incidentes,
+                           aceitar=lambda a: self._componente[self._destinos[a]] == rotulo
+                           and self._componente[self._origens[a]] == rotulo)[0]
+        for a in novas:
+            self._ponte[a] = 1
+        self._rotular(membros)
+
+    def _separa(self, e: int) -> bool:
+        # expande sempre a menor fronteira; se ela acaba sem tocar o outro lado, e e ponte
+        u, v = self._origens[e], self._destinos[e]
+        lados = [{u}, {v}]
+        fronteiras = [[u], [v]]
+        percorridas = 0
+        separa = True
+
+        while separa and fronteiras[0] and fronteiras[1]:
+            i = 0 if len(fronteiras[0]) <= len(fronteiras[1]) else 1
+            proprio, outro = lados[i], lados[1 - i]
+            proxima = []
+            for x in fronteiras[i]:
+                for a, y in self._incidentes[x].items():
+                    percorridas += 1
+                    if a == e or y in proprio:
+                        continue
+                    if y in outro:
+                        separa = False
+                        break
+                    proprio.add(y)
+                    proxima.append(y)
+                if not separa:
+                    break
+            fronteiras[i] = proxima
+
+        if instrumentacao.ativo:
+            instrumentacao.arestas_percorridas("pontes.PontesIncrementais.ponte", percorridas)
+        return separa
+
+    def ponte(self, e: int) -> bool:
+        # uma ponte continua ponte depois de qualquer remocao; so o "nao" pode estar velho
+        if not self._ponte[e] and self._origens[e] != self._destinos[e] \
+                and self._componente[self._origens[e]] in self._desatualizadas and self._separa(e):
+            self._ponte[e] = 1
+        return bool(self._ponte[e])
+
+    def extremos(self, e: int) -> Tuple[int, int]:
+        return self._origens[e], self._destinos[e]
+
+    def arestas_restantes(self) -> int:
+        return self._arestas_restantes
+
+    def remover(self, e: int) -> None:
+        u, v = self._origens[e], self._destinos[e]
+        if e not in self._incidentes[u]:
+            raise ValueError(f"Aresta {e} ja foi removida")
+
+        del self._incidentes[u][e]
+        self._incidentes[v].pop(e, None)
+        self._arestas_restantes -= 1
+
+        if self._ponte[e]:
+            # uma ponte nao esta em nenhum ciclo: tira-la nao muda as outras
+            self._ponte[e] = 0
+            return
+        if u != v:
+            self._desatualizadas.add(self._componente[u])
+
+    def _id(self, u: Any, v: Any) -> Optional[int]:
+        if u not in self._vertice_idx or v not in self._vertice_idx:
+            raise ValueError(f"Vertices {u} ou {v} nao existem")
+        i, j = self._vertice_idx[u], self._vertice_idx[v]
+        for e, w in self._incidentes[i].items():
+            if w == j:
+                return e
+        return None
+
+    def eh_ponte(self, u: Any, v: Any) -> bool:
+        e = self._id(u, v)
+        return e is not None and bool(self._ponte[e])
+
+    def remover_aresta(self, u: Any, v: Any) -> None:
+        e = self._id(u, v)
+        if e is None:
+            raise ValueError(f"Aresta {(u, v)} nao existe")
+        self.remover(e)
+
+    def pontes(self) -> List[Tuple[Any, Any]]:
+        for rotulo in list(self._desatualizadas):
+            self._recalcular(rotulo)
+        return [(self.vertices[self._origens[e]], self.vertices[self._destinos[e]])
+                for e in range(len(self._ponte)) if self._ponte[e]]
+
+
+if __name__ == "__main__":
+    from .grafo_utils import Grafo
+
+    print("Teste 1: Dois triangulos ligados por uma ponte")
+    g1 = Grafo(vertices=[1, 2, 3, 4, 5, 6], direcionado=False,
+               arestas=[(1, 2), (2, 3), (3, 1), (3, 4), (4, 5), (5, 6), (6, 4)])
+    b = Biconexidade(g1)
+    print("Pontes:", b.pontes())
+    print("Articulacoes:", b.articulacoes())
+    print("Componentes biconexas:", b.componentes())
+    print()
+
+    print("Teste 2: Arestas paralelas nao sao pontes")
+    g2 = Grafo(vertices=['A', 'B', 'C'], direcionado=False, arestas=[('A', 'B'), ('A', 'B'), ('B', 'C')])
+    print("Pontes:", Biconexidade(g2).pontes())
+    print()
+
+    print("Teste 3: Pontes mantidas enquanto arestas sao removidas")
+    incremental = PontesIncrementais(g1)
+    print("(1, 2) e ponte?", incremental.eh_ponte(1, 2))
+    incremental.remover_aresta(1, 3)
+    print("Depois de remover (1, 3):", incremental.pontes())
+    incremental.remover_aresta(3, 4)
+    print("Depois de remover a ponte (3, 4):", incremental.pontes())
@@ -0,0 +1,217 @@
+# Distancias entre todos os pares de vertices
+# Grafos densos: Floyd-Warshall vetorizado em blocos. Para cada bloco de b pivos, cada
+# faixa de b linhas e fechada contra os b pivos seguidos enquanto ainda esta no cache,
+# em vez de varrer a matriz inteira uma vez por pivo.
+# Grafos esparsos: um Dijkstra por origem, em blocos de origens distribuidos num pool de
+# processos; cada processo escreve suas linhas direto na matriz de saida (memoria
+# compartilhada ou um arquivo .npy mapeado), sem devolver as linhas pelo pool.
+
+import os
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Tuple, Any, Optional
+
+from . import caminhos_minimos
+from . import instrumentacao
+from .grafo_csr import GrafoCSR, como_csr
+from .grafo_utils import Grafo
+
+DENSIDADE_FLOYD_WARSHALL = 0.1
+
+
+def _nova_matriz(n: int, dtype: Any, caminho: Optional[str]) -> np.ndarray:
+    if caminho is None:
+        return np.empty((n, n), dtype=dtype)
+    return np.lib.format.open_memmap(caminho, mode="w+", dtype=dtype, shape=(n, n))
+
+
+def abrir_distancias(caminho: str) -> np.ndarray:
+    return np.load(caminho, mmap_mode="r")
+
+
+def matriz_de_pesos(G: Any, dtype: Any = np.float64, caminho: Optional[str] = None) -> np.ndarray:
+    # diagonal 0, inf sem aresta e o menor peso entre arestas paralelas
+    csr = como_csr(G)
+    n = len(csr.vertices)
+    pesos = csr.weights if csr.weights is not None else np.ones(len(csr.indices))
+
+    matriz = _nova_matriz(n, dtype, caminho)
+    matriz[:] = np.inf
+    np.fill_diagonal(matriz, 0)
+    np.minimum.at(matriz, (csr.origens_idx(), np.asarray(csr.indices)), pesos)
+    return matriz
+
+
+def _fechar_bloco(D: np.ndarray, linhas: slice, colunas: slice, pivos: range, temp: np.ndarray) -> None:
+    # D[linhas, colunas] = min(D[linhas, colunas], D[linhas, k] + D[k, colunas]) para k em ordem
+    alvo = D[linhas, colunas]
+    temp = temp[:alvo.shape[0], :alvo.shape[1]]
+    for k in pivos:
+        np.add(D[linhas, k, None], D[k, colunas], out=temp)
+        np.minimum(alvo, temp, out=alvo)
+
+
+@instrumentacao.medido()
+def floyd_warshall(G: Any, tamanho_bloco: int = 16, dtype: Any = np.float64,
+                   caminho: Optional[str] = None) -> np.ndarray:
+    D = matriz_de_pesos(G, dtype, caminho)
+    n = D.shape[0]
+    b = max(1, tamanho_bloco)
+    temp = np.empty((b, n), dtype=D.dtype)
+    faixas = [slice(i, min(i + b, n)) for i in range(0, n, b)]
+    todas = slice(0, n)
+
+    for K in faixas:
+        pivos = range(K.start, K.stop)
+        # a faixa dos pivos fecha primeiro; depois as linhas k dela sao finais nesta rodada
+        _fechar_bloco(D, K, todas, pivos, temp)
+        for I in faixas:
+            if I != K:
+                _fechar_bloco(D, I, todas, pivos, temp)
+
+    if n and (np.diagonal(D) < 0).any():
+        raise ValueError("Grafo contem ciclo negativo")
+
+    if isinstance(D, np.memmap):
+        D.flush()
+    return D
+
+
+_csr_trabalhador = None
+_saida_trabalhador = None
+_memoria_trabalhador = None
+
+
+def _iniciar_trabalhador(n: int, indptr: np.ndarray, indices: np.ndarray, pesos: Optional[np.ndarray],
+                         direcionado: bool, destino: Tuple[str, str], dtype: str) -> None:
+    global _csr_trabalhador, _saida_trabalhador, _memoria_trabalhador
+    _csr_trabalhador = GrafoCSR.de_buffers(list(range(n)), indptr, indices, pesos,
+                                           np.zeros(n, dtype=np.int64), direcionado)
+
+    tipo, nome = destino
+    if tipo == "arquivo":
+        _saida_trabalhador = np.load(nome, mmap_mode="r+")
+    else:
+        _memoria_trabalhador = shared_memory.SharedMemory(name=nome)
+        _saida_trabalhador = np.ndarray((n, n), dtype=dtype, buffer=_memoria_trabalhador.buf)
+
+
+def _calcular_linhas(inicio: int, fim: int) -> int:
+    for i in range(inicio, fim):
+        _saida_trabalhador[i] = caminhos_minimos.dijkstra(_csr_trabalhador, i).distancias
+    if isinstance(_saida_trabalhador, np.memmap):
+        _saida_trabalhador.flush()
+    return fim - inicio
+
+
+@instrumentacao.medido()
+def dijkstra_repetido(G: Any, trabalhadores: Optional[int] = None, tamanho_bloco: int = 64,
+                      dtype: Any = np.float64, caminho: Optional[str] = None) -> np.ndarray:
+    csr = como_csr(G)
+    n = len(csr.vertices)
+    trabalhadores = trabalhadores or os.cpu_count() or 1
+    dtype = np.dtype(dtype)
+
+    if trabalhadores == 1 or n <= tamanho_bloco:
+        D = _nova_matriz(n, dtype, caminho)
+        for i in range(n):
+            D[i] = caminhos_minimos.dijkstra(csr, csr.vertices[i]).distancias
+        if isinstance(D, np.memmap):
+            D.flush()
+        return D
+
+    pesos = None if csr.weights is None else np.asarray(csr.weights)
+    if pesos is not None and len(pesos) and pesos.min() < 0:
+        raise ValueError("Grafo tem pesos negativos; use floyd_warshall")
+
+    memoria = None
+    if caminho is not None:
+        D = _nova_matriz(n, dtype, caminho)
+        D.flush()
+        destino = ("arquivo", caminho)
+    else:
+        memoria = shared_memory.SharedMemory(create=True, size=max(n * n * dtype.itemsize, 1))
+        destino = ("memoria", memoria.name)
+
+    try:
+        argumentos = (n, np.asarray(csr.indptr), np.asarray(csr.indices), pesos,
+                      csr.direcionado, destino, dtype.str)
+        with ProcessPoolExecutor(max_workers=trabalhadores, initializer=_iniciar_trabalhador,
+                                 initargs=argumentos) as executor:
+            futuros = [executor.submit(_calcular_linhas, i, min(i + tamanho_bloco, n))
+                       for i in range(0, n, tamanho_bloco)]
+            for futuro in futuros:
+                futuro.result()
+
+        if memoria is not None:
+            D = np.ndarray((n, n), dtype=dtype, buffer=memoria.buf).copy()
+    finally:
+        if memoria is not None:
+            memoria.close()
+            memoria.unlink()
+
+    return abrir_distancias(caminho) if caminho is not None else D
+
+
+def todos_os_pares(G: Any, metodo: str = "auto", dtype: Any = np.float64,
+                   caminho: Optional[str] = None, trabalhadores: Optional[int] = None) -> np.ndarray:
+    if metodo not in ("auto", "floyd_warshall", "dijkstra"):
+        raise ValueError(f"Metodo {metodo} invalido")
+
+    csr = como_csr(G)
+    if metodo == "auto":
+        n, m = len(csr.vertices), len(csr.indices)
+        negativos = csr.weights is not None and m > 0 and csr.weights.min() < 0
+        denso = m >= DENSIDADE_FLOYD_WARSHALL * n * n
+        metodo = "floyd_warshall" if negativos or denso else "dijkstra"
+
+    if metodo == "floyd_warshall":
+        return floyd_warshall(csr, dtype=dtype, caminho=caminho)
+    return dijkstra_repetido(csr, trabalhadores=trabalhadores, dtype=dtype, caminho=caminho)
+
+
+def fecho_metrico(G: Any, distancias: Optional[np.ndarray] = None) -> Grafo:
+    # grafo ponderado com uma aresta (u, v) para todo par u != v com caminho de u para v,
+    # pesada pela distancia; completo sempre que G for conexo
+    csr = como_csr(G)
+    D = todos_os_pares(csr) if distancias is None else distancias
+    origens, destinos = np.nonzero(np.isfinite(D) & ~np.eye(len(csr.vertices), dtype=bool))
+
+    if not csr.direcionado:
+        manter = origens < destinos
+        origens, destinos = origens[manter], destinos[manter]
+
+    rotulos = np.empty(len(csr.vertices), dtype=object)
+    rotulos[:] = csr.vertices
+    return Grafo.de_arrays(list(csr.vertices), rotulos[origens], rotulos[destinos],
+                           pesos=np.asarray(D[origens, destinos], dtype=np.float64),
+                           direcionado=csr.direcionado)
+
+
+if __name__ == "__main__":
+    import tempfile
+    from .bellmore_nemhauser import bellmore_nemhauser
+
+    print("Teste 1: Floyd-Warshall em blocos")
+    g1 = Grafo(vertices=['A', 'B', 'C', 'D', 'E'], direcionado=False,
+               arestas={('A', 'B'): 4, ('A', 'C'): 1, ('C', 'B'): 2, ('B', 'D'): 5, ('D', 'E'): 3})
+    print(floyd_warshall(g1, tamanho_bloco=2))
+    print()
+
+    print("Teste 2: Dijkstra repetido em paralelo, gravando num arquivo mapeado")
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = os.path.join(pasta, "distancias.npy")
+        D = dijkstra_repetido(g1, trabalhadores=2, tamanho_bloco=2, caminho=caminho)
+        print("Mapeado?", isinstance(D, np.memmap))
+        print("Igual ao Floyd-Warshall?", np.array_equal(D, floyd_warshall(g1)))
+        del D
+    print()
+
+    print("Teste 3: Fecho metrico para o Bellmore-Nemhauser")
+    g3 = Grafo(vertices=[1, 2, 3, 4, 5], direcionado=False,
+               arestas={(1, 2): 2, (2, 3): 2, (3, 4): 1, (4, 5): 3, (5, 1): 4, (2, 4): 1})
+    print("Bellmore-Nemhauser no grafo incompleto:", bellmore_nemhauser(g3))
+    fecho = fecho_metrico(g3)
+    print("Arestas no fecho:", fecho.numero_de_arestas())
+    print("Bellmore-Nemhauser no fecho metrico:", bellmore_nemhauser(fecho))